@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGI로 띄울 때는 메인 화면도 비동기 버전(views.home_async)을 씁니다. (끄려면 ASYNC_DASHBOARD=0)
+os.environ.setdefault('ASYNC_DASHBOARD', '1')
 
 application = get_asgi_application()
@@ -71,6 +71,19 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware', # 보안 관련(클릭재킹 방지)
 ]
 
+# 요청별 시간 측정 (선택, ministry/timing.py)
+# 0보다 크면 그 비율만큼의 요청에 Server-Timing 헤더와 'ministry.timing' 로그를 남깁니다. (예: 0.05 = 5%)
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', '0'))
+if SERVER_TIMING_SAMPLE_RATE > 0:
+    MIDDLEWARE.insert(0, 'ministry.timing.ServerTimingMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'ministry.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False}},
+}
+
 # URL 설정 파일 위치 지정
 # "누가 이 사이트에 접속하면 어떤 주소로 안내할까?"를 결정하는 파일이 어디 있는지 알려줍니다.
 ROOT_URLCONF = 'config.urls'
@@ -96,6 +109,12 @@ TEMPLATES = [
 # 웹 서버(Nginx, Apache 등)와 Django가 소통하기 위한 진입점입니다.
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# 비동기 메인 화면 (선택, ministry/views.py의 home_async)
+# ASGI 서버(예: uvicorn config.asgi:application)로 띄우면 config/asgi.py가 ASYNC_DASHBOARD=1로 켭니다.
+# 켜지면 메인 화면('/')이 캐시에 없는 구역들을 동시에 읽습니다. WSGI(gunicorn 기본)에서는 기존 home을 씁니다.
+# 측정: `python manage.py bench_async_dashboard`
+ASYNC_DASHBOARD = os.environ.get('ASYNC_DASHBOARD') == '1'
+
 
 # 데이터베이스 설정
 # 프로젝트의 데이터를 어디에 저장할지 결정합니다.
@@ -116,6 +135,47 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if DATABASE_URL:
     DATABASES['default'] = dj_database_url.config(default=DATABASE_URL, conn_max_age=600)
 
+# 읽기 전용 복제본(replica) DB 설정
+# REPLICA_DATABASE_URL이 있으면 메인 화면과 '더 보기' 목록의 읽기(GET) 쿼리를 복제본으로 보냅니다. (ministry/routers.py)
+# 관리자 화면, 엑셀 가져오기, 리뷰 작성 같은 쓰기와 그 직후의 읽기는 항상 기본(default) DB에서 처리합니다.
+# 없으면 모든 쿼리가 기본 DB로 갑니다. 로컬에서는 sqlite 파일 두 개로 시험해 볼 수 있습니다.
+#   (예: REPLICA_DATABASE_URL=sqlite:////tmp/replica.sqlite3 python manage.py migrate --database replica)
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+REPLICA_DATABASE_ALIAS = 'default'
+
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600)
+    # 테스트할 때는 복제본을 따로 만들지 않고 기본 테스트 DB를 그대로 바라보게 합니다.
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASE_ALIAS = 'replica'
+
+# SQLite 성능 설정 (선택)
+# SQLITE_TUNED=1 이면 sqlite DB에 연결할 때마다 아래 설정을 적용합니다. (PostgreSQL 등에는 영향 없음)
+# - WAL: 쓰는 중에도 다른 요청이 읽을 수 있습니다. (기본 방식은 쓰는 동안 읽기까지 막힘)
+# - synchronous=NORMAL: WAL에서는 이 정도로도 안전하고, 저장할 때마다 디스크를 기다리는 시간이 줄어듭니다.
+# - IMMEDIATE: 트랜잭션을 시작할 때 바로 쓰기 잠금을 잡습니다. 읽다가 쓰기로 바꾸는 순간 서로 막혀서
+#   'database is locked'가 곧바로 나는 문제를 없애고, 대신 timeout(초)만큼 차례를 기다립니다.
+# 측정: `python manage.py bench_sqlite_writers`
+SQLITE_TUNED = os.environ.get('SQLITE_TUNED') == '1'
+SQLITE_TUNED_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=134217728;'  # 128MB
+        'PRAGMA cache_size=-20000;'     # 약 20MB
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,  # 다른 요청이 쓰는 중이면 최대 20초까지 기다립니다. (busy timeout)
+}
+
+if SQLITE_TUNED:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.sqlite3':
+            database.setdefault('OPTIONS', {}).update(SQLITE_TUNED_OPTIONS)
+
+DATABASE_ROUTERS = ['ministry.routers.ReplicaRouter']
+
 
 # 비밀번호 검증 설정
 # 비밀번호를 너무 쉽게 만들지 못하게 막는 규칙들입니다.
@@ -218,4 +278,34 @@ if not DEBUG:
     }
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# 업로드한 파일(MEDIA_URL)을 실제로 내려주는 곳이 있는지 알려줍니다.
+# 개발 서버(DEBUG)는 config/urls.py가 내려주지만, 배포(vercel.json은 모든 주소를 WSGI로 보냄)에서는 아무도 내려주지 않습니다.
+# 배포에서 관리자 화면의 '메인 슬라이드 사진'을 쓰려면 STORAGES['default']를 자기 주소를 내려주는 저장소(S3 등)로 바꾸거나
+# 웹 서버가 MEDIA_ROOT를 내려주게 하고 MEDIA_SERVED=1로 켜세요. 꺼져 있으면 메인 화면은 static/slides의 기본 사진을 씁니다.
+MEDIA_SERVED = os.environ.get('MEDIA_SERVED', '1' if DEBUG else '0') == '1'
+
+# 노션 공지 동기화 설정
+# `python manage.py sync_notion`이 노션 API를 부를 때 최대 몇 초까지 기다릴지 정합니다.
+NOTION_TIMEOUT = int(os.environ.get('NOTION_TIMEOUT', '10'))
+
+
+# 캐시 설정
+# 메인 화면의 각 구역을 완성된 HTML로 저장해 둡니다. (ministry/cache.py)
+# 서버가 여러 대(프로세스)라면 REDIS_URL로 공유 캐시를 써야 관리자 수정이 모든 서버에 바로 반영됩니다.
+# 로컬 메모리 캐시는 프로세스마다 따로라서 DASHBOARD_CACHE_TIMEOUT(초) 동안 예전 화면이 보일 수 있습니다.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'intochurch'}}
+
+DASHBOARD_CACHE_ALIAS = os.environ.get('DASHBOARD_CACHE_ALIAS', 'default')
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# 리뷰 작성 횟수 제한 (ministry/ratelimit.py)
+# 한 방문자(IP)가 REVIEW_RATE_WINDOW초 동안 REVIEW_RATE_LIMIT번까지 리뷰를 쓸 수 있습니다. (기본: 24시간에 한 번)
+# 예전의 '날짜가 바뀌면 다시 쓸 수 있음'(달력 기준 하루)과 달리, 마지막 리뷰를 쓴 때부터 REVIEW_RATE_WINDOW초가 지나야 합니다.
+REVIEW_RATE_LIMIT = int(os.environ.get('REVIEW_RATE_LIMIT', '1'))
+REVIEW_RATE_WINDOW = int(os.environ.get('REVIEW_RATE_WINDOW', '86400'))
@@ -16,13 +16,23 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from ministry import views
+from ministry import api, attachments, views
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', views.home, name='home'), # 따옴표 사이를 비워두면 메인화면이 됩니다
+    path('', views.home_async if settings.ASYNC_DASHBOARD else views.home, name='home'), # 따옴표 사이를 비워두면 메인화면이 됩니다
+    # htmx '더 보기' 버튼이 부르는 목록 조각(fragment) 주소들
+    path('partials/transactions/', views.transaction_list, name='transaction_list'),
+    path('partials/reviews/', views.review_list, name='review_list'),
+    path('partials/notices/', views.notion_list, name='notion_list'),
+    path('partials/search/', views.search_results, name='search_results'),
+    # 노션 공지 첨부파일을 우리 저장소에서 내려주는 주소 (ministry/attachments.py)
+    path('attachments/<str:digest>/<str:filename>', attachments.attachment, name='notion_attachment'),
+    # 외부 감사/보고용 읽기 전용 API (ministry/api.py)
+    path('api/transactions/', api.resource_list, {'resource': 'transactions'}, name='api_transactions'),
+    path('api/weekly-reports/', api.resource_list, {'resource': 'weekly-reports'}, name='api_weekly_reports'),
 ]
 
 if settings.DEBUG:
@@ -1,16 +1,56 @@
-import pandas as pd
 from django.contrib import admin
+from django.core.paginator import Paginator
 from django.urls import path
-from django.shortcuts import render, redirect
+from django.utils.functional import cached_property
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
-from django.http import HttpResponse # <--- 파일 다운로드를 위해 필요!
-from .models import WeeklyReport, FinancialTransaction, ChurchReview, SlideImage
-from .forms import ExcelUploadForm
+from django.utils import timezone
+from .models import WeeklyReport, FinancialTransaction, ChurchReview, ImportJob, SlideImage, LedgerRollup
+from .forms import ExcelUploadForm, LedgerExportForm
+from .excel import export_response
+from .rollups import ledger_categories, ledger_summary, rollup_count
+from .search import search
+
+class CategoryFilter(admin.SimpleListFilter):
+    # 기본 필터('category')는 목록을 열 때마다 전체 내역에 SELECT DISTINCT를 해서 내역이 많으면 느립니다.
+    # 대신 월별 합계표에서 읽어 캐시해 둔 항목 이름을 씁니다. (rollups.ledger_categories)
+    title = "부서/항목"
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        return [(category, category) for category in ledger_categories()]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.filter(category=self.value())
+        return queryset
+
+
+class KnownCountPaginator(Paginator):
+    # 전체 개수를 COUNT(*)로 세지 않고 미리 구해 둔 값(월별 합계표의 건수)을 쓰는 페이지 나누기입니다.
+    def __init__(self, object_list, per_page, known_count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        return self.known_count
+
+
+# 이 주소 조건들만 있을 때는 월별 합계표로 정확한 개수를 알 수 있습니다. (o: 정렬, p: 페이지 번호)
+ROLLUP_COUNT_PARAMS = {'type__exact', 'category', 'transaction_date__year', 'transaction_date__month', 'o', 'p'}
+
 
 @admin.register(FinancialTransaction)
 class FinancialAdmin(admin.ModelAdmin):
     list_display = ('transaction_date', 'type', 'category', 'description', 'amount')
-    list_filter = ('transaction_date', 'type', 'category')
+    list_filter = ('type', CategoryFilter)
+    # 날짜 필터 대신 연 -> 월 -> 일로 좁혀 가는 날짜 메뉴를 씁니다. (날짜, id) 색인(tx_date_id_idx)으로 찾습니다.
+    date_hierarchy = 'transaction_date'
+    ordering = ('-transaction_date', '-id')
+    # 필터나 검색을 했을 때 '전체 몇 건 중'을 세려고 COUNT(*)를 한 번 더 하지 않습니다.
+    show_full_result_count = False
+    # 검색창을 보이게 하려고 남겨둡니다. 실제 검색은 아래 get_search_results가 검색 색인으로 합니다.
     search_fields = ('description', 'category')
     change_list_template = "ministry/admin_changelist.html"
 
@@ -19,63 +59,101 @@ class FinancialAdmin(admin.ModelAdmin):
 
     def get_urls(self):
         urls = super().get_urls()
-        my_urls = [path('upload-excel/', self.upload_excel),]
+        my_urls = [
+            path('upload-excel/', self.admin_site.admin_view(self.upload_excel), name='ministry_financialtransaction_upload'),
+            path('upload-excel/<int:job_id>/', self.admin_site.admin_view(self.import_job_view), name='ministry_importjob_status'),
+            path('export/', self.admin_site.admin_view(self.export_view), name='ministry_financialtransaction_export'),
+        ]
         return my_urls + urls
 
+    def changelist_view(self, request, extra_context=None):
+        # 목록 위에 올해 수입/지출 합계를 보여줍니다. (내역 전체가 아니라 월별 합계표에서 읽음)
+        extra_context = {**(extra_context or {}), 'ledger_summary': ledger_summary(timezone.now().year)}
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        # 필터가 구분/항목/연/월뿐이면 개수를 요약표에서 더하고, 검색이나 날짜(일) 조건이 있으면 보통처럼 셉니다.
+        params = request.GET
+        if not set(params) <= ROLLUP_COUNT_PARAMS:
+            return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        count = rollup_count(
+            type_code=params.get('type__exact'),
+            category=params.get('category'),
+            year=params.get('transaction_date__year'),
+            month=params.get('transaction_date__month'),
+        )
+        return KnownCountPaginator(queryset, per_page, count, orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+
+    def get_search_results(self, request, queryset, search_term):
+        # LIKE '%검색어%'로 전체 내역을 훑지 않고 search.py의 검색 색인을 씁니다.
+        if not search_term:
+            return queryset, False
+        return search(queryset, search_term), False
+
     def upload_excel(self, request):
-        # ... (기존 업로드 로직 그대로 유지) ...
-        if request.method == "POST":
-            form = ExcelUploadForm(request.POST, request.FILES)
-            if form.is_valid():
-                excel_file = request.FILES["excel_file"]
-                try:
-                    df = pd.read_excel(excel_file)
-                    count = 0
-                    for index, row in df.iterrows():
-                        type_code = 'IN' if row['구분'] == '수입' else 'OUT'
-                        FinancialTransaction.objects.create(
-                            transaction_date=row['날짜'],
-                            type=type_code,
-                            category=row['부서'],
-                            description=row['내역'],
-                            amount=row['금액']
-                        )
-                        count += 1
-                    self.message_user(request, f"{count}건 등록 완료")
-                    return redirect("..")
-                except Exception as e:
-                    self.message_user(request, f"에러: {e}", level=messages.ERROR)
-        form = ExcelUploadForm()
-        payload = {"form": form}
+        # 파일은 가져오기 작업(ImportJob)으로 등록만 하고 바로 진행 상황 화면으로 넘어갑니다.
+        # 실제 검사와 저장은 `python manage.py run_import_jobs`가 웹 요청 밖에서 합니다. (jobs.py 참고)
+        form = ExcelUploadForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            job = ImportJob.objects.create(file=form.cleaned_data["excel_file"], uploaded_by=request.user)
+            return redirect("admin:ministry_importjob_status", job.pk)
+        payload = {**self.admin_site.each_context(request), "form": form, "jobs": ImportJob.objects.all()[:5]}
         return render(request, "ministry/admin_excel_upload.html", payload)
 
+    def import_job_view(self, request, job_id):
+        # htmx가 몇 초마다 부를 때는 진행 상황 조각만, 처음 열 때는 전체 화면을 돌려줍니다.
+        job = get_object_or_404(ImportJob, pk=job_id)
+        if request.headers.get("HX-Request"):
+            return render(request, "ministry/partials/import_progress.html", {"job": job})
+        return render(request, "ministry/admin_import_job.html", {**self.admin_site.each_context(request), "job": job})
+
     # ▼▼▼ 2. 엑셀 다운로드 기능 구현 (핵심 로직) ▼▼▼
     @admin.action(description='📊 선택한 내역을 엑셀로 내보내기')
     def export_to_excel(self, request, queryset):
-        # (1) 선택된 데이터(queryset)를 리스트로 변환
-        data = []
-        for tx in queryset:
-            data.append({
-                '날짜': tx.transaction_date,
-                '구분': tx.get_type_display(), # 'IN' 대신 '수입'으로 저장
-                '부서': tx.category,
-                '내역': tx.description,
-                '금액': tx.amount
-            })
-
-        # (2) 판다스 데이터프레임 만들기
-        df = pd.DataFrame(data)
-
-        # (3) 엑셀 파일로 변환하여 브라우저에게 응답(Response)
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename=financial_report.xlsx'
-        
-        # 판다스의 to_excel 기능을 이용해 response 객체에 바로 씀
-        df.to_excel(response, index=False)
-        
-        return response
+        # 선택된 내역을 DB에서 조금씩 꺼내 파일에 바로 쓰고, 완성된 파일을 스트리밍으로 내려줍니다.
+        return export_response(queryset, 'xlsx')
+
+    # ▼▼▼ 3. 기간/구분/부서 조건으로 내보내기 ▼▼▼
+    def export_view(self, request):
+        form = LedgerExportForm(request.GET or None)
+        if form.is_valid():
+            queryset = form.filter(FinancialTransaction.objects.all())
+            return export_response(queryset, form.cleaned_data['file_format'])
+        payload = {**self.admin_site.each_context(request), "form": form}
+        return render(request, "ministry/admin_excel_export.html", payload)
+
+@admin.register(LedgerRollup)
+class LedgerRollupAdmin(admin.ModelAdmin):
+    # 월별 합계표는 재정 내역에서 자동으로 계산되므로 읽기 전용으로만 보여줍니다.
+    list_display = ('month', 'type', 'category', 'total', 'count')
+    list_filter = ('type',)
+    date_hierarchy = 'month'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    # 엑셀 가져오기 기록입니다. 새 작업은 재정 내역의 '엑셀 업로드' 화면에서 올립니다.
+    list_display = ('created_at', 'file', 'status', 'rows_processed', 'created_count', 'existing_count', 'error_count', 'uploaded_by')
+    list_filter = ('status',)
+    readonly_fields = [field.name for field in ImportJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(SlideImage)
+class SlideImageAdmin(admin.ModelAdmin):
+    # 메인 화면 슬라이드는 여기서 관리합니다. (처음 한 번은 `python manage.py import_slides`로 기존 사진을 옮겨오세요)
+    list_display = ('title', 'order', 'is_active')
+    list_editable = ('order', 'is_active')
 
 # 나머지 모델 등록
 admin.site.register(WeeklyReport)
 admin.site.register(ChurchReview)
-# admin.site.register(SlideImage) # 관리자 페이지에서 제거 (로컬 파일 사용)
\ No newline at end of file
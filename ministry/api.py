@@ -0,0 +1,110 @@
+"""
+api.py는 외부 감사나 보고용 스크립트가 재정 내역/주간 보고를 가져갈 수 있는 읽기 전용 API입니다.
+
+    GET /api/transactions/?start_date=2025-01-01&end_date=2025-12-31&type=OUT&category=선교부
+    GET /api/weekly-reports/?start_date=2025-01-01
+
+- 기본(JSON): limit개(기본 100, 최대 1000)씩 날짜순으로 돌려주고, 다음 묶음 주소를 'next'에 담습니다. (키셋 커서)
+  커서가 깨졌거나 조작되었으면 첫 묶음을 주지 않고 400으로 답합니다. (같은 줄을 모르고 또 받지 않도록)
+- NDJSON(?format=ndjson 또는 Accept: application/x-ndjson): 조건에 맞는 전체를 한 줄에 하나씩 스트리밍합니다.
+  모델 객체를 만들지 않고 values_list().iterator()로 조금씩 읽으므로, 장부 전체를 받아도 서버 메모리가 늘지 않습니다.
+- ETag: 데이터가 바뀌지 않았으면(모델의 가장 최근 수정 시각과 개수가 같으면) 목록을 읽지 않고 304로 답합니다.
+  캐시의 모델 버전은 프로세스마다 따로일 수 있어서(LocMem), 어느 서버 프로세스가 받아도 같은 답이 나오도록 DB에서 확인합니다.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_GET
+
+from .conditional import data_state
+from .forms import TransactionApiForm, WeeklyReportApiForm
+from .models import FinancialTransaction, WeeklyReport
+from .pagination import decode_cursor, keyset_page
+from .routers import replica_reads
+
+DEFAULT_LIMIT = 100
+STREAM_CHUNK_SIZE = 2000
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# 주소의 이름 -> (모델, 내보낼 필드, 조회 조건 폼)
+RESOURCES = {
+    'transactions': (FinancialTransaction, ('id', 'transaction_date', 'type', 'category', 'description', 'amount'), TransactionApiForm),
+    'weekly-reports': (WeeklyReport, ('id', 'date', 'worship_attendance', 'new_comers', 'offering_total'), WeeklyReportApiForm),
+}
+
+
+def wants_ndjson(request):
+    return request.GET.get('format') == 'ndjson' or NDJSON_CONTENT_TYPE in request.headers.get('Accept', '')
+
+
+def resource_etag(request, resource):
+    # 모델의 (가장 최근 updated_at, 개수) + 요청 주소 + 형식으로 만듭니다. 색인만 읽는 가벼운 쿼리 한 번이면 됩니다.
+    model = RESOURCES[resource][0]
+    raw = f'{data_state([model])}:{request.get_full_path()}:{wants_ndjson(request)}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def iter_ndjson(queryset, fields, chunk_size=STREAM_CHUNK_SIZE):
+    encode = DjangoJSONEncoder(ensure_ascii=False).encode
+    lines = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        lines.append(encode(dict(zip(fields, row))))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def api_headers(view):
+    """
+    condition()이 만든 304를 포함한 모든 응답에 Vary: Accept를 붙이고, 오류(4xx) 응답에서는 ETag를 뺍니다.
+    (오류에 ETag가 붙으면 클라이언트가 그 ETag로 다시 물었을 때 오류 대신 304를 받게 됩니다)
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        patch_vary_headers(response, ['Accept'])
+        if response.status_code >= 400 and response.has_header('ETag'):
+            del response['ETag']
+        return response
+    return wrapper
+
+
+@require_GET
+@replica_reads
+@api_headers
+@condition(etag_func=resource_etag)
+def resource_list(request, resource):
+    model, fields, form_class = RESOURCES[resource]
+    form = form_class(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    date_field = form.date_field
+    ordering = (date_field, 'id')
+    cursor = form.cleaned_data['cursor'] or None
+    # 잘못된 커서를 첫 묶음으로 바꿔 주면, 묶음을 차례로 받던 클라이언트가 같은 줄을 오류 없이 또 받게 됩니다.
+    if cursor and decode_cursor(cursor, model, ordering) is None:
+        return JsonResponse({'errors': {'cursor': ['잘못된 커서입니다.']}}, status=400, json_dumps_params={'ensure_ascii': False})
+    queryset = form.filter(model.objects.all())
+
+    if wants_ndjson(request):
+        # 응답 본문은 뷰가 끝난 뒤에 만들어지므로, 지금 고른 DB(복제본 등)를 미리 고정해 둡니다.
+        queryset = queryset.order_by(*ordering)
+        queryset = queryset.using(queryset.db)
+        response = StreamingHttpResponse(iter_ndjson(queryset, fields), content_type=NDJSON_CONTENT_TYPE)
+    else:
+        limit = form.cleaned_data['limit'] or DEFAULT_LIMIT
+        page = keyset_page(queryset.values(*fields), ordering, cursor, limit)
+        next_url = None
+        if page.has_next:
+            params = request.GET.copy()
+            params['cursor'] = page.next_cursor
+            next_url = f'{request.path}?{params.urlencode()}'
+        response = JsonResponse({'results': list(page), 'next': next_url}, json_dumps_params={'ensure_ascii': False})
+    return response
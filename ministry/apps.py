@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class MinistryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ministry'
-    verbose_name = '교회 데이터 관리'  # <--- 이 줄 추가!
\ No newline at end of file
+    verbose_name = '교회 데이터 관리'  # <--- 이 줄 추가!
+
+    def ready(self):
+        # 저장/삭제 신호를 받아 메인 화면 캐시를 비우는 함수들을 등록합니다.
+        from . import signals  # noqa: F401
\ No newline at end of file
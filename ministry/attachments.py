@@ -0,0 +1,133 @@
+"""
+attachments.py는 노션 공지의 첨부파일을 우리 저장소(default_storage)로 옮겨 두는 곳입니다.
+
+노션이 주는 파일 주소는 한 시간쯤 지나면 만료되는 임시 S3 주소라서, 그대로 저장해 두면 링크가 곧 깨집니다.
+그래서 sync_notion이 공지를 가져올 때 첨부파일도 함께 내려받아 저장소(로컬 폴더나 S3)에 복사해 두고,
+공지 목록은 우리 주소(/attachments/<해시>/<파일 이름>)를 보여줍니다.
+
+- 저장 경로는 파일 내용의 SHA-256 해시라서, 같은 파일이 여러 공지에 붙어 있어도 한 번만 저장됩니다.
+- 다시 동기화할 때 노션이 알려주는 크기와 ETag가 지난번과 같으면 본문을 내려받지 않고 건너뜁니다.
+- 해시 주소의 내용은 절대 바뀌지 않으므로 브라우저/CDN이 1년 동안 캐시해도 됩니다. (attachment 뷰)
+- 파일 종류(Content-Type)는 복사할 때 NoticeAttachment에 기록해 두고, 내려줄 때 주소의 파일 이름으로 짐작하지 않습니다.
+  (누군가 주소 끝을 evil.html로 바꿔 우리 사이트에서 HTML/SVG로 열리게 하는 것을 막기 위해서)
+"""
+import hashlib
+import mimetypes
+import tempfile
+import urllib.request
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+
+from .models import NoticeAttachment
+
+DIRECTORY = 'notion'
+CHUNK_SIZE = 64 * 1024
+# 이 크기까지는 메모리에서 받고, 넘으면 임시 파일로 옮겨서 큰 첨부파일도 메모리를 많이 쓰지 않게 합니다.
+SPOOL_SIZE = 5 * 1024 * 1024
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# 브라우저 안에서 바로 열어도 스크립트가 실행되지 않는 종류만 화면에 보여주고, 나머지는 항상 내려받게 합니다.
+INLINE_TYPES = {'application/pdf', 'image/png', 'image/jpeg', 'image/gif', 'image/webp', 'audio/mpeg', 'video/mp4'}
+
+
+def attachment_path(digest):
+    return f'{DIRECTORY}/{digest[:2]}/{digest}'
+
+
+def url_filename(name, digest):
+    # 주소의 마지막 부분은 내려받을 때 보일 파일 이름입니다. ('/'가 들어가면 주소가 나뉘므로 바꿔 둡니다)
+    return name.replace('/', '_') or digest
+
+
+def _open_url(url):
+    # 노션의 임시 주소는 GET에만 서명되어 있어서 HEAD로는 확인할 수 없습니다.
+    # 대신 GET으로 열고 헤더만 먼저 본 뒤, 필요할 때만 본문을 읽습니다.
+    return urllib.request.urlopen(url, timeout=getattr(settings, 'NOTION_TIMEOUT', 10))
+
+
+def _download(response):
+    # 받은 만큼씩 해시를 계산하면서 임시 파일에 씁니다. (전체를 한 번에 메모리에 올리지 않음)
+    digest, size = hashlib.sha256(), 0
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    while chunk := response.read(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+
+def mirror_file(file, previous=None):
+    """
+    노션 첨부파일 하나({'name', 'url'})를 저장소에 복사하고, 우리 주소로 바꾼 dict와 처리 결과를 돌려줍니다.
+
+    previous는 지난 동기화 때 같은 이름의 파일 정보입니다. 크기와 ETag가 같으면 다시 받지 않습니다.
+    처리 결과: 'downloaded'(새로 받음), 'reused'(지난번 것 그대로), 'deduplicated'(받았지만 같은 내용이 이미 있음)
+    """
+    with _open_url(file['url']) as response:
+        etag = response.headers.get('ETag')
+        size = response.headers.get('Content-Length')
+        size = int(size) if size is not None else None
+        if (previous and previous.get('sha256') and etag and previous.get('etag') == etag
+                and previous.get('size') == size and default_storage.exists(attachment_path(previous['sha256']))):
+            return {**previous, 'name': file['name']}, 'reused'
+        spool, digest, size = _download(response)
+
+    with spool:
+        path = attachment_path(digest)
+        status = 'deduplicated'
+        if not default_storage.exists(path):
+            default_storage.save(path, File(spool, name=digest))
+            status = 'downloaded'
+    filename = url_filename(file['name'], digest)
+    NoticeAttachment.objects.get_or_create(digest=digest, filename=filename, defaults={
+        'content_type': mimetypes.guess_type(filename)[0] or 'application/octet-stream', 'size': size,
+    })
+    url = reverse('notion_attachment', kwargs={'digest': digest, 'filename': filename})
+    return {'name': file['name'], 'url': url, 'sha256': digest, 'size': size, 'etag': etag}, status
+
+
+def mirror_files(files, previous_files=()):
+    """
+    공지 하나의 첨부파일 목록을 저장소에 복사한 목록과 {처리 결과: 개수}를 돌려줍니다.
+
+    노션에 올린 파일(notion_file)만 복사하고, 외부 링크(유튜브 등)는 그대로 둡니다.
+    받기에 실패한 파일은 노션 주소를 그대로 두고(notion_file 표시 유지), sync_notion이 다음 동기화 때
+    그 공지를 노션에서 다시 불러와 새 주소로 시도합니다. (notion.retry_pending_files)
+    """
+    previous = {f['name']: f for f in previous_files if f.get('sha256')}
+    mirrored, counts = [], {}
+    for file in files:
+        status = 'external'
+        if file.get('notion_file'):
+            try:
+                file, status = mirror_file(file, previous.get(file['name']))
+            except OSError:
+                status = 'failed'
+        mirrored.append(file)
+        counts[status] = counts.get(status, 0) + 1
+    return mirrored, counts
+
+
+@require_GET
+@condition(etag_func=lambda request, digest, filename: digest)
+def attachment(request, digest, filename):
+    # 주소의 해시가 곧 내용이라서, 같은 주소는 언제나 같은 파일입니다. (ETag도 해시 그대로)
+    # 복사할 때 기록한 (해시, 파일 이름)만 내려주고, 파일 종류도 그때 기록한 것을 씁니다.
+    content_type = (NoticeAttachment.objects.filter(digest=digest, filename=filename)
+                    .values_list('content_type', flat=True).first())
+    if content_type is None:
+        raise Http404
+    try:
+        handle = default_storage.open(attachment_path(digest))
+    except FileNotFoundError:
+        raise Http404
+    response = FileResponse(handle, filename=filename, content_type=content_type,
+                            as_attachment=content_type not in INLINE_TYPES)
+    response['Cache-Control'] = IMMUTABLE
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
@@ -0,0 +1,113 @@
+"""
+cache.py는 메인 화면의 각 구역(통계 카드, 차트, 재정/리뷰/공지 첫 묶음)을 '완성된 HTML'로 저장해 두는 캐시입니다.
+
+데이터는 일주일에 몇 번 바뀌는데 방문할 때마다 DB를 다시 읽을 필요는 없으니까요.
+각 모델마다 '버전' 값을 캐시에 두고, 데이터가 저장/삭제되면(signals.py) 버전을 바꿉니다.
+구역 HTML의 캐시 키에 버전이 들어가므로, 버전이 바뀌면 예전 HTML은 자연스럽게 쓰이지 않습니다.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.utils.safestring import mark_safe
+
+from .timing import record_queries, timed
+
+
+def get_cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _version_key(model):
+    return f'ministry:version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    """모델별 현재 버전을 {모델: 버전} dict로 돌려줍니다. (캐시 조회 한 번)"""
+    cache = get_cache()
+    keys = {model: _version_key(model) for model in models}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for model, key in keys.items():
+        if key not in found:
+            # 버전 값이 캐시에서 밀려났으면 새 값으로 시작합니다. (예전 HTML이 다시 쓰이지 않도록 0 같은 고정값은 쓰지 않음)
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        versions[model] = found[key]
+    return versions
+
+
+def bump_version(model):
+    """model의 버전을 바꿔 관련 구역 캐시를 무효화합니다. 트랜잭션이 커밋된 뒤에 적용됩니다."""
+    transaction.on_commit(lambda: get_cache().set(_version_key(model), time.time_ns(), None))
+
+
+def lookup_sections(specs):
+    """
+    구역별 HTML을 캐시에서 꺼냅니다. (찾은 구역 {이름: HTML}, 새로 그려야 할 구역 {이름: 캐시 키})를 돌려줍니다.
+
+    specs = {구역 이름: (관련 모델 목록, 추가 키 목록, HTML을 만드는 함수)}
+    """
+    cache = get_cache()
+    versions = get_versions({model for models, _, _ in specs.values() for model in models})
+
+    keys = {}
+    for name, (models, key_parts, _) in specs.items():
+        parts = [name, *map(str, key_parts), *(str(versions[model]) for model in models)]
+        keys[name] = 'ministry:section:' + ':'.join(parts)
+
+    with timed('cache'):
+        found = cache.get_many(keys.values())
+    sections = {name: found[key] for name, key in keys.items() if key in found}
+    missing = {name: key for name, key in keys.items() if key not in found}
+    return sections, missing
+
+
+def store_sections(sections, missing, rendered):
+    """새로 그린 구역 HTML({이름: HTML})을 캐시에 저장하고, 모든 구역을 {이름: 안전한 HTML}로 돌려줍니다."""
+    if missing:
+        get_cache().set_many({missing[name]: html for name, html in rendered.items()},
+                             getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    return {name: mark_safe(html) for name, html in {**sections, **rendered}.items()}
+
+
+def cached_sections(specs):
+    """
+    구역별 HTML을 캐시에서 꺼내고, 없는 구역만 새로 그려서 저장합니다.
+
+    specs = {구역 이름: (관련 모델 목록, 추가 키 목록, HTML을 만드는 함수)}
+    """
+    sections, missing = lookup_sections(specs)
+    rendered = {}
+    for name in missing:
+        with timed(f'section_{name}'):
+            rendered[name] = specs[name][2]()
+    return store_sections(sections, missing, rendered)
+
+
+def _render_in_worker(name, render):
+    # 작업 스레드마다 자기 DB 연결을 씁니다. 요청이 끝날 때 Django가 정리해 주는 연결이 아니므로,
+    # 요청 처리 때와 같은 규칙(CONN_MAX_AGE)으로 오래됐거나 끊긴 연결을 직접 닫아 줍니다.
+    close_old_connections()
+    try:
+        with record_queries(), timed(f'section_{name}'):
+            return render()
+    finally:
+        close_old_connections()
+
+
+async def acached_sections(specs):
+    """
+    cached_sections의 비동기(ASGI) 버전입니다. 캐시에 없는 구역들을 각각 다른 스레드에서 동시에 그립니다.
+
+    Django의 비동기 ORM(aget, alist 등)은 한 요청의 쿼리를 모두 같은 스레드에서 차례로 실행하므로,
+    구역들이 정말 동시에 DB를 읽게 하려고 thread_sensitive=False로 구역마다 따로 실행합니다.
+    """
+    sections, missing = await sync_to_async(lookup_sections)(specs)
+    htmls = await asyncio.gather(*(
+        sync_to_async(_render_in_worker, thread_sensitive=False)(name, specs[name][2]) for name in missing
+    ))
+    return await sync_to_async(store_sections)(sections, missing, dict(zip(missing, htmls)))
@@ -0,0 +1,102 @@
+"""
+conditional.py는 메인 화면과 '더 보기' 조각에 조건부 GET(ETag / Last-Modified)을 붙이는 곳입니다.
+
+브라우저나 CDN이 "지난번에 받은 것과 같나요?"(If-None-Match / If-Modified-Since)라고 물으면,
+관련 모델들의 (가장 최근 수정 시각, 개수)를 쿼리 한 번으로 읽어 비교하고, 바뀐 게 없으면 HTML을 그리지 않고 304로 답합니다.
+- 수정은 updated_at(auto_now)이, 삭제는 개수가 바뀌는 것으로 알아챕니다.
+- 응답에는 Cache-Control: no-cache를 붙여서, 받아둔 화면을 쓰기 전에 항상 이렇게 확인하게 합니다.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, DateTimeField, IntegerField, Max, Value
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+def data_state(models):
+    """모델별 (가장 최근 updated_at, 개수)를 {모델 이름: (시각, 개수)}로 돌려줍니다. (UNION ALL 쿼리 한 번)"""
+    querysets = []
+    for model in models:
+        rows = model.objects.order_by().annotate(label=Value(model._meta.label_lower)).values('label')
+        # MAX와 COUNT를 한 SELECT에 같이 쓰면 SQLite가 updated_at 색인으로 최댓값만 바로 찾는 최적화를 못 하고
+        # 표 전체를 훑으므로(50만 건에서 약 35ms), 둘을 따로 묻는 줄로 나눕니다.
+        querysets.append(rows.annotate(latest=Max('updated_at'), count=Value(None, output_field=IntegerField())))
+        querysets.append(rows.annotate(latest=Value(None, output_field=DateTimeField()), count=Count('*')))
+    first, *rest = querysets
+    state = {model._meta.label_lower: [None, 0] for model in models}
+    for row in first.union(*rest, all=True):
+        if row['latest'] is not None:
+            state[row['label']][0] = row['latest']
+        if row['count'] is not None:
+            state[row['label']][1] = row['count']
+    return {label: tuple(value) for label, value in state.items()}
+
+
+def request_state(request, models):
+    """
+    data_state와 같지만, 같은 요청 안에서 이미 읽은 모델은 다시 묻지 않습니다.
+    (conditional_view가 ETag를 만들며 읽은 상태를 뷰 안의 다른 코드도 쿼리 없이 쓸 수 있게)
+    """
+    state = getattr(request, '_ministry_data_state', {})
+    missing = [model for model in models if model._meta.label_lower not in state]
+    if missing:
+        state = {**state, **data_state(missing)}
+        request._ministry_data_state = state
+    return {model._meta.label_lower: state[model._meta.label_lower] for model in models}
+
+
+def conditional_view(*models, vary=None, private=False):
+    """
+    GET/HEAD 요청에 models의 상태로 만든 ETag와 Last-Modified를 붙이고, 바뀐 게 없으면 304로 답하는 데코레이터입니다.
+
+    vary(request)가 돌려주는 값도 ETag에 섞습니다. (날짜나 방문자마다 달라지는 화면일 때)
+    private=True면 CDN 같은 공용 캐시에는 저장하지 말라고 알립니다.
+    """
+    def state(request):
+        # etag_func와 last_modified_func가 같은 요청에서 각각 불리므로 한 번만 읽어 둡니다.
+        return request_state(request, models)
+
+    def variant(request):
+        # vary는 캐시(Redis일 수도 있음)를 읽을 수 있으므로, 비동기 화면에서는 state처럼 미리 스레드에서 구해 둡니다.
+        if not hasattr(request, '_ministry_variant'):
+            request._ministry_variant = list(map(str, vary(request))) if vary else []
+        return request._ministry_variant
+
+    def prepare(request):
+        state(request)
+        variant(request)
+
+    def etag(request, *args, **kwargs):
+        parts = [request.get_full_path(), *map(str, sorted(state(request).items())), *variant(request)]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return max((latest for latest, _ in state(request).values() if latest), default=None)
+
+    def decorator(view):
+        conditional = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                # condition()은 etag/last_modified를 이벤트 루프에서 동기로 부르므로,
+                # DB를 읽는 상태 확인과 캐시를 읽는 vary는 미리 스레드에서 해 두고 etag가 그 값을 다시 씁니다.
+                await sync_to_async(prepare)(request)
+                response = await conditional(request, *args, **kwargs)
+                patch_cache_control(response, no_cache=True, **({'private': True} if private else {}))
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            response = conditional(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True, **({'private': True} if private else {}))
+            return response
+        return wrapper
+    return decorator
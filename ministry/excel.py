@@ -0,0 +1,329 @@
+"""
+excel.py는 재정 장부(FinancialTransaction)를 엑셀로 '가져오기/내보내기' 하는 기능을 모아둔 곳입니다.
+
+가져오기는 파일 전체를 한 번에 메모리에 올리지 않고(openpyxl read-only 모드),
+일정 개수(chunk)씩 검사한 뒤 bulk_create로 한꺼번에 저장합니다.
+모든 저장은 하나의 트랜잭션 안에서 이루어지므로, 중간에 잘못된 줄이 있으면 아무것도 저장되지 않습니다.
+
+가져온 줄마다 '지문'(row_fingerprint)을 붙여 저장하고, DB의 unique 색인이 같은 지문을 막습니다.
+그래서 같은 파일을 다시 올리거나 기간이 겹치는 파일(3월 파일 다음에 1분기 파일)을 올려도
+이미 있는 줄은 건너뛰고 새 줄만 저장되며, 결과에 새로 저장한 수와 이미 있던 수가 따로 나옵니다.
+
+내보내기도 마찬가지로 DB에서 chunk 단위로 꺼내 한 줄씩 써 내려가므로,
+장부 전체를 내려받아도 메모리 사용량이 일정합니다. CSV는 처음부터 바로 흘려 보내고,
+XLSX는 openpyxl write-only 모드로 임시 파일에 다 쓴 뒤 조금씩 읽어 보냅니다.
+
+openpyxl은 불러오는 데만 0.2초 가까이 걸리므로, 파일 위에서 import하지 않고 실제로 엑셀을 다루는 함수 안에서 불러옵니다.
+(관리자 화면은 서버가 켜질 때 함께 불러와지기 때문에, 위에서 import하면 메인 화면 첫 응답까지 느려집니다.)
+"""
+import csv
+import datetime
+import hashlib
+import io
+import tempfile
+import unicodedata
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, StreamingHttpResponse
+
+from .cache import bump_version
+from .models import FinancialTransaction
+from .rollups import apply_deltas, collect_deltas, merge_deltas
+
+# 엑셀 첫 줄(헤더)에 반드시 있어야 하는 열 이름 -> 모델 필드 이름
+COLUMNS = {'날짜': 'transaction_date', '구분': 'type', '부서': 'category', '내역': 'description', '금액': 'amount'}
+TYPE_LABELS = {'수입': 'IN', 'IN': 'IN', '지출': 'OUT', 'OUT': 'OUT'}
+CHUNK_SIZE = 2000
+# 이미 있는 지문을 찾을 때 한 번에 묻는 개수 (오래된 SQLite는 쿼리 하나에 값을 999개까지만 받습니다)
+LOOKUP_BATCH = 500
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class ImportFileError(Exception):
+    """파일 자체를 읽을 수 없거나 헤더가 잘못되었을 때 발생합니다."""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    # 지문이 같은 줄이 이미 DB에 있어서 건너뛴 수
+    existing: int = 0
+    # (엑셀 줄 번호, 오류 메시지) 목록
+    errors: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        text = value.strip().replace('.', '-').replace('/', '-')
+        return datetime.date.fromisoformat(text[:10])
+    raise ValueError(f"날짜 형식이 아닙니다: {value!r}")
+
+
+def _to_amount(value):
+    if isinstance(value, bool):
+        raise ValueError(f"금액이 숫자가 아닙니다: {value!r}")
+    if isinstance(value, (int, float)):
+        if value != int(value):
+            raise ValueError(f"금액은 정수여야 합니다: {value!r}")
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip().replace(',', '').replace('원', ''))
+    raise ValueError(f"금액이 숫자가 아닙니다: {value!r}")
+
+
+def _to_text(value, label, max_length):
+    text = '' if value is None else str(value).strip()
+    if not text:
+        raise ValueError(f"{label}이(가) 비어 있습니다.")
+    if len(text) > max_length:
+        raise ValueError(f"{label}은(는) {max_length}자 이하여야 합니다.")
+    return text
+
+
+def convert_row(values):
+    """엑셀 한 줄(열 이름 -> 값 dict)을 검사하고 FinancialTransaction 객체로 바꿉니다. 잘못되면 ValueError."""
+    type_code = TYPE_LABELS.get(str(values['구분']).strip() if values['구분'] is not None else '')
+    if type_code is None:
+        raise ValueError(f"구분은 '수입' 또는 '지출'이어야 합니다: {values['구분']!r}")
+    return FinancialTransaction(
+        transaction_date=_to_date(values['날짜']),
+        type=type_code,
+        category=_to_text(values['부서'], '부서', 50),
+        description=_to_text(values['내역'], '내역', 200),
+        amount=_to_amount(values['금액']),
+    )
+
+
+def _normalize(text):
+    # 보기에는 같지만 글자가 다른 경우(맥의 한글 자모 분리, 전각 문자, 대소문자, 띄어쓰기)를 같게 맞춥니다.
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def _fingerprint_text(transaction_date, type_code, category, description, amount):
+    return '\x1f'.join([transaction_date.isoformat(), type_code, _normalize(category), _normalize(description), str(int(amount))])
+
+
+def row_fingerprint(transaction_date, type_code, category, description, amount, occurrence=1):
+    """
+    재정 내역 한 줄의 지문(32자리 16진수)을 만듭니다.
+
+    occurrence는 같은 파일 안에서 모든 값이 똑같은 줄이 몇 번째로 나왔는지입니다.
+    같은 날 같은 금액의 헌금이 두 번 있어도 1번, 2번으로 지문이 달라서 둘 다 저장되고,
+    날짜가 지문에 들어가므로 그 날짜가 들어 있는 다른 파일에서도 같은 번호가 붙습니다.
+    """
+    return _hash(_fingerprint_text(transaction_date, type_code, category, description, amount), occurrence)
+
+
+def _hash(text, occurrence):
+    return hashlib.sha256(f'{text}\x1f{occurrence}'.encode()).hexdigest()[:32]
+
+
+class Fingerprinter:
+    """파일을 읽는 동안 같은 줄이 몇 번째인지 세어 가며 tx.fingerprint를 채웁니다."""
+
+    def __init__(self):
+        self.seen = {}
+
+    def __call__(self, tx):
+        text = _fingerprint_text(tx.transaction_date, tx.type, tx.category, tx.description, tx.amount)
+        self.seen[text] = occurrence = self.seen.get(text, 0) + 1
+        tx.fingerprint = _hash(text, occurrence)
+        return tx
+
+
+def existing_fingerprints(fingerprints):
+    """DB에 이미 있는 지문만 골라 set으로 돌려줍니다. (unique 색인만 읽으므로 빠릅니다)"""
+    found = set()
+    for start in range(0, len(fingerprints), LOOKUP_BATCH):
+        batch = fingerprints[start:start + LOOKUP_BATCH]
+        found.update(FinancialTransaction.objects.filter(fingerprint__in=batch).values_list('fingerprint', flat=True))
+    return found
+
+
+def iter_rows(file):
+    """엑셀 파일을 한 줄씩 읽어 (줄 번호, 열 이름 -> 값 dict)를 돌려줍니다. 빈 줄은 건너뜁니다."""
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFileError(f"엑셀 파일을 열 수 없습니다: {e}") from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        positions = {str(name).strip(): idx for idx, name in enumerate(header) if name is not None}
+        missing = [name for name in COLUMNS if name not in positions]
+        if missing:
+            raise ImportFileError(f"헤더에 다음 열이 없습니다: {', '.join(missing)}")
+        columns = [(name, positions[name]) for name in COLUMNS]
+
+        for line, row in enumerate(rows, start=2):
+            if not row or all(v is None or v == '' for v in row):
+                continue
+            yield line, {name: (row[idx] if idx < len(row) else None) for name, idx in columns}
+    finally:
+        workbook.close()
+
+
+def row_count_hint(file):
+    """엑셀 파일의 데이터 줄 수(헤더 제외)를 대략 알려줍니다. 파일에 기록된 범위 정보만 읽으므로 빠릅니다. (진행률 표시용)"""
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file, read_only=True)
+    except Exception as e:
+        raise ImportFileError(f"엑셀 파일을 열 수 없습니다: {e}") from e
+    try:
+        max_row = workbook.active.max_row
+    finally:
+        workbook.close()
+    return max(0, max_row - 1) if max_row else None
+
+
+def validate_rows(file, progress=None, chunk_size=CHUNK_SIZE):
+    """
+    저장하지 않고 모든 줄을 검사해서 [(줄 번호, 오류 메시지), ...]를 돌려줍니다.
+    progress(지금까지 검사한 줄 수)가 있으면 chunk_size줄마다 부릅니다.
+    """
+    errors, count = [], 0
+    for line, values in iter_rows(file):
+        try:
+            convert_row(values)
+        except (ValueError, TypeError) as e:
+            errors.append((line, str(e)))
+        count += 1
+        if progress and count % chunk_size == 0:
+            progress(count)
+    if progress:
+        progress(count)
+    return errors
+
+
+def import_transactions(file, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    엑셀 파일의 재정 내역을 chunk_size줄씩 검사해서 bulk_create로 저장합니다.
+    progress(지금까지 저장을 시도한 줄 수)가 있으면 한 묶음을 저장할 때마다 부릅니다. (트랜잭션 안에서 불림)
+
+    지문이 같은 줄이 이미 있으면 건너뛰고 result.existing에 셉니다. (다시 올려도 두 번 저장되지 않음)
+    한 줄이라도 잘못되면 전체를 되돌리고(rollback), 어떤 줄이 왜 잘못됐는지 result.errors에 담아 돌려줍니다.
+    """
+    result = ImportResult()
+    chunk = []
+    fingerprint = Fingerprinter()
+    # 월별 합계표에 더할 양을 모아 두었다가 마지막에 한 번에 반영합니다. (bulk_create는 신호를 보내지 않음)
+    deltas = {}
+
+    def save(chunk):
+        nonlocal deltas
+        existing = existing_fingerprints([tx.fingerprint for tx in chunk])
+        new = [tx for tx in chunk if tx.fingerprint not in existing]
+        while new:
+            try:
+                # savepoint 안에서 저장해서, 실패하면 이 묶음만 되돌리고 다시 시도할 수 있게 합니다.
+                with transaction.atomic():
+                    FinancialTransaction.objects.bulk_create(new)
+                break
+            except IntegrityError:
+                # 그 사이 다른 작업이 같은 줄을 먼저 저장했습니다. 지문을 다시 확인해서 정말 새 줄만 다시 저장합니다.
+                # (ignore_conflicts로 건너뛰면 어떤 줄이 빠졌는지 알 수 없어 건수와 월별 합계가 틀어집니다)
+                taken = existing_fingerprints([tx.fingerprint for tx in new])
+                if not taken:
+                    raise
+                new = [tx for tx in new if tx.fingerprint not in taken]
+        deltas = merge_deltas(deltas, collect_deltas(new))
+        result.created += len(new)
+        result.existing += len(chunk) - len(new)
+        if progress:
+            progress(result.created + result.existing)
+
+    with transaction.atomic():
+        for line, values in iter_rows(file):
+            try:
+                tx = fingerprint(convert_row(values))
+            except (ValueError, TypeError) as e:
+                result.errors.append((line, str(e)))
+                continue
+            # 이미 오류가 나온 뒤에는 저장하지 않고 나머지 줄의 검사만 계속합니다.
+            if result.errors:
+                continue
+            chunk.append(tx)
+            if len(chunk) >= chunk_size:
+                save(chunk)
+                chunk = []
+
+        if result.errors:
+            transaction.set_rollback(True)
+            result.created = result.existing = 0
+        elif chunk:
+            save(chunk)
+        if result.created:
+            apply_deltas(deltas)
+            # bulk_create는 post_save 신호를 보내지 않으므로 메인 화면 캐시를 직접 무효화합니다.
+            bump_version(FinancialTransaction)
+    return result
+
+
+# ----------------------------------------------------------------------------------------
+# 내보내기
+# ----------------------------------------------------------------------------------------
+def iter_export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """모델 객체를 만들지 않고(values_list) chunk 단위로 DB에서 꺼내 엑셀 한 줄(list)씩 돌려줍니다."""
+    labels = dict(FinancialTransaction.TYPE_CHOICES)
+    rows = (
+        queryset.order_by('transaction_date', 'id')
+        .values_list('transaction_date', 'type', 'category', 'description', 'amount')
+        .iterator(chunk_size=chunk_size)
+    )
+    for transaction_date, type_code, category, description, amount in rows:
+        yield [transaction_date, labels.get(type_code, type_code), category, description, amount]
+
+
+def iter_csv(queryset, chunk_size=CHUNK_SIZE):
+    # 엑셀에서 한글이 깨지지 않도록 맨 앞에 BOM을 붙이고, chunk_size줄씩 묶어서 내보냅니다.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(list(COLUMNS))
+    for count, row in enumerate(iter_export_rows(queryset, chunk_size), start=1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_xlsx(queryset, file, chunk_size=CHUNK_SIZE):
+    # write-only 모드는 줄을 쓰는 즉시 디스크로 내보내기 때문에 행 수가 많아도 메모리가 늘지 않습니다.
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('재정 내역')
+    sheet.append(list(COLUMNS))
+    for row in iter_export_rows(queryset, chunk_size):
+        sheet.append(row)
+    workbook.save(file)
+
+
+def export_response(queryset, file_format='xlsx', filename='financial_report'):
+    """queryset을 CSV 또는 XLSX 파일로 내려주는 스트리밍 응답을 만듭니다."""
+    if file_format == 'csv':
+        response = StreamingHttpResponse(iter_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename={filename}.csv'
+        return response
+
+    # XLSX는 zip 형식이라 openpyxl이 끝까지 써야 완성되므로 임시 파일에 쓴 뒤, 그 파일을 조금씩 읽어 보냅니다.
+    # (그래서 첫 바이트는 파일이 다 만들어진 뒤에 나갑니다. 행이 아주 많으면 처음부터 바로 흘려 보내는 CSV를 쓰세요)
+    tmp = tempfile.TemporaryFile()
+    write_xlsx(queryset, tmp)
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=f'{filename}.xlsx', content_type=XLSX_CONTENT_TYPE)
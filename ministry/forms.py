@@ -1,9 +1,52 @@
 from django import forms
-from .models import ChurchReview
+from .models import ChurchReview, FinancialTransaction
 
 class ExcelUploadForm(forms.Form):
     excel_file = forms.FileField(label="엑셀 파일 선택")
 
+class DateRangeForm(forms.Form):
+    # 비워둔 조건은 '전체'로 간주합니다.
+    start_date = forms.DateField(label="시작일", required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label="종료일", required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_field = 'transaction_date'
+
+    def filter(self, queryset):
+        data = self.cleaned_data
+        if data['start_date']:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': data['start_date']})
+        if data['end_date']:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': data['end_date']})
+        return queryset
+
+class LedgerFilterForm(DateRangeForm):
+    type = forms.ChoiceField(label="구분", required=False, choices=(('', '전체'),) + FinancialTransaction.TYPE_CHOICES)
+    category = forms.CharField(label="부서/항목", required=False, max_length=50)
+
+    def filter(self, queryset):
+        queryset = super().filter(queryset)
+        data = self.cleaned_data
+        if data['type']:
+            queryset = queryset.filter(type=data['type'])
+        if data['category']:
+            queryset = queryset.filter(category=data['category'])
+        return queryset
+
+class LedgerExportForm(LedgerFilterForm):
+    file_format = forms.ChoiceField(label="파일 형식", choices=(('xlsx', '엑셀(XLSX)'), ('csv', 'CSV')),
+                                    help_text="기간이 길어 내역이 아주 많으면 CSV를 고르세요. 엑셀 파일은 다 만든 뒤에야 내려받기가 시작됩니다.")
+
+# ---- 공개 API(api.py)의 조회 조건 ----
+class ApiOptionsForm(forms.Form):
+    cursor = forms.CharField(required=False)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=1000)
+    format = forms.ChoiceField(required=False, choices=(('', 'json'), ('json', 'json'), ('ndjson', 'ndjson')))
+
+class TransactionApiForm(LedgerFilterForm, ApiOptionsForm):
+    pass
+
+class WeeklyReportApiForm(DateRangeForm, ApiOptionsForm):
+    date_field = 'date'
+
 class ReviewForm(forms.ModelForm):
     class Meta:
         model = ChurchReview
@@ -0,0 +1,94 @@
+"""
+images.py는 메인 슬라이드 사진을 화면 크기별로 작게 줄인 WebP/AVIF 사본(derivative)을 만드는 곳입니다.
+
+원본 PNG는 한 장에 수백 KB라서 휴대폰에서도 그대로 받으면 첫 화면이 늦게 뜹니다.
+폭(width)별 사본을 만들어 두면 브라우저가 srcset을 보고 자기 화면에 맞는 크기만 받아갑니다.
+그리고 아주 작게 흐린 미리보기(LQIP)를 data URI로 넣어서, 사진이 오기 전에도 빈 화면 대신 색감이 보이게 합니다.
+
+Pillow는 사진을 올릴 때만 필요하므로 각 함수 안에서 불러옵니다. (서버 시작 시간을 줄이기 위해)
+"""
+import base64
+import io
+
+from django.core.files.base import ContentFile
+
+WIDTHS = (480, 960, 1440, 1920)
+PLACEHOLDER_WIDTH = 24
+# (MIME 타입, 확장자, 저장 옵션) - AVIF는 Pillow가 지원할 때만 만듭니다.
+FORMATS = (
+    ('image/avif', 'avif', {'quality': 50}),
+    ('image/webp', 'webp', {'quality': 75, 'method': 6}),
+)
+
+
+def available_formats():
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if features.check(fmt[1])]
+
+
+def _open(source):
+    from PIL import Image, ImageOps
+
+    image = Image.open(source)
+    image = ImageOps.exif_transpose(image)  # 휴대폰 사진의 회전 정보를 반영
+    return image.convert('RGB')
+
+
+def _encode(image, ext, options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=ext.upper(), **options)
+    return buffer.getvalue()
+
+
+def placeholder(image):
+    # 24px짜리 흐린 사진을 base64로 인코딩해 HTML 안에 바로 넣을 수 있게 합니다. (보통 1KB 미만)
+    from PIL import Image, ImageFilter
+
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    tiny = image.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS).filter(ImageFilter.GaussianBlur(1))
+    data = _encode(tiny, 'webp', {'quality': 40})
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode('ascii')
+
+
+def build_variants(source, stem, save):
+    """
+    원본 사진(source)으로 폭별 WebP/AVIF 사본과 흐린 미리보기를 만들고, 정보를 dict로 돌려줍니다.
+
+    save(파일 이름, 바이트)는 사본을 저장하고 그 URL을 돌려주는 함수입니다. (업로드 저장소에 따라 다름)
+    돌려주는 dict는 템플릿의 <picture> 태그에서 그대로 씁니다.
+    """
+    from PIL import Image
+
+    image = _open(source)
+    # 원본보다 작은 폭들 + (원본 폭과 최대 폭 중 작은 것). 원본이 최대 폭보다 넓어도 같은 폭이 두 번 들어가지 않게 set으로 모읍니다.
+    widths = sorted({w for w in WIDTHS if w < image.width} | {min(image.width, WIDTHS[-1])})
+    srcsets = {}
+    fallback = None
+    for mime, ext, options in available_formats():
+        entries = []
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            url = save(f'{stem}-{width}.{ext}', _encode(resized, ext, options))
+            entries.append(f'{url} {width}w')
+            if ext == 'webp':
+                fallback = url
+        srcsets[mime] = ', '.join(entries)
+    return {
+        'width': image.width,
+        'height': image.height,
+        'placeholder': placeholder(image),
+        'sources': [{'type': mime, 'srcset': srcset} for mime, srcset in srcsets.items()],
+        'fallback': fallback,
+    }
+
+
+def storage_saver(storage, directory):
+    # 업로드 저장소(FileSystemStorage, S3 등)에 사본을 쓰는 save 함수를 만듭니다.
+    def save(name, data):
+        path = f'{directory}/{name}'
+        if storage.exists(path):
+            storage.delete(path)
+        return storage.url(storage.save(path, ContentFile(data)))
+    return save
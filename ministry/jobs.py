@@ -0,0 +1,154 @@
+"""
+jobs.py는 관리자가 올린 엑셀 가져오기 작업(ImportJob)을 웹 요청 밖에서 처리하는 곳입니다.
+
+큰 엑셀 파일을 관리자 화면의 POST 요청 안에서 처리하면 gunicorn/Vercel의 시간 제한에 걸리고,
+그동안 웹 서버 하나가 꼼짝 못 합니다. 그래서 업로드는 파일만 저장하고 바로 끝내고,
+`python manage.py run_import_jobs`가 작업을 하나씩 꺼내 두 단계로 처리합니다.
+
+1. 검사: 저장하지 않고 모든 줄을 검사합니다. CHUNK_SIZE줄마다 진행 상황을 DB에 적어 두므로
+   관리자 화면이 htmx로 몇 초마다 진행률을 받아 갈 수 있습니다.
+2. 저장: 오류가 하나도 없을 때만 excel.import_transactions로 한 트랜잭션 안에서 저장합니다.
+   (예전처럼 잘못된 줄이 있으면 아무것도 저장되지 않습니다)
+   이미 저장된 줄(지문이 같은 줄)은 건너뛰므로, 같은 파일을 다시 올려도 내역이 두 배가 되지 않습니다.
+
+처리기가 작업 도중에 죽으면(배포, 서버 재시작 등) 작업이 '검사 중/저장 중'으로 멈춰 있게 됩니다.
+처리기는 진행할 때마다(저장 단계에서는 묶음 사이에 HEARTBEAT_INTERVAL마다) heartbeat_at을 적어 두고,
+다음 작업을 꺼낼 때 STALE_AFTER보다 오래 소식이 없는 작업을 실패로 돌려 둡니다.
+(같은 파일을 다시 올리면 이미 저장된 줄은 건너뛰므로 안전합니다)
+"""
+import datetime
+import logging
+import threading
+import time
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .excel import CHUNK_SIZE, ImportFileError, import_transactions, row_count_hint, validate_rows
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+# 관리자 화면에 보여줄 오류 줄 수 (전체 개수는 error_count에 따로 저장)
+MAX_STORED_ERRORS = 100
+# 이 시간 동안 진행 소식이 없는 작업은 처리기가 죽은 것으로 봅니다.
+STALE_AFTER = datetime.timedelta(minutes=30)
+# 저장 단계에서 heartbeat_at을 적는 간격(초). 묶음마다 적으면 스레드를 너무 자주 띄우므로 이 간격으로 줄입니다.
+HEARTBEAT_INTERVAL = 60
+
+
+def fail_stale_jobs(now=None):
+    """'검사 중/저장 중'인 채로 STALE_AFTER보다 오래 멈춘 작업을 실패로 바꾸고, 바꾼 개수를 돌려줍니다."""
+    now = now or timezone.now()
+    stale = (
+        ImportJob.objects.filter(status__in=[ImportJob.VALIDATING, ImportJob.SAVING])
+        .filter(Q(heartbeat_at__lt=now - STALE_AFTER) | Q(heartbeat_at__isnull=True))
+    )
+    return stale.update(
+        status=ImportJob.FAILED, finished_at=now,
+        message="처리기가 작업 도중 멈춰서 중단되었습니다. 파일을 다시 올려 주세요. (이미 저장된 줄은 건너뜁니다)",
+    )
+
+
+def claim_next_job():
+    """
+    가장 오래 기다린 작업을 '검사 중'으로 바꾸고 돌려줍니다. 없으면 None.
+
+    처리기를 여러 개 띄워도 같은 작업을 두 번 맡지 않도록, 상태가 아직 '대기 중'일 때만 바꿉니다.
+    그 전에 멈춘 작업을 정리해서, 관리자 화면이 끝나지 않는 작업의 진행률을 계속 묻지 않게 합니다.
+    """
+    fail_stale_jobs()
+    for pk in ImportJob.objects.filter(status=ImportJob.PENDING).order_by('created_at').values_list('pk', flat=True)[:10]:
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(pk=pk, status=ImportJob.PENDING).update(
+            status=ImportJob.VALIDATING, started_at=now, heartbeat_at=now)
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def touch_heartbeat(job_pk):
+    """
+    트랜잭션 밖에서 heartbeat_at을 적습니다.
+
+    저장 단계는 한 트랜잭션 안이라, 같은 DB 연결로 적으면 저장이 끝날 때까지 다른 처리기에 보이지 않습니다.
+    DB 연결은 스레드마다 따로이므로 잠깐 다른 스레드를 띄워 거기서 적으면 바로 커밋됩니다.
+    """
+    def beat():
+        try:
+            ImportJob.objects.filter(pk=job_pk).update(heartbeat_at=timezone.now())
+        except DatabaseError:
+            # SQLite는 저장 중인 트랜잭션이 파일 전체를 잠가서 못 적을 수 있습니다. (처리기를 여러 개 띄우지 않는 환경)
+            logger.warning("엑셀 가져오기 작업 %s의 heartbeat를 적지 못했습니다.", job_pk, exc_info=True)
+        finally:
+            connections.close_all()  # 이 스레드의 연결만 닫습니다.
+
+    thread = threading.Thread(target=beat)
+    thread.start()
+    thread.join()
+
+
+def _finish(job, status, **fields):
+    """
+    작업을 끝난 상태로 바꿉니다. 그 사이 다른 처리기가 상태를 바꿨으면(멈춘 작업으로 보고 실패 처리 등) 덮어쓰지 않습니다.
+    """
+    fields.update(status=status, finished_at=timezone.now())
+    if ImportJob.objects.filter(pk=job.pk, status=job.status).update(**fields):
+        for name, value in fields.items():
+            setattr(job, name, value)
+    else:
+        logger.warning("엑셀 가져오기 작업 %s의 상태가 처리 중에 바뀌어 결과(%s)를 적지 않았습니다.", job.pk, status)
+        job.refresh_from_db()
+
+
+def process_job(job, chunk_size=CHUNK_SIZE):
+    """작업 하나를 검사하고, 오류가 없으면 저장합니다. 끝나면 job.status가 DONE 또는 FAILED가 됩니다."""
+    def progress(count):
+        ImportJob.objects.filter(pk=job.pk).update(rows_processed=count, heartbeat_at=timezone.now())
+
+    last_beat = time.monotonic()
+
+    def heartbeat(count):
+        nonlocal last_beat
+        if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL:
+            touch_heartbeat(job.pk)
+            last_beat = time.monotonic()
+
+    try:
+        with job.file.open('rb') as file:
+            job.total_rows = row_count_hint(file)
+            job.save(update_fields=['total_rows'])
+
+            file.seek(0)
+            errors = validate_rows(file, progress=progress, chunk_size=chunk_size)
+            job.refresh_from_db(fields=['rows_processed'])
+            if errors:
+                _finish(job, ImportJob.FAILED, errors=errors[:MAX_STORED_ERRORS], error_count=len(errors),
+                        message=f"{len(errors)}개 줄에 오류가 있어 아무것도 저장하지 않았습니다.")
+                return job
+
+            if not ImportJob.objects.filter(pk=job.pk, status=job.status).update(status=ImportJob.SAVING, heartbeat_at=timezone.now()):
+                job.refresh_from_db()  # 그 사이 다른 처리기가 멈춘 작업으로 보고 실패 처리했습니다.
+                return job
+            job.status, last_beat = ImportJob.SAVING, time.monotonic()
+            file.seek(0)
+            result = import_transactions(file, chunk_size=chunk_size, progress=heartbeat)
+    except ImportFileError as e:
+        _finish(job, ImportJob.FAILED, message=str(e))
+        return job
+    except Exception as e:
+        # 예상하지 못한 오류도 작업에 기록해 두고, 처리기는 다음 작업을 계속합니다.
+        logger.exception("엑셀 가져오기 작업 %s 처리 중 오류", job.pk)
+        _finish(job, ImportJob.FAILED, message=f"처리 중 오류가 났습니다: {e}")
+        return job
+
+    if not result.ok:
+        _finish(job, ImportJob.FAILED, errors=result.errors[:MAX_STORED_ERRORS], error_count=len(result.errors),
+                message="저장하는 중에 잘못된 줄이 발견되어 아무것도 저장하지 않았습니다.")
+    else:
+        message = f"{result.created}건 등록 완료"
+        if result.existing:
+            message += f" (이미 있던 {result.existing}건은 건너뜀)"
+        _finish(job, ImportJob.DONE, created_count=result.created, existing_count=result.existing, message=message)
+    return job
+
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+
+from ministry.models import FinancialTransaction
+
+from .bench_suite import percentile
+
+MODES = (('동기(WSGI) home', 'sync', '0'), ('비동기(ASGI) home_async', 'async', '1'))
+
+
+class Command(BaseCommand):
+    help = (
+        "메인 화면을 동기 뷰(home, 스레드 여러 개)와 비동기 뷰(home_async, 이벤트 루프 하나)로 "
+        "같은 수의 동시 접속자가 계속 요청하게 해서 p50/p99 응답 시간과 처리량을 비교합니다. "
+        "--cold를 주면 구역 캐시를 끄고 매번 모든 구역을 DB에서 다시 그립니다. (비동기 뷰가 차이를 내는 경우) "
+        "GET만 보내므로 데이터는 바뀌지 않습니다. 먼저 측정용 DB에 `seed_bench_data`로 데이터를 만들어 두세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help="모드별 전체 요청 수")
+        parser.add_argument('--concurrency', type=int, default=16, help="동시 접속자 수")
+        parser.add_argument('--cold', action='store_true', help="구역 캐시 없이 측정합니다.")
+        # 아래 옵션은 내부용입니다. (측정 대상 프로세스로 실행될 때)
+        parser.add_argument('--worker', choices=('sync', 'async'), help="(내부용)")
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.run_worker(options['worker'], options['requests'], options['concurrency'], options['cold'])
+            return
+        if not FinancialTransaction.objects.exists():
+            raise CommandError("측정할 데이터가 없습니다. 먼저 `python manage.py seed_bench_data`를 실행하세요.")
+
+        # 주소('/')가 어느 뷰로 연결될지는 시작할 때 정해지므로, 모드마다 따로 프로세스를 띄웁니다.
+        results = {}
+        for label, mode, flag in MODES:
+            args = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'bench_async_dashboard',
+                    '--worker', mode, '--requests', str(options['requests']), '--concurrency', str(options['concurrency'])]
+            if options['cold']:
+                args.append('--cold')
+            worker = subprocess.run(args, env={**os.environ, 'ASYNC_DASHBOARD': flag}, stdout=subprocess.PIPE, text=True)
+            if worker.returncode:
+                raise CommandError(f"{label} 측정에 실패했습니다.")
+            results[label] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(f"동시 접속 {options['concurrency']}명, 요청 {options['requests']}개, "
+                          f"구역 캐시 {'끔' if options['cold'] else '켬'}")
+        self.stdout.write(f"{'':<26}{'p50':>10}{'p99':>10}{'처리량':>12}")
+        for label, result in results.items():
+            self.stdout.write(f"{label:<26}{result['p50_ms']:>8.1f}ms{result['p99_ms']:>8.1f}ms{result['rps']:>9.0f}건/초")
+
+    # ---- 측정 대상 프로세스 ----
+    def run_worker(self, mode, requests, concurrency, cold):
+        per_client = max(1, requests // concurrency)
+        overrides = {}
+        if cold:
+            overrides = {'CACHES': {**settings.CACHES, 'bench-cold': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+                         'DASHBOARD_CACHE_ALIAS': 'bench-cold'}
+        with override_settings(**overrides):
+            load = self.async_load if mode == 'async' else self.sync_load
+            # 첫 요청은 템플릿 읽기, DB 연결 등 준비 시간이 섞이므로 한 번씩 미리 보내 둡니다.
+            load(1, 1)
+            started = time.perf_counter()
+            timings = sorted(load(concurrency, per_client))
+            elapsed = time.perf_counter() - started
+        self.stdout.write(json.dumps({
+            'p50_ms': round(percentile(timings, 0.5), 2), 'p99_ms': round(percentile(timings, 0.99), 2),
+            'rps': round(len(timings) / elapsed, 1),
+        }))
+
+    def sync_load(self, concurrency, per_client):
+        # gunicorn의 스레드 워커처럼, 접속자마다 스레드 하나가 요청을 보내고 응답을 기다리기를 반복합니다.
+        def visitor(_):
+            client, timings = Client(), []
+            for _ in range(per_client):
+                started = time.perf_counter()
+                self.expect_ok(client.get('/'))
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            return [ms for timings in pool.map(visitor, range(concurrency)) for ms in timings]
+
+    def async_load(self, concurrency, per_client):
+        # ASGI 서버처럼, 이벤트 루프 하나에서 접속자 수만큼의 요청이 동시에 진행됩니다.
+        async def visitor():
+            client, timings = AsyncClient(), []
+            for _ in range(per_client):
+                started = time.perf_counter()
+                self.expect_ok(await client.get('/'))
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings
+
+        async def run():
+            return await asyncio.gather(*(visitor() for _ in range(concurrency)))
+
+        return [ms for timings in asyncio.run(run()) for ms in timings]
+
+    def expect_ok(self, response):
+        if response.status_code != 200:
+            raise CommandError(f"메인 화면 응답이 {response.status_code}입니다.")
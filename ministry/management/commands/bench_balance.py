@@ -0,0 +1,56 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ministry.models import FinancialTransaction
+from ministry.pagination import encode_cursor
+from ministry.rollups import rebuild_rollups
+from ministry.views import TX_ORDERING, transaction_page
+
+
+class Command(BaseCommand):
+    help = "가짜 재정 내역(기본 20만 건)으로 잔액(창 함수) 계산이 페이지 깊이에 상관없이 빠른지 측정합니다. 측정 후 데이터는 되돌립니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['rows'])
+            for label, offset in (('첫 페이지', None), ('중간', options['rows'] // 2), ('마지막 근처', options['rows'] - 20)):
+                cursor = self.cursor_at(offset)
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    page = transaction_page(cursor)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(f"{label:>8}: 중앙값 {timings[len(timings) // 2]:.1f}ms, 최대 {timings[-1]:.1f}ms (잔액 {page[0].balance})")
+
+            # 비교용: 파이썬으로 앞의 내역을 전부 읽어 더하는 방식
+            started = time.perf_counter()
+            sum(tx.amount if tx.type == 'IN' else -tx.amount for tx in FinancialTransaction.objects.only('type', 'amount'))
+            self.stdout.write(f"파이썬 전체 합산(비교용): {(time.perf_counter() - started) * 1000:.1f}ms")
+            transaction.set_rollback(True)
+
+    def seed(self, rows):
+        started = time.perf_counter()
+        start = datetime.date(2015, 1, 4)
+        FinancialTransaction.objects.bulk_create((
+            FinancialTransaction(transaction_date=start + datetime.timedelta(days=i * 3650 // rows), type='OUT' if i % 3 == 0 else 'IN',
+                                 category=random.choice(['주일헌금', '십일조', '선교부', '관리비']), description=f'내역 {i}',
+                                 amount=random.randint(1, 500) * 1000)
+            for i in range(rows)
+        ), batch_size=5000)
+        rebuild_rollups()
+        self.stdout.write(f"{rows}건 생성: {time.perf_counter() - started:.1f}초")
+
+    def cursor_at(self, offset):
+        if offset is None:
+            return None
+        fields = [field.lstrip('-') for field in TX_ORDERING]
+        return encode_cursor(FinancialTransaction.objects.order_by(*TX_ORDERING).values_list(*fields)[offset])
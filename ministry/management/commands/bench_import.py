@@ -0,0 +1,64 @@
+import datetime
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from openpyxl import Workbook
+
+from ministry.excel import import_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "가짜 재정 엑셀 파일(기본 10만 줄)을 만들어 업로드 속도(초당 줄 수)를 측정하고, "
+        "같은 파일을 한 번 더 올려서 이미 있는 줄을 건너뛰는 속도도 잽니다. 측정 후 데이터는 되돌립니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as tmp:
+            started = time.perf_counter()
+            write_sample_workbook(tmp.name, rows)
+            self.stdout.write(f"엑셀 생성: {rows}줄, {time.perf_counter() - started:.1f}초")
+
+            with transaction.atomic():
+                first, elapsed = self.timed_import(tmp.name, options['chunk_size'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"가져오기: {first.created}줄, 오류 {len(first.errors)}건, {elapsed:.1f}초 ({first.created / elapsed:,.0f}줄/초)"
+                ))
+                # 같은 파일을 다시 올리면 모든 줄이 지문 색인에서 걸러져야 합니다.
+                again, elapsed = self.timed_import(tmp.name, options['chunk_size'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"다시 가져오기: 새로 {again.created}줄, 이미 있음 {again.existing}줄, {elapsed:.1f}초 "
+                    f"({again.existing / elapsed:,.0f}줄/초)"
+                ))
+                transaction.set_rollback(True)  # 측정용이므로 DB에는 남기지 않습니다.
+
+    def timed_import(self, path, chunk_size):
+        started = time.perf_counter()
+        result = import_transactions(path, chunk_size=chunk_size)
+        return result, time.perf_counter() - started
+
+
+def write_sample_workbook(path, rows):
+    # write-only 모드로 한 줄씩 써서 큰 파일도 메모리를 적게 씁니다.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['날짜', '구분', '부서', '내역', '금액'])
+    start = datetime.date(2015, 1, 4)
+    categories = ['주일헌금', '십일조', '감사헌금', '선교부', '교육부', '관리비']
+    for i in range(rows):
+        sheet.append([
+            start + datetime.timedelta(days=i % 3650),
+            '수입' if i % 3 else '지출',
+            random.choice(categories),
+            f'내역 {i}',
+            random.randint(1, 500) * 1000,
+        ])
+    workbook.save(path)
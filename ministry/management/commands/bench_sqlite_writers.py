@@ -0,0 +1,90 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, transaction
+from django.utils import timezone
+
+from ministry.models import ChurchReview, FinancialTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "여러 프로세스가 동시에 리뷰 작성(단건 저장)과 관리자 수정(읽고 나서 쓰는 트랜잭션)을 하도록 해서, "
+        "기본 SQLite 설정과 SQLITE_TUNED=1 설정의 'database is locked' 오류 수와 처리량을 비교합니다. "
+        "임시 DB 파일을 쓰므로 실제 DB에는 영향이 없습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--ops', type=int, default=200, help="프로세스 하나가 실행할 작업 수")
+        # 아래 옵션은 내부용입니다. (측정 대상 프로세스로 실행될 때)
+        parser.add_argument('--worker', action='store_true', help="(내부용)")
+        parser.add_argument('--seed', type=int, default=0, help="(내부용)")
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.run_worker(options['ops'], options['seed'])
+            return
+
+        for label, tuned in (('기본 설정', '0'), ('SQLITE_TUNED=1', '1')):
+            with tempfile.TemporaryDirectory() as directory:
+                env = {
+                    **os.environ,
+                    'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}",
+                    'SQLITE_TUNED': tuned,
+                }
+                env.pop('REPLICA_DATABASE_URL', None)
+                self.manage(['migrate', '-v0'], env).wait()
+
+                started = time.perf_counter()
+                workers = [
+                    self.manage(['bench_sqlite_writers', '--worker', '--ops', str(options['ops']), '--seed', str(i)], env)
+                    for i in range(options['workers'])
+                ]
+                results = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+                elapsed = time.perf_counter() - started
+
+            ok = sum(r['ok'] for r in results)
+            locked = sum(r['locked'] for r in results)
+            self.stdout.write(
+                f"{label:>15}: 성공 {ok}건, 'database is locked' {locked}건, "
+                f"{elapsed:.1f}초 ({ok / elapsed:,.0f}건/초)"
+            )
+
+    def manage(self, args, env):
+        return subprocess.Popen(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *args],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+
+    def run_worker(self, ops, seed):
+        ok = locked = 0
+        today = datetime.date.today()
+        since = timezone.now() - datetime.timedelta(days=1)
+        for i in range(ops):
+            try:
+                if i % 2:
+                    # 메인 화면의 리뷰 작성과 같은 모양: 최근 리뷰 수 확인(읽기) 후 한 건 저장 (ratelimit.py)
+                    ip = f'10.0.{seed}.{i % 250}'
+                    if not ChurchReview.objects.filter(ip_address=ip, created_at__gte=since).count():
+                        ChurchReview.objects.create(author_name='bench', rating=5, content='bench', ip_address=ip)
+                else:
+                    # 관리자 화면 저장과 같은 모양: 트랜잭션 안에서 읽은 뒤 저장 (월별 합계표 갱신 포함)
+                    with transaction.atomic():
+                        FinancialTransaction.objects.filter(transaction_date=today).count()
+                        FinancialTransaction.objects.create(
+                            transaction_date=today, type='IN', category='bench', description=f'{seed}-{i}', amount=1000,
+                        )
+                ok += 1
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+        self.stdout.write(json.dumps({'ok': ok, 'locked': locked}))
@@ -0,0 +1,190 @@
+import json
+import os
+import platform
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Sum
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from ministry.cache import get_cache
+from ministry.excel import import_transactions, iter_csv, write_xlsx
+from ministry.models import ChurchReview, FinancialTransaction, LedgerRollup, NotionNotice
+from ministry.pagination import encode_cursor
+from ministry.views import NOTICE_ORDERING, REVIEW_ORDERING, TX_ORDERING
+
+from .bench_import import write_sample_workbook
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+# 측정값이 아주 작을 때(몇 ms) 생기는 흔들림은 무시합니다.
+LATENCY_SLACK_MS = 2.0
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "메인 화면, '더 보기' 조각, 검색, 관리자 목록의 응답 시간(p50/p95)과 쿼리 수, "
+        "엑셀 가져오기/내보내기 속도(줄/초)를 재고 저장된 기준값(baseline)과 비교합니다. "
+        "먼저 측정용 DB에 `seed_bench_data`로 데이터를 만들어 두세요. 측정 중 바뀐 데이터는 모두 되돌립니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--import-rows', type=int, default=20_000)
+        parser.add_argument('--export-rows', type=int, default=50_000)
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="기준값 파일 경로 (프로젝트 폴더 기준)")
+        parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 새 기준값으로 저장합니다.")
+        parser.add_argument('--tolerance', type=float, default=1.5, help="기준값보다 몇 배까지 느려져도 괜찮은지")
+
+    def handle(self, *args, **options):
+        if not FinancialTransaction.objects.exists():
+            raise CommandError("측정할 데이터가 없습니다. 먼저 `python manage.py seed_bench_data`를 실행하세요.")
+
+        results = {}
+        with transaction.atomic():
+            admin_user = User.objects.create_superuser('bench-admin', 'bench@example.com', None)
+            for name, url, options_ in self.cases():
+                results[name] = self.measure_view(url, options['repeat'], admin=admin_user if options_.get('admin') else None,
+                                                  cold=options_.get('cold', False))
+            results['import (rows/s)'] = self.measure_import(options['import_rows'])
+            results['export csv (rows/s)'] = self.measure_export('csv', options['export_rows'])
+            results['export xlsx (rows/s)'] = self.measure_export('xlsx', options['export_rows'])
+            transaction.set_rollback(True)
+
+        self.report(results)
+        path = os.path.join(settings.BASE_DIR, options['baseline'])
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'meta': self.meta(), 'results': results}, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"기준값을 저장했습니다: {options['baseline']}"))
+        elif os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                baseline = json.load(f)
+            self.compare(baseline, results, options['tolerance'])
+        else:
+            self.stdout.write(f"기준값 파일({options['baseline']})이 없습니다. --save-baseline으로 만들어 두세요.")
+
+    # ---- 측정 대상 ----
+    def cases(self):
+        return [
+            ('home (cold cache)', '/', {'cold': True}),
+            ('home (warm cache)', '/', {}),
+            ('partials/transactions (middle)', '/partials/transactions/?cursor=' + self.middle_cursor(FinancialTransaction, TX_ORDERING), {}),
+            ('partials/reviews (middle)', '/partials/reviews/?cursor=' + self.middle_cursor(ChurchReview, REVIEW_ORDERING), {}),
+            ('partials/notices (middle)', '/partials/notices/?cursor=' + self.middle_cursor(NotionNotice, NOTICE_ORDERING), {}),
+            ('partials/search', '/partials/search/?q=수련회+숙소', {}),
+            ('admin changelist', '/admin/ministry/financialtransaction/', {'admin': True}),
+            ('admin changelist search', '/admin/ministry/financialtransaction/?q=선교+후원', {'admin': True}),
+            ('admin changelist category', '/admin/ministry/financialtransaction/?' + urlencode({'category': self.busiest_category()}),
+             {'admin': True}),
+            ('admin changelist year', '/admin/ministry/financialtransaction/?transaction_date__year=' + self.latest_year(),
+             {'admin': True}),
+        ]
+
+    def busiest_category(self):
+        row = LedgerRollup.objects.values('category').annotate(n=Sum('count')).order_by('-n').first()
+        return row['category'] if row else ''
+
+    def latest_year(self):
+        latest = FinancialTransaction.objects.order_by('-transaction_date').values_list('transaction_date', flat=True).first()
+        return str(latest.year) if latest else ''
+
+    def middle_cursor(self, model, ordering):
+        count = model.objects.count()
+        if count < 2:
+            return ''
+        fields = [field.lstrip('-') for field in ordering]
+        return encode_cursor(model.objects.order_by(*ordering).values_list(*fields)[count // 2])
+
+    def measure_view(self, url, repeat, admin=None, cold=False):
+        client = Client()
+        if admin:
+            client.force_login(admin)
+        timings, queries = [], 0
+        for _ in range(repeat):
+            if cold:
+                get_cache().clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} 응답이 {response.status_code}입니다.")
+            queries = max(queries, len(captured))
+        timings.sort()
+        return {'p50_ms': round(percentile(timings, 0.5), 2), 'p95_ms': round(percentile(timings, 0.95), 2),
+                'max_ms': round(timings[-1], 2), 'queries': queries}
+
+    def measure_import(self, rows):
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as tmp:
+            write_sample_workbook(tmp.name, rows)
+            started = time.perf_counter()
+            with transaction.atomic():
+                result = import_transactions(tmp.name)
+                transaction.set_rollback(True)
+            elapsed = time.perf_counter() - started
+        if not result.ok:
+            raise CommandError(f"가져오기 오류: {result.errors[:3]}")
+        return {'rows_per_s': round(result.created / elapsed)}
+
+    def measure_export(self, file_format, rows):
+        first = FinancialTransaction.objects.order_by('id').values_list('id', flat=True).first()
+        queryset = FinancialTransaction.objects.filter(id__lt=first + rows)
+        count = queryset.count()
+        started = time.perf_counter()
+        if file_format == 'csv':
+            for _ in iter_csv(queryset):
+                pass
+        else:
+            with tempfile.TemporaryFile() as tmp:
+                write_xlsx(queryset, tmp)
+        return {'rows_per_s': round(count / (time.perf_counter() - started))}
+
+    # ---- 결과 출력/비교 ----
+    def meta(self):
+        return {
+            'python': platform.python_version(),
+            'database': connections['default'].vendor,
+            'rows': {model.__name__: model.objects.count() for model in (FinancialTransaction, ChurchReview, NotionNotice)},
+        }
+
+    def report(self, results):
+        self.stdout.write(f"{'측정 항목':<34}{'p50':>10}{'p95':>10}{'max':>10}{'쿼리':>6}")
+        for name, result in results.items():
+            if 'rows_per_s' in result:
+                self.stdout.write(f"{name:<34}{result['rows_per_s']:>30,}줄/초")
+            else:
+                self.stdout.write(
+                    f"{name:<34}{result['p50_ms']:>8.1f}ms{result['p95_ms']:>8.1f}ms{result['max_ms']:>8.1f}ms{result['queries']:>6}"
+                )
+
+    def compare(self, baseline, results, tolerance):
+        if baseline.get('meta', {}).get('rows') != self.meta()['rows']:
+            self.stdout.write(self.style.WARNING("기준값과 데이터 양이 다릅니다. 같은 seed_bench_data 옵션으로 만든 DB에서 비교하세요."))
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get('results', {}).get(name)
+            if base is None:
+                continue
+            if 'rows_per_s' in result:
+                if result['rows_per_s'] < base['rows_per_s'] / tolerance:
+                    regressions.append(f"{name}: {result['rows_per_s']:,}줄/초 (기준 {base['rows_per_s']:,})")
+                continue
+            if result['queries'] > base['queries']:
+                regressions.append(f"{name}: 쿼리 {result['queries']}개 (기준 {base['queries']}개)")
+            if result['p95_ms'] > base['p95_ms'] * tolerance + LATENCY_SLACK_MS:
+                regressions.append(f"{name}: p95 {result['p95_ms']:.1f}ms (기준 {base['p95_ms']:.1f}ms)")
+        if regressions:
+            raise CommandError("기준값보다 나빠졌습니다:\n" + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS("모든 항목이 기준값 범위 안에 있습니다."))
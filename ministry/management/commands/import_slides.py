@@ -0,0 +1,37 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from ministry.models import SlideImage
+from ministry.slides import CAPTIONS, static_slide_files
+
+
+class Command(BaseCommand):
+    help = (
+        "static/slides의 기존 사진과 문구를 SlideImage(관리자 화면의 '메인 슬라이드 사진')로 한 번 옮겨옵니다. "
+        "배포할 때 migrate 다음에 실행하세요. 이미 슬라이드가 있으면 아무것도 하지 않습니다. "
+        "(실행 전까지는 메인 화면이 static/slides의 원본 사진을 사본 없이 그대로 보여줍니다) "
+        "옮긴 사진은 업로드 저장소(/media/)에서 내려가므로, 배포에서는 업로드 파일을 내려주는 저장소를 설정하고 "
+        "MEDIA_SERVED=1을 켜야 메인 화면에 쓰입니다. (config/settings.py 참고)"
+    )
+
+    def handle(self, *args, **options):
+        if SlideImage.objects.exists():
+            self.stdout.write("이미 등록된 슬라이드가 있어서 건너뜁니다. (관리자 화면에서 관리하세요)")
+            return
+
+        slides_dir = os.path.join(settings.BASE_DIR, 'static', 'slides')
+        file_list = static_slide_files()
+        for idx, filename in enumerate(file_list):
+            slide = SlideImage(title=CAPTIONS[idx] if idx < len(CAPTIONS) else "", order=idx)
+            with open(os.path.join(slides_dir, filename), 'rb') as f:
+                # 저장하면 signals.py가 화면 크기별 사본도 함께 만듭니다.
+                slide.image.save(filename, File(f), save=False)
+                slide.save()
+            self.stdout.write(f"{filename} -> {slide.image.name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(file_list)}장의 슬라이드를 옮겨왔습니다."))
+        if not settings.MEDIA_SERVED:
+            self.stdout.write(self.style.WARNING(
+                "MEDIA_SERVED가 꺼져 있어서 메인 화면은 계속 static/slides의 기본 사진을 보여줍니다. (config/settings.py 참고)"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ministry.cache import bump_version
+from ministry.models import FinancialTransaction
+from ministry.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "재정 월별 합계표(LedgerRollup)를 전체 재정 내역에서 처음부터 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        bump_version(FinancialTransaction)
+        self.stdout.write(self.style.SUCCESS(f"월별 합계 {count}칸을 다시 계산했습니다."))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ministry.jobs import claim_next_job, process_job
+
+
+class Command(BaseCommand):
+    help = (
+        "관리자 화면에서 올린 엑셀 가져오기 작업을 차례로 처리합니다. "
+        "서버에서 계속 띄워 두거나(기본), 상시 실행이 어려운 환경(Vercel 등)에서는 cron으로 --once를 주기적으로 실행하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="기다리는 작업을 모두 처리하면 끝냅니다.")
+        parser.add_argument('--interval', type=float, default=2.0, help="작업이 없을 때 몇 초마다 다시 확인할지")
+
+    def handle(self, *args, **options):
+        while True:
+            # 오래 떠 있는 프로세스라서, 요청 처리 때처럼 끊기거나 오래된 DB 연결을 직접 정리합니다.
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+            self.stdout.write(f"작업 {job.pk} ({job.file.name}) 처리 시작")
+            job = process_job(job)
+            style = self.style.SUCCESS if job.status == job.DONE else self.style.ERROR
+            self.stdout.write(style(f"작업 {job.pk}: {job.get_status_display()} - {job.message}"))
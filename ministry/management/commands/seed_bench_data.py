@@ -0,0 +1,133 @@
+import contextlib
+import datetime
+import itertools
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ministry.cache import bump_version
+from ministry.models import ChurchReview, FinancialTransaction, NotionNotice, WeeklyReport
+from ministry.rollups import rebuild_rollups
+
+BATCH_SIZE = 5000
+SEED_MODELS = (WeeklyReport, FinancialTransaction, ChurchReview, NotionNotice)
+
+# 그럴듯한 가짜 데이터를 만들 때 쓰는 재료
+CATEGORIES = {
+    'IN': ['주일헌금', '십일조', '감사헌금', '선교헌금', '건축헌금'],
+    'OUT': ['선교부', '교육부', '관리비', '구제비', '예배부', '청년부'],
+}
+DESCRIPTIONS = {
+    'IN': ['주일 예배 헌금', '월 십일조', '부활절 감사헌금', '추수감사절 헌금', '선교 작정 헌금'],
+    'OUT': ['필리핀 선교 후원', '여름성경학교 간식', '전기요금', '수도요금', '이웃 돕기 쌀 구입', '수련회 숙소 예약'],
+}
+NAMES = ['김성도', '이집사', '박권사', '최청년', '정장로', '익명']
+REVIEWS = ['말씀이 큰 위로가 되었습니다.', '처음 왔는데 따뜻하게 맞아주셔서 감사해요.', '찬양이 은혜로웠습니다.', '주차 안내가 친절했어요.']
+NOTICE_TITLES = ['주보', '청년부 수련회 안내', '새가족 환영회', '성경공부 모집', '구역 예배 일정', '바자회 안내']
+
+
+@contextlib.contextmanager
+def manual_timestamps(model, name='created_at'):
+    # bulk_create는 auto_now_add 필드를 항상 '지금'으로 채우므로, 잠시 꺼서 과거 날짜를 넣을 수 있게 합니다.
+    field = model._meta.get_field(name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "성능 측정용 가짜 데이터(기본: 주간 보고 10년치, 재정 50만 건, 리뷰 5만 건, 공지 5천 건)를 만듭니다. "
+        "실제 DB가 아닌 측정용 DB에서 실행하세요. (예: DATABASE_URL=sqlite:////tmp/bench.sqlite3)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=500_000)
+        parser.add_argument('--reviews', type=int, default=50_000)
+        parser.add_argument('--notices', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=2026, help="같은 값이면 항상 같은 데이터를 만듭니다.")
+        parser.add_argument('--clear', action='store_true', help="기존 주간 보고/재정/리뷰/공지 데이터를 먼저 모두 지웁니다.")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        if not options['clear'] and any(model.objects.exists() for model in SEED_MODELS):
+            raise CommandError("이미 데이터가 있는 DB입니다. 측정용 DB를 따로 쓰거나 --clear로 먼저 지우세요.")
+
+        today = timezone.now().date()
+        start = today - datetime.timedelta(days=365 * options['years'])
+        days = (today - start).days
+
+        with transaction.atomic():
+            if options['clear']:
+                for model in SEED_MODELS:
+                    model.objects.all().delete()
+            self.timed('주간 보고', lambda: self.seed_reports(start, today))
+            self.timed('재정 내역', lambda: self.seed_transactions(options['transactions'], start, days))
+            self.timed('월별 합계표', rebuild_rollups)
+            self.timed('리뷰', lambda: self.seed_reviews(options['reviews'], start, days))
+            self.timed('공지', lambda: self.seed_notices(options['notices'], start, days))
+            # bulk_create는 신호를 보내지 않으므로 메인 화면 캐시를 직접 무효화합니다.
+            for model in SEED_MODELS:
+                bump_version(model)
+        self.stdout.write(self.style.SUCCESS("완료했습니다. `python manage.py bench_suite`로 측정해 보세요."))
+
+    def timed(self, label, fn):
+        started = time.perf_counter()
+        fn()
+        self.stdout.write(f"{label}: {time.perf_counter() - started:.1f}초")
+
+    def bulk(self, model, objects):
+        # 50만 개를 한 번에 만들면 메모리를 많이 쓰므로 BATCH_SIZE개씩 만들어 저장합니다.
+        objects = iter(objects)
+        while batch := list(itertools.islice(objects, BATCH_SIZE)):
+            model.objects.bulk_create(batch)
+
+    def seed_reports(self, start, today):
+        sunday = start + datetime.timedelta(days=(6 - start.weekday()) % 7)
+        reports = []
+        while sunday <= today:
+            attendance = random.randint(80, 160)
+            reports.append(WeeklyReport(
+                date=sunday, worship_attendance=attendance, new_comers=random.randint(0, 6),
+                offering_total=attendance * random.randint(20, 40) * 1000,
+            ))
+            sunday += datetime.timedelta(days=7)
+        self.bulk(WeeklyReport, reports)
+
+    def seed_transactions(self, count, start, days):
+        def rows():
+            for i in range(count):
+                type_code = 'OUT' if i % 3 == 0 else 'IN'
+                yield FinancialTransaction(
+                    transaction_date=start + datetime.timedelta(days=i * days // max(count, 1)),
+                    type=type_code, category=random.choice(CATEGORIES[type_code]),
+                    description=f"{random.choice(DESCRIPTIONS[type_code])} {i}", amount=random.randint(1, 500) * 1000,
+                )
+        self.bulk(FinancialTransaction, rows())
+
+    def seed_reviews(self, count, start, days):
+        with manual_timestamps(ChurchReview):
+            self.bulk(ChurchReview, (
+                ChurchReview(
+                    author_name=random.choice(NAMES), content=random.choice(REVIEWS), rating=random.randint(3, 5),
+                    ip_address=f'10.{i % 200}.{i // 200 % 250}.{i % 250}',
+                    created_at=datetime.datetime.combine(start, datetime.time(9)) + datetime.timedelta(minutes=i * days * 1440 // max(count, 1)),
+                )
+                for i in range(count)
+            ))
+
+    def seed_notices(self, count, start, days):
+        self.bulk(NotionNotice, (
+            NotionNotice(
+                notion_id=f'bench-{i}', title=f"{random.choice(NOTICE_TITLES)} #{i}", content=f"{random.choice(REVIEWS)} (공지 {i})",
+                date=start + datetime.timedelta(days=i * days // max(count, 1)),
+                files=[{'name': f'주보_{i}.pdf', 'url': f'https://example.com/bench/{i}.pdf'}] if i % 4 == 0 else [],
+            )
+            for i in range(count)
+        ))
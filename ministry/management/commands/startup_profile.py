@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 서버가 켜질 때(django.setup) 불러와지면 안 되는 무거운 라이브러리들
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'PIL.Image')
+
+# 새 파이썬 프로세스 안에서 실행할 코드: 시작 시간과 첫 요청 시간을 재서 JSON으로 출력합니다.
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_ms = (time.perf_counter() - started) * 1000
+heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+status, request_ms = None, None
+if URL:
+    from django.test import Client
+    started = time.perf_counter()
+    try:
+        status = Client(raise_request_exception=False).get(URL).status_code
+    except Exception as e:
+        status = repr(e)
+    request_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({'setup_ms': setup_ms, 'request_ms': request_ms, 'status': status, 'heavy': heavy}))
+"""
+
+
+def parse_importtime(stderr, top=10):
+    """-X importtime 출력에서 (누적 마이크로초, 모듈 이름)을 누적 시간이 긴 순서로 top개 돌려줍니다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # 들여쓰기가 없는 것이 직접 불러온 모듈입니다. (들여쓴 것은 그 안에서 딸려 온 모듈)
+        if not name[1:].startswith(' '):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def profile_startup(url='/', env=None, top=10):
+    """새 프로세스에서 django.setup()과 첫 요청을 실행하고 (측정 결과 dict, importtime 상위 top개 목록)을 돌려줍니다."""
+    script = f"HEAVY_MODULES = {HEAVY_MODULES!r}\nURL = {url!r}\n" + CHILD_SCRIPT
+    child_env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    child_env.update(env or {})
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=settings.BASE_DIR, env=child_env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise CommandError(f"측정 프로세스가 실패했습니다:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(proc.stderr, top=top)
+
+
+def find_problems(result, setup_budget, request_budget):
+    """측정 결과에서 실패로 볼 점들을 [메시지, ...]로 돌려줍니다. (빈 목록이면 통과)"""
+    problems = []
+    if result['heavy']:
+        problems.append(f"시작할 때 무거운 라이브러리를 불러왔습니다: {', '.join(result['heavy'])}")
+    if result['setup_ms'] > setup_budget:
+        problems.append(f"django.setup()이 예산({setup_budget:.0f}ms)을 넘었습니다.")
+    if result['request_ms'] is not None:
+        # 500 오류 페이지는 빨리 나와도 성공이 아닙니다. (예: 마이그레이션 안 된 DB) 2xx/3xx만 정상으로 봅니다.
+        status = result['status']
+        if not isinstance(status, int) or not 200 <= status < 400:
+            problems.append(f"첫 요청이 정상 응답하지 않았습니다: 상태 {status}")
+        if result['request_ms'] > request_budget:
+            problems.append(f"첫 요청이 예산({request_budget:.0f}ms)을 넘었습니다.")
+    return problems
+
+
+class Command(BaseCommand):
+    help = "서버 시작(django.setup)과 첫 요청에 걸리는 시간을 재고, 예산을 넘거나 첫 요청이 실패하거나 무거운 라이브러리를 미리 불러오면 실패합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/', help="첫 요청으로 보낼 주소 (빈 문자열이면 요청 생략)")
+        parser.add_argument('--setup-budget', type=float, default=800, help="django.setup() 허용 시간(ms)")
+        parser.add_argument('--request-budget', type=float, default=1500, help="첫 요청 허용 시간(ms)")
+        parser.add_argument('--top', type=int, default=10)
+
+    def handle(self, *args, **options):
+        result, imports = profile_startup(options['url'], top=options['top'])
+
+        self.stdout.write(f"django.setup(): {result['setup_ms']:.0f}ms")
+        if result['request_ms'] is not None:
+            self.stdout.write(f"첫 요청 {options['url']}: {result['request_ms']:.0f}ms (상태 {result['status']})")
+        self.stdout.write("불러오는 데 오래 걸린 모듈:")
+        for cumulative, name in imports:
+            self.stdout.write(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+        problems = find_problems(result, options['setup_budget'], options['request_budget'])
+        if problems:
+            raise CommandError('\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS("시작 시간 예산 안에 있습니다."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ministry.notion import NotionSyncError, sync_notion
+
+
+class Command(BaseCommand):
+    help = (
+        "노션 공지 데이터베이스를 NotionNotice 테이블로 동기화합니다. (기본: 바뀐 공지만 가져오는 증분 동기화) "
+        "노션에서 지운 공지는 증분 동기화로 알 수 없으므로, cron으로 하루 한 번 --full도 실행하세요. (ministry/notion.py 참고)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="전체를 다시 훑고 노션에서 사라진 공지도 삭제합니다.")
+
+    def handle(self, *args, **options):
+        try:
+            result = sync_notion(full=options['full'])
+        except NotionSyncError as e:
+            raise CommandError(str(e))
+        mode = "전체" if result['full'] else "증분"
+        self.stdout.write(self.style.SUCCESS(f"[{mode}] {result['upserted']}건 반영, {result['deleted']}건 삭제"))
+        files = result['attachments']
+        if files:
+            self.stdout.write(
+                f"첨부파일: 새로 저장 {files.get('downloaded', 0)}개, 그대로 {files.get('reused', 0)}개, "
+                f"중복 {files.get('deduplicated', 0)}개, 실패 {files.get('failed', 0)}개"
+            )
+        if result['pending']:
+            self.stdout.write(self.style.WARNING(
+                f"첨부파일을 아직 복사하지 못한 공지가 {result['pending']}건 있습니다. 다음 동기화 때 노션에서 다시 불러와 시도합니다."
+            ))
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0006_alter_notionnotice_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notionnotice",
+            name="last_edited_time",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="notionnotice",
+            name="notion_id",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
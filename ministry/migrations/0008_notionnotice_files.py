@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 11:03
+
+import json
+
+from django.db import migrations, models
+
+
+def copy_files_json(apps, schema_editor):
+    # 문자열로 저장돼 있던 files_json을 한 번만 풀어서 새 JSONField(files)로 옮깁니다.
+    NotionNotice = apps.get_model("ministry", "NotionNotice")
+    notices = NotionNotice.objects.using(schema_editor.connection.alias)
+    for notice in notices.only("id", "files_json").iterator():
+        try:
+            files = json.loads(notice.files_json or "[]")
+        except ValueError:
+            files = []
+        notices.filter(pk=notice.pk).update(files=files)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0007_notionnotice_notion_id_last_edited_time"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notionnotice",
+            name="files",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copy_files_json, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="notionnotice",
+            name="files_json",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0008_notionnotice_files"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="churchreview",
+            index=models.Index(
+                fields=["created_at", "id"], name="review_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="financialtransaction",
+            index=models.Index(
+                fields=["transaction_date", "id"], name="tx_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notionnotice",
+            index=models.Index(fields=["date", "id"], name="notice_date_id_idx"),
+        ),
+    ]
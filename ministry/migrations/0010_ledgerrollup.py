@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-17 15:02
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    # 이미 저장된 재정 내역으로 월별 합계표를 처음 한 번 채웁니다.
+    FinancialTransaction = apps.get_model("ministry", "FinancialTransaction")
+    LedgerRollup = apps.get_model("ministry", "LedgerRollup")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        FinancialTransaction.objects.using(db_alias)
+        .annotate(month=TruncMonth("transaction_date"))
+        .values("month", "category", "type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    LedgerRollup.objects.using(db_alias).bulk_create([LedgerRollup(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0009_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="월(1일 기준)")),
+                ("category", models.CharField(max_length=50, verbose_name="부서/항목")),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("IN", "수입"), ("OUT", "지출")],
+                        max_length=3,
+                        verbose_name="구분",
+                    ),
+                ),
+                ("total", models.BigIntegerField(default=0, verbose_name="합계 금액")),
+                ("count", models.IntegerField(default=0, verbose_name="건수")),
+            ],
+            options={
+                "verbose_name": "재정 월별 합계",
+                "verbose_name_plural": "재정 월별 합계",
+                "ordering": ["-month", "type", "category"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("month", "category", "type"), name="ledger_rollup_key"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0010_ledgerrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slideimage",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0011_slideimage_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="slideimage",
+            name="title",
+            field=models.CharField(max_length=200, verbose_name="사진 제목(설명)"),
+        ),
+    ]
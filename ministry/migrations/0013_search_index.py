@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-17 18:10
+
+from django.db import migrations
+
+
+# 교회 소식/재정 내역 검색 색인 (SQLite FTS5 trigram 또는 PostgreSQL pg_trgm, ministry/search.py 참고)
+# 색인을 만드는 SQL은 이 마이그레이션을 만들 때의 search.py 내용을 그대로 옮겨 둔 것입니다.
+# 앱 코드를 import하면 나중에 search.py를 고쳤을 때 이 마이그레이션이 하는 일도 몰래 바뀌므로 복사해 둡니다.
+# 표 이름 -> (색인 이름, 검색할 열)
+SEARCH_TABLES = {
+    'ministry_notionnotice': ('ministry_notice_fts', ('title', 'content')),
+    'ministry_financialtransaction': ('ministry_transaction_fts', ('description', 'category')),
+}
+
+
+def sqlite_statements(table, fts, fields):
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{name}' for name in fields)
+    old_values = ', '.join(f'old.{name}' for name in fields)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for table, (fts, fields) in SEARCH_TABLES.items():
+                for statement in sqlite_statements(table, fts, fields):
+                    cursor.execute(statement)
+        elif connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for table, (_, fields) in SEARCH_TABLES.items():
+                for name in fields:
+                    # icontains는 UPPER("필드"::text) LIKE UPPER(...)로 바뀌므로 같은 식으로 색인합니다.
+                    cursor.execute(
+                        f'CREATE INDEX IF NOT EXISTS {table}_{name}_trgm ON {table} '
+                        f'USING gin (UPPER("{name}"::text) gin_trgm_ops)'
+                    )
+
+
+def remove_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for fts, _ in SEARCH_TABLES.values():
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif connection.vendor == 'postgresql':
+            for table, (_, fields) in SEARCH_TABLES.items():
+                for name in fields:
+                    cursor.execute(f'DROP INDEX IF EXISTS {table}_{name}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0012_alter_slideimage_title"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0014_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="churchreview",
+            index=models.Index(
+                fields=["ip_address", "created_at"], name="review_ip_created_idx"
+            ),
+        ),
+    ]
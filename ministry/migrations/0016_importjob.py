@@ -0,0 +1,96 @@
+# Generated by Django 6.0 on 2026-10-17 21:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0015_review_ip_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        upload_to="imports/%Y/%m/", verbose_name="엑셀 파일"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "대기 중"),
+                            ("validating", "검사 중"),
+                            ("saving", "저장 중"),
+                            ("done", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "total_rows",
+                    models.IntegerField(
+                        blank=True, null=True, verbose_name="전체 줄 수"
+                    ),
+                ),
+                (
+                    "rows_processed",
+                    models.IntegerField(default=0, verbose_name="검사한 줄 수"),
+                ),
+                (
+                    "created_count",
+                    models.IntegerField(default=0, verbose_name="저장한 건수"),
+                ),
+                (
+                    "errors",
+                    models.JSONField(
+                        blank=True, default=list, verbose_name="오류 목록"
+                    ),
+                ),
+                ("error_count", models.IntegerField(default=0, verbose_name="오류 수")),
+                ("message", models.TextField(blank=True, verbose_name="메시지")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "uploaded_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="올린 사람",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "엑셀 가져오기 작업",
+                "verbose_name_plural": "엑셀 가져오기 작업",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"], name="import_job_status_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-17 16:40
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+# 지문 계산은 이 마이그레이션을 만들 때의 excel.row_fingerprint를 그대로 옮겨 둔 것입니다.
+# 앱 코드를 import하면 나중에 지문 방식을 바꿨을 때 이 마이그레이션이 하는 일도 몰래 바뀌므로 복사해 둡니다.
+def _normalize(text):
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def row_fingerprint(transaction_date, type_code, category, description, amount, occurrence):
+    text = '\x1f'.join([transaction_date.isoformat(), type_code, _normalize(category), _normalize(description), str(int(amount))])
+    return hashlib.sha256(f'{text}\x1f{occurrence}'.encode()).hexdigest()[:32]
+
+
+def fill_fingerprints(apps, schema_editor):
+    # 이미 저장된 내역에도 지문을 붙여서, 예전에 올렸던 파일을 다시 올려도 두 번 저장되지 않게 합니다.
+    # (이 시점에는 직접 입력한 내역과 엑셀로 가져온 내역을 구분할 수 없어서 전부 채웁니다)
+    # (이미 두 번 들어간 줄은 1번, 2번 지문을 받으므로 그대로 남지만, 세 번째로 늘어나지는 않습니다)
+    FinancialTransaction = apps.get_model("ministry", "FinancialTransaction")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        FinancialTransaction.objects.using(db_alias)
+        .order_by("id")
+        .values_list("id", "transaction_date", "type", "category", "description", "amount")
+        .iterator(chunk_size=2000)
+    )
+    seen, updates = {}, []
+    table = schema_editor.quote_name(FinancialTransaction._meta.db_table)
+    sql = f"UPDATE {table} SET fingerprint = %s WHERE id = %s"
+    with schema_editor.connection.cursor() as cursor:
+        for pk, *values in rows:
+            key = row_fingerprint(*values, occurrence=0)
+            seen[key] = occurrence = seen.get(key, 0) + 1
+            updates.append((row_fingerprint(*values, occurrence=occurrence), pk))
+            if len(updates) >= 2000:
+                cursor.executemany(sql, updates)
+                updates = []
+        if updates:
+            cursor.executemany(sql, updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0016_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="financialtransaction",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                null=True,
+                verbose_name="가져오기 지문",
+            ),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        # 지문을 다 채운 뒤에 unique 색인을 만듭니다.
+        migrations.AlterField(
+            model_name="financialtransaction",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                null=True,
+                unique=True,
+                verbose_name="가져오기 지문",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="existing_count",
+            field=models.IntegerField(default=0, verbose_name="이미 있던 건수"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+def mark_pending(apps, schema_editor):
+    # 첨부파일이 있는데 아직 우리 저장소 주소(sha256)가 없는 공지는 다음 동기화 때 노션에서 다시 불러와 복사합니다.
+    # (첨부파일 복사 기능이 생기기 전에 저장된 공지는 노션의 만료된 임시 주소를 그대로 들고 있습니다)
+    NotionNotice = apps.get_model("ministry", "NotionNotice")
+    db_alias = schema_editor.connection.alias
+    pending = [
+        notice.pk
+        for notice in NotionNotice.objects.using(db_alias).exclude(notion_id=None).only("id", "files").iterator()
+        if any(not f.get("sha256") for f in notice.files or [])
+    ]
+    for start in range(0, len(pending), 500):
+        NotionNotice.objects.using(db_alias).filter(pk__in=pending[start:start + 500]).update(files_pending=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0017_import_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notionnotice",
+            name="files_pending",
+            field=models.BooleanField(db_index=True, default=False, verbose_name="첨부파일 복사 대기"),
+        ),
+        migrations.RunPython(mark_pending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-17 17:40
+
+import mimetypes
+
+from django.db import migrations, models
+
+
+def record_mirrored_files(apps, schema_editor):
+    # 이미 복사해 둔 첨부파일도 (해시, 파일 이름, 종류)를 기록해야 계속 내려받을 수 있습니다.
+    NotionNotice = apps.get_model("ministry", "NotionNotice")
+    NoticeAttachment = apps.get_model("ministry", "NoticeAttachment")
+    db_alias = schema_editor.connection.alias
+    records = {}
+    for notice in NotionNotice.objects.using(db_alias).only("id", "files").iterator():
+        for f in notice.files or []:
+            if not f.get("sha256"):
+                continue
+            filename = f["name"].replace("/", "_") or f["sha256"]
+            records[(f["sha256"], filename)] = NoticeAttachment(
+                digest=f["sha256"], filename=filename, size=f.get("size"),
+                content_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            )
+    NoticeAttachment.objects.using(db_alias).bulk_create(records.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ministry", "0018_notionnotice_files_pending"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoticeAttachment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=64, verbose_name="SHA-256")),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="파일 이름"),
+                ),
+                (
+                    "content_type",
+                    models.CharField(max_length=100, verbose_name="파일 종류"),
+                ),
+                (
+                    "size",
+                    models.BigIntegerField(blank=True, null=True, verbose_name="크기"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "공지 첨부파일",
+                "verbose_name_plural": "공지 첨부파일",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("digest", "filename"), name="notice_attachment_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(record_mirrored_files, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 """
@@ -23,6 +24,10 @@ class WeeklyReport(models.Model): # 모든 모델은 models.Model을 상속받
     # models.BigIntegerField: 아주 큰 숫자를 저장할 때 씁니다. (헌금 액수는 클 수 있으니까요!)
     offering_total = models.BigIntegerField(verbose_name="주간 헌금 총액", default=0)
 
+    # auto_now=True: 저장할 때마다 그 시각으로 바뀝니다. 메인 화면의 '바뀐 게 있나?' 확인(conditional.py)에 씁니다.
+    # db_index=True: 가장 최근 시각(MAX)을 표 전체를 훑지 않고 색인에서 바로 찾게 합니다.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     # __str__ 함수 (매직 메서드)
     # 이 데이터의 '이름표'를 달아주는 역할입니다.
     # 관리자 목록이나 터미널에서 데이터를 조회할 때 "WeeklyReport object (1)" 대신 "2024-12-11 사역 보고"라고 예쁘게 나옵니다.
@@ -53,10 +58,17 @@ class FinancialTransaction(models.Model):
     category = models.CharField(max_length=50, verbose_name="부서/항목")
     description = models.CharField(max_length=200, verbose_name="적요(내역)")
     amount = models.IntegerField(verbose_name="금액")
+    # 엑셀로 가져온 줄의 '지문'입니다. (날짜, 구분, 항목, 내역, 금액, 같은 줄이 몇 번째인지)를 정리해서 만든 해시로,
+    # 같은 파일을 두 번 올려도 이미 있는 줄은 다시 저장되지 않게 합니다. (excel.row_fingerprint 참고)
+    # unique=True는 DB가 직접 중복을 막는 색인을 만듭니다. 이 칸이 생기기 전의 내역은 마이그레이션(0017)이 지문을 채웠고,
+    # 그 뒤로 관리자 화면에서 직접 입력한 내역은 비워 둡니다(NULL은 중복으로 보지 않음).
+    fingerprint = models.CharField(max_length=32, null=True, blank=True, unique=True, editable=False, verbose_name="가져오기 지문")
     
     # auto_now_add=True: 데이터가 처음 생성될 때의 시간을 자동으로 찍습니다.
     # 우리가 직접 입력하는 게 아니라, 시스템이 알아서 기록하는 '생성일자'입니다.
     created_at = models.DateTimeField(auto_now_add=True)
+    # auto_now=True: 수정할 때마다 그 시각으로 바뀌는 '수정일자'입니다.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"[{self.transaction_date}] {self.description}"
@@ -64,6 +76,84 @@ class FinancialTransaction(models.Model):
     class Meta:
         verbose_name = "재정 입출금 내역"
         verbose_name_plural = "재정 입출금 내역"
+        # indexes: 자주 정렬/검색하는 열에 '색인'을 달아 빠르게 찾게 합니다. (책 뒤의 찾아보기와 같은 원리)
+        # (날짜, id) 색인 덕분에 '더 보기'를 몇 번 눌러도 필요한 부분만 바로 읽습니다.
+        indexes = [models.Index(fields=['transaction_date', 'id'], name='tx_date_id_idx')]
+
+
+# ----------------------------------------------------------------------------------------
+# 2-1. 재정 월별 합계 (요약표)
+# ----------------------------------------------------------------------------------------
+class LedgerRollup(models.Model):
+    # 재정 내역을 (월, 부서/항목, 구분)별로 미리 더해 둔 요약표입니다.
+    # 월별/연간 합계를 구할 때 수십만 건의 내역 대신 이 표(월 수 × 항목 수)만 읽으면 됩니다.
+    # 내역이 저장/삭제될 때마다 signals.py가 자동으로 더하고 빼며, 어긋났을 때는
+    # `python manage.py rebuild_ledger_rollup`으로 처음부터 다시 계산할 수 있습니다.
+    month = models.DateField(verbose_name="월(1일 기준)")
+    category = models.CharField(max_length=50, verbose_name="부서/항목")
+    type = models.CharField(max_length=3, choices=FinancialTransaction.TYPE_CHOICES, verbose_name="구분")
+    total = models.BigIntegerField(default=0, verbose_name="합계 금액")
+    count = models.IntegerField(default=0, verbose_name="건수")
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.category} {self.get_type_display()}"
+
+    class Meta:
+        verbose_name = "재정 월별 합계"
+        verbose_name_plural = "재정 월별 합계"
+        ordering = ['-month', 'type', 'category']
+        constraints = [models.UniqueConstraint(fields=['month', 'category', 'type'], name='ledger_rollup_key')]
+
+
+# ----------------------------------------------------------------------------------------
+# 2-2. 재정 엑셀 가져오기 작업
+# ----------------------------------------------------------------------------------------
+class ImportJob(models.Model):
+    # 관리자가 올린 엑셀 파일을 웹 요청 안에서 바로 처리하지 않고, 작업으로 등록해 두면
+    # `python manage.py run_import_jobs`(작업 처리기)가 따로 가져옵니다. (jobs.py 참고)
+    PENDING, VALIDATING, SAVING, DONE, FAILED = 'pending', 'validating', 'saving', 'done', 'failed'
+    STATUS_CHOICES = (
+        (PENDING, '대기 중'), (VALIDATING, '검사 중'), (SAVING, '저장 중'), (DONE, '완료'), (FAILED, '실패'),
+    )
+
+    file = models.FileField(upload_to='imports/%Y/%m/', verbose_name="엑셀 파일")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="상태")
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, verbose_name="올린 사람")
+    # 진행률: 파일의 전체 줄 수(대략)와 지금까지 검사한 줄 수
+    total_rows = models.IntegerField(null=True, blank=True, verbose_name="전체 줄 수")
+    rows_processed = models.IntegerField(default=0, verbose_name="검사한 줄 수")
+    created_count = models.IntegerField(default=0, verbose_name="저장한 건수")
+    existing_count = models.IntegerField(default=0, verbose_name="이미 있던 건수")
+    # 잘못된 줄 [(줄 번호, 오류 내용), ...] (처음 100개까지) / 파일 자체를 읽을 수 없을 때의 메시지
+    errors = models.JSONField(default=list, blank=True, verbose_name="오류 목록")
+    error_count = models.IntegerField(default=0, verbose_name="오류 수")
+    message = models.TextField(blank=True, verbose_name="메시지")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # 처리기가 마지막으로 진행 상황을 적은 시각. 오래 멈춰 있으면 처리기가 죽은 것으로 보고 실패 처리합니다. (jobs.py)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.file.name} ({self.get_status_display()})"
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    @property
+    def percent(self):
+        if self.finished:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.rows_processed * 100 // self.total_rows)
+
+    class Meta:
+        verbose_name = "엑셀 가져오기 작업"
+        verbose_name_plural = "엑셀 가져오기 작업"
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'], name='import_job_status_idx')]
 
 
 # ----------------------------------------------------------------------------------------
@@ -83,6 +173,7 @@ class ChurchReview(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="작성자 IP")
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.author_name} - {self.rating}점"
@@ -93,13 +184,18 @@ class ChurchReview(models.Model):
         # ordering: 데이터를 불러올 때 기본 정렬 순서를 정합니다.
         # '-created_at': created_at 앞에 '-'가 붙으면 역순(내림차순)입니다. 즉, 최신 글이 먼저 보입니다.
         ordering = ['-created_at'] 
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='review_created_id_idx'),
+            # 리뷰를 저장할 때 '이 IP가 최근에 몇 번 썼나'를 세는 데 씁니다. (ratelimit.py)
+            models.Index(fields=['ip_address', 'created_at'], name='review_ip_created_idx'),
+        ]
 
 
 # ----------------------------------------------------------------------------------------
 # 4. 메인 화면 슬라이드 이미지
 # ----------------------------------------------------------------------------------------
 class SlideImage(models.Model):
-    title = models.CharField(max_length=50, verbose_name="사진 제목(설명)")
+    title = models.CharField(max_length=200, verbose_name="사진 제목(설명)")
     
     # models.ImageField: 이미지 파일을 업로드하고 관리하는 필드입니다.
     # upload_to='slides/': 이미지가 저장될 'media/slides/' 폴더를 지정합니다.
@@ -111,6 +207,10 @@ class SlideImage(models.Model):
     # 이미지를 삭제하지 않고 잠시 숨기고 싶을 때 유용합니다.
     is_active = models.BooleanField(default=True, verbose_name="노출 여부")
 
+    # 업로드하면 자동으로 만들어지는 폭별 WebP/AVIF 사본과 흐린 미리보기 정보 (images.py 참고)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def __str__(self):
         return self.title
 
@@ -119,15 +219,43 @@ class SlideImage(models.Model):
         verbose_name_plural = "메인 슬라이드 사진"
 
 class NotionNotice(models.Model):
+    # 노션 페이지 고유 ID: 같은 공지를 다시 받아오면 새로 만들지 않고 이 값으로 찾아서 수정합니다.
+    notion_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
     title = models.CharField(max_length=200)
     content = models.TextField(blank=True)
-    # 파일 정보를 저장할 필드
-    files_json = models.TextField(blank=True, default="[]") 
+    # 첨부파일 목록: [{'name': ..., 'url': ...}, ...] 형태로 저장합니다.
+    # JSONField라서 DB에서 꺼낼 때 바로 파이썬 리스트가 됩니다. (json.loads를 따로 할 필요 없음)
+    files = models.JSONField(blank=True, default=list)
+    # 노션 첨부파일을 아직 우리 저장소로 옮기지 못했으면 True입니다. (받기 실패 또는 예전 방식으로 저장된 공지)
+    # 노션에서 공지를 고치지 않아도 다음 동기화 때마다 이 공지들을 다시 불러와 복사를 시도합니다.
+    files_pending = models.BooleanField(default=False, db_index=True, verbose_name="첨부파일 복사 대기")
     date = models.DateField()
+    # 노션에서 마지막으로 수정된 시각: 이 값의 최댓값이 '어디까지 동기화했는지' 표시(high-water mark)가 됩니다.
+    last_edited_time = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
 
     class Meta:
-        ordering = ['-date']
\ No newline at end of file
+        ordering = ['-date']
+        indexes = [models.Index(fields=['date', 'id'], name='notice_date_id_idx')]
+
+class NoticeAttachment(models.Model):
+    # 우리 저장소로 옮긴 노션 첨부파일의 (내용 해시, 파일 이름)과 복사할 때 정한 파일 종류(Content-Type)입니다.
+    # 첨부파일 주소(/attachments/<해시>/<파일 이름>)의 이름 부분은 누구나 바꿔 칠 수 있으므로,
+    # 내려줄 때는 주소의 이름으로 종류를 짐작하지 않고 여기에 기록된 것만 씁니다. (attachments.attachment 참고)
+    digest = models.CharField(max_length=64, verbose_name="SHA-256")
+    filename = models.CharField(max_length=255, verbose_name="파일 이름")
+    content_type = models.CharField(max_length=100, verbose_name="파일 종류")
+    size = models.BigIntegerField(null=True, blank=True, verbose_name="크기")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.filename
+
+    class Meta:
+        verbose_name = "공지 첨부파일"
+        verbose_name_plural = "공지 첨부파일"
+        constraints = [models.UniqueConstraint(fields=['digest', 'filename'], name='notice_attachment_uniq')]
@@ -0,0 +1,227 @@
+"""
+notion.py는 노션(Notion) 공지 데이터베이스를 우리 DB(NotionNotice)로 옮겨오는 '동기화 서비스'입니다.
+
+예전에는 메인 화면(home)이 열릴 때 노션 API를 직접 호출했기 때문에
+노션이 느리면 홈페이지도 같이 느려졌습니다.
+이제는 `python manage.py sync_notion` 명령(또는 sync_notion() 함수)으로 미리 가져오고,
+홈페이지는 DB만 읽습니다.
+
+노션의 데이터베이스 조회 API는 보관(archived)하거나 휴지통에 넣은 페이지를 결과에 아예 넣지 않습니다.
+그래서 증분 동기화로는 노션에서 지운 공지를 알 수 없고, 전체 동기화(--full)만 '더 이상 없는 공지'를 지웁니다.
+cron 등으로 증분은 자주, 전체는 하루 한 번 돌려 주세요.
+
+    */10 * * * *  python manage.py sync_notion          # 바뀐 공지 + 복사 못 한 첨부파일
+    0 4 * * *     python manage.py sync_notion --full   # 노션에서 지운 공지 정리
+"""
+import json
+import os
+import urllib.request
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .attachments import mirror_files
+from .cache import bump_version
+from .models import NotionNotice
+
+NOTION_API_URL = "https://api.notion.com/v1/databases/{db_id}/query"
+NOTION_PAGE_URL = "https://api.notion.com/v1/pages/{page_id}"
+NOTION_VERSION = "2022-06-28"
+PAGE_SIZE = 100  # 노션 API가 한 번에 돌려주는 최대 개수
+# 한 번 동기화할 때 첨부파일 복사를 다시 시도할 공지 수 (노션 API를 공지마다 한 번씩 부르므로 너무 많지 않게)
+RETRY_LIMIT = 50
+
+
+class NotionSyncError(Exception):
+    """노션 설정이 없거나 API 호출이 실패했을 때 발생합니다."""
+
+
+def _request(req):
+    # timeout을 꼭 지정해서 노션이 응답하지 않아도 무한정 기다리지 않게 합니다.
+    timeout = getattr(settings, 'NOTION_TIMEOUT', 10)
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _headers(api_key):
+    return {"Authorization": f"Bearer {api_key}", "Notion-Version": NOTION_VERSION, "Content-Type": "application/json"}
+
+
+def _post(url, payload, api_key):
+    # 노션 API에 POST 요청을 보내고 JSON 응답을 돌려줍니다.
+    return _request(urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=_headers(api_key), method="POST"))
+
+
+def _get(url, api_key):
+    # 노션 페이지 하나를 다시 불러올 때 씁니다. (첨부파일의 새 임시 주소를 받기 위해)
+    return _request(urllib.request.Request(url, headers=_headers(api_key), method="GET"))
+
+
+def parse_datetime(value):
+    # 노션 시각("2025-12-18T09:00:00.000Z")을 DB에 저장할 수 있는 naive UTC 시각으로 바꿉니다. (USE_TZ = False)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_datetime(value):
+    # parse_datetime의 반대: naive UTC 시각을 노션 필터용 문자열로 바꿉니다.
+    return value.replace(microsecond=0).isoformat() + "Z"
+
+
+def parse_page(page):
+    # 노션 페이지(JSON) 한 개를 NotionNotice 필드 값(dict)으로 변환합니다.
+    p = page.get('properties', {})
+    title = p['이름']['title'][0]['plain_text'] if p.get('이름') and p['이름']['title'] else "제목 없음"
+    date_v = p['날짜']['date']['start'][:10] if p.get('날짜') and p['날짜']['date'] else str(timezone.now().date())
+    text_v = "".join([t['plain_text'] for t in p['텍스트']['rich_text']]) if p.get('텍스트') and p['텍스트']['rich_text'] else ""
+
+    # 파일 정보 추출
+    # 노션에 직접 올린 파일('file')은 주소가 곧 만료되므로 표시해 두었다가 우리 저장소로 복사합니다. (attachments.py)
+    files = []
+    for f in (p.get('파일과 미디어') or {}).get('files', []):
+        if f.get('file', {}).get('url'):
+            files.append({'name': f.get('name', '첨부파일'), 'url': f['file']['url'], 'notion_file': True})
+        elif f.get('external', {}).get('url'):
+            files.append({'name': f.get('name', '첨부파일'), 'url': f['external']['url']})
+
+    return {
+        'notion_id': page['id'],
+        'title': title[:200],
+        'date': date_v,
+        'content': text_v,
+        'files': files,
+        'last_edited_time': parse_datetime(page.get('last_edited_time')),
+    }
+
+
+def has_pending_files(files):
+    # 노션에 올린 파일인데 아직 우리 저장소 주소(sha256)를 받지 못한 것이 있는지
+    return any(f.get('notion_file') and not f.get('sha256') for f in files)
+
+
+def _count(total, counts):
+    for status, count in counts.items():
+        total[status] = total.get(status, 0) + count
+
+
+def retry_pending_files(api_key, skip_ids=(), limit=RETRY_LIMIT):
+    """
+    첨부파일을 아직 복사하지 못한 공지(files_pending)를 노션에서 다시 불러와 복사합니다.
+
+    증분 동기화는 노션에서 고친 페이지만 받아 오므로, 받기에 실패한 첨부파일은 공지를 고치기 전까지 다시 오지 않습니다.
+    게다가 저장해 둔 노션 주소는 한 시간쯤 지나면 만료되므로, 페이지를 다시 불러와 새 주소로 받아야 합니다.
+    (skip_ids: 이번 동기화에서 이미 받아 온 공지) 처리 결과 {처리 결과: 개수}와 노션에서 지워진 공지 id 목록을 돌려줍니다.
+    """
+    notices = list(
+        NotionNotice.objects.filter(files_pending=True).exclude(notion_id=None).exclude(notion_id__in=skip_ids)
+        .only('id', 'notion_id', 'files').order_by('id')[:limit]
+    )
+    counts, updated, removed = {}, [], []
+    for notice in notices:
+        try:
+            page = _get(NOTION_PAGE_URL.format(page_id=notice.notion_id), api_key)
+        except Exception:
+            # 노션이 응답하지 않으면 이 공지는 다음 동기화 때 다시 시도합니다.
+            counts['failed'] = counts.get('failed', 0) + 1
+            continue
+        if page.get('archived') or page.get('in_trash'):
+            removed.append(notice.notion_id)
+            continue
+        files, page_counts = mirror_files(parse_page(page)['files'], notice.files)
+        _count(counts, page_counts)
+        notice.files, notice.files_pending, notice.updated_at = files, has_pending_files(files), timezone.now()
+        updated.append(notice)
+    if updated:
+        NotionNotice.objects.bulk_update(updated, ['files', 'files_pending', 'updated_at'])
+        bump_version(NotionNotice)
+    return counts, removed
+
+
+def iter_pages(api_key, db_id, since=None):
+    # has_more / next_cursor를 따라가며 데이터베이스의 모든 페이지를 하나씩 돌려줍니다.
+    # since가 있으면 그 시각 이후에 수정된 페이지만 요청합니다. (증분 동기화)
+    url = NOTION_API_URL.format(db_id=db_id)
+    payload = {"page_size": PAGE_SIZE, "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+    if since:
+        # 노션의 수정 시각은 분 단위라서 같은 분에 고친 글을 놓치지 않도록 '이후 포함(on_or_after)'으로 거릅니다.
+        payload["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": format_datetime(since)}}
+
+    cursor = None
+    while True:
+        if cursor:
+            payload["start_cursor"] = cursor
+        data = _post(url, payload, api_key)
+        for page in data.get('results', []):
+            yield page
+        cursor = data.get('next_cursor')
+        if not data.get('has_more') or not cursor:
+            break
+
+
+def sync_notion(full=False, api_key=None, db_id=None, batch_size=500):
+    """
+    노션 공지 DB를 NotionNotice 테이블로 동기화하고 처리 결과(dict)를 돌려줍니다.
+    노션에 올린 첨부파일은 우리 저장소로 복사하고 그 주소로 바꿔서 저장합니다. (attachments.py)
+    복사하지 못한 첨부파일이 남은 공지는 바뀌지 않았어도 매번 다시 불러와 시도합니다. (retry_pending_files)
+
+    - 평소(증분): 마지막으로 받아온 수정 시각(high-water mark) 이후에 바뀐 페이지만 가져옵니다.
+      노션에서 지운 페이지는 조회 결과에 나오지 않으므로 증분 동기화로는 지워지지 않습니다.
+    - full=True(전체): 모든 페이지를 다시 훑고, 노션에서 사라진 공지는 DB에서도 지웁니다. (하루 한 번 권장)
+    """
+    api_key = api_key or os.environ.get("NOTION_API_KEY")
+    db_id = db_id or os.environ.get("NOTION_DATABASE_ID")
+    if not api_key or not db_id:
+        raise NotionSyncError("NOTION_API_KEY / NOTION_DATABASE_ID 환경변수가 설정되어 있지 않습니다.")
+
+    since = None
+    if not full:
+        since = NotionNotice.objects.aggregate(mark=Max('last_edited_time'))['mark']
+        # 한 번도 동기화한 적이 없으면 전체 동기화로 시작합니다. (예전 방식으로 저장된 공지 정리 포함)
+        full = since is None
+
+    # 여러 쪽을 받는 사이 고쳐진 페이지는 뒤쪽에서 한 번 더 나올 수 있습니다. notion_id별로 마지막(가장 최근) 것만 남깁니다.
+    # (같은 notion_id가 두 번 있으면 PostgreSQL의 ON CONFLICT DO UPDATE가 같은 행을 두 번 고칠 수 없다며 실패합니다)
+    pages = {}
+    try:
+        for page in iter_pages(api_key, db_id, since=since):
+            pages[page['id']] = NotionNotice(**parse_page(page))
+    except Exception as e:
+        raise NotionSyncError(f"노션 API 호출 실패: {e}") from e
+    rows, seen_ids = list(pages.values()), set(pages)
+
+    # 첨부파일은 DB 트랜잭션을 열기 전에 내려받습니다. (다운로드하는 동안 DB를 잠가 두지 않도록)
+    previous = dict(NotionNotice.objects.filter(notion_id__in=seen_ids).values_list('notion_id', 'files'))
+    attachments = {}
+    for row in rows:
+        row.files, counts = mirror_files(row.files, previous.get(row.notion_id) or [])
+        row.files_pending = has_pending_files(row.files)
+        _count(attachments, counts)
+    # 첨부파일을 다시 받으려고 불러온 페이지가 보관/휴지통 상태면 그 공지는 지웁니다.
+    counts, archived_ids = retry_pending_files(api_key, skip_ids=seen_ids)
+    _count(attachments, counts)
+
+    with transaction.atomic():
+        # notion_id가 같은 행이 있으면 수정(UPDATE), 없으면 새로 추가(INSERT)합니다. (한 번에 묶어서 처리)
+        NotionNotice.objects.bulk_create(
+            rows, batch_size=batch_size,
+            update_conflicts=True, unique_fields=['notion_id'],
+            update_fields=['title', 'date', 'content', 'files', 'files_pending', 'last_edited_time', 'updated_at'],
+        )
+        deleted = 0
+        if archived_ids:
+            deleted += NotionNotice.objects.filter(notion_id__in=archived_ids).delete()[0]
+        if full:
+            # 전체 동기화 때만 '노션에 더 이상 없는 공지'를 지웁니다.
+            deleted += NotionNotice.objects.exclude(notion_id__in=seen_ids).delete()[0]
+        if rows or deleted:
+            bump_version(NotionNotice)  # bulk_create는 신호를 보내지 않으므로 직접 캐시를 무효화합니다.
+
+    pending = NotionNotice.objects.filter(files_pending=True).count()
+    return {'full': full, 'upserted': len(rows), 'deleted': deleted, 'attachments': attachments, 'pending': pending}
@@ -0,0 +1,90 @@
+"""
+pagination.py는 '더 보기' 방식의 키셋(keyset, 커서) 페이지네이션을 담당합니다.
+
+Django Paginator는 페이지를 넘길 때마다 COUNT(*)와 OFFSET 쿼리를 실행하기 때문에
+뒤쪽 페이지로 갈수록 느려집니다. 키셋 방식은 "마지막으로 본 글의 (날짜, id) 다음부터 N개"를
+요청하므로 몇 번째 페이지든 인덱스 범위 조회 한 번이면 끝납니다.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """한 번에 보여줄 글 목록과 '다음 묶음'을 가리키는 커서를 담습니다."""
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    # 커서 문자열을 각 필드 타입(날짜, 숫자 등)에 맞는 파이썬 값으로 되돌립니다. 잘못된 커서면 None.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _after(ordering, values):
+    # ordering=('-date', '-id'), values=(d, i) 이면 "date <= d AND (date < d OR (date = d AND id < i))" 조건을 만듭니다.
+    # 맨 앞의 "date <= d"는 없어도 결과는 같지만, DB가 색인에서 d 위치부터 바로 읽기 시작하게 해 줍니다.
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    first = ordering[0]
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+    return bound & condition
+
+
+def keyset_page(queryset, ordering, cursor=None, per_page=10):
+    """
+    queryset을 ordering 순서로 정렬해 cursor 다음의 per_page개를 돌려줍니다.
+
+    ordering의 마지막 필드는 반드시 유일한 값(보통 'id')이어야 순서가 꼬이지 않습니다.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, fields)
+        if values is not None:
+            queryset = queryset.filter(_after(ordering, values))
+
+    # 한 개를 더 가져와서 다음 묶음이 있는지 COUNT 없이 알아냅니다.
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        # values()로 만든 queryset이면 각 줄이 dict입니다. (api.py)
+        next_cursor = encode_cursor([last[name] if isinstance(last, dict) else getattr(last, name) for name in fields])
+    return KeysetPage(items, next_cursor)
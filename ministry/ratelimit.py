@@ -0,0 +1,81 @@
+"""
+ratelimit.py는 '리뷰는 한 방문자(IP)가 REVIEW_RATE_WINDOW초 동안 REVIEW_RATE_LIMIT번까지만'을 지키는 곳입니다.
+기간은 달력의 '오늘'이 아니라 지금부터 거슬러 올라간 REVIEW_RATE_WINDOW초입니다. (기본 24시간)
+그래서 밤 11시에 쓴 방문자는 자정이 지나도 바로 다시 쓸 수 없고, 다음 날 밤 11시부터 쓸 수 있습니다.
+(예전에는 created_at__date=today로 날짜가 바뀌면 다시 쓸 수 있었습니다. 토큰 바구니가 시간에 따라 차는 방식이라 기준을 맞췄습니다)
+
+메인 화면을 열 때마다(GET) DB에 "이 IP가 오늘 리뷰를 썼나?"를 묻지 않도록, 남은 횟수를 두 곳에 적어 둡니다.
+- 캐시: IP별 '토큰 바구니'(남은 횟수, 적은 시각). 시간이 지나면 window 동안 limit개가 다시 찹니다.
+- 서명된 쿠키: 같은 내용을 브라우저에도 줍니다. 캐시가 비워져도(서버 재시작 등) 바로 잊지 않게 합니다.
+GET은 이 둘 중 더 적은 쪽만 보고 리뷰 입력창을 보여줄지 정합니다. (DB 쿼리 없음)
+
+진짜 판단은 리뷰를 저장하는 POST에서 DB로 합니다. (ip_address, created_at) 색인 덕분에 리뷰가 많이 쌓여도 빠릅니다.
+캐시와 쿠키는 '입력창을 보여줄지'를 위한 힌트일 뿐이라, 지우거나 조작해도 제한을 넘어 저장할 수는 없습니다.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from .cache import get_cache
+from .models import ChurchReview
+
+COOKIE_NAME = 'review_bucket'
+COOKIE_SALT = 'ministry.ratelimit'
+
+
+def _limits():
+    return getattr(settings, 'REVIEW_RATE_LIMIT', 1), getattr(settings, 'REVIEW_RATE_WINDOW', 86400)
+
+
+def _cache_key(ip):
+    return f'ministry:review_bucket:{ip}'
+
+
+def _refill(state, now, limit, window):
+    # state = (남은 횟수, 적은 시각). 지난 시간만큼 다시 채우되 limit개를 넘지 않습니다.
+    tokens, stamp = state
+    return min(limit, tokens + (now - stamp) * limit / window)
+
+
+def _cookie_state(request, ip, window):
+    value = request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT, max_age=window)
+    try:
+        cookie_ip, tokens, stamp = value.rsplit('|', 2)
+        # 다른 IP에서 받은 쿠키는 무시합니다. (IP별 제한이므로)
+        return (float(tokens), float(stamp)) if cookie_ip == ip else None
+    except (AttributeError, ValueError):
+        return None
+
+
+def available_reviews(request, ip):
+    """캐시와 쿠키만 보고 이 방문자가 지금 몇 번 더 쓸 수 있는지 돌려줍니다. (DB를 읽지 않음)"""
+    limit, window = _limits()
+    now = time.time()
+    states = [get_cache().get(_cache_key(ip)), _cookie_state(request, ip, window)]
+    return min((_refill(state, now, limit, window) for state in states if state), default=limit)
+
+
+def review_allowed(request, ip):
+    return available_reviews(request, ip) >= 1
+
+
+def remaining_reviews(request, ip):
+    """리뷰를 저장하기 직전(POST)에 부릅니다. 힌트가 남았다고 해도 DB에서 최근 window초(달력 날짜 아님)의 리뷰 수를 세어 확인합니다."""
+    if not review_allowed(request, ip):
+        return 0
+    limit, window = _limits()
+    since = timezone.now() - datetime.timedelta(seconds=window)
+    return max(0, limit - ChurchReview.objects.filter(ip_address=ip, created_at__gte=since).count())
+
+
+def remember(response, ip, remaining):
+    """남은 횟수를 캐시와 쿠키에 적어서, 다음 GET이 DB 없이 입력창을 숨기거나 보여줄 수 있게 합니다."""
+    _, window = _limits()
+    now = time.time()
+    get_cache().set(_cache_key(ip), (remaining, now), window)
+    response.set_signed_cookie(COOKIE_NAME, f'{ip}|{remaining}|{now}', salt=COOKIE_SALT, max_age=window,
+                               httponly=True, samesite='Lax')
+    return response
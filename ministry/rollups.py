@@ -0,0 +1,176 @@
+"""
+rollups.py는 재정 월별 합계표(LedgerRollup)를 계산하고 고치는 기능을 모아둔 곳입니다.
+
+내역 한 건이 바뀔 때마다 전체를 다시 더하지 않고, 바뀐 만큼(차이, delta)만 해당 칸에 더하거나 뺍니다.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, F, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .cache import get_cache, get_versions
+from .models import FinancialTransaction, LedgerRollup
+
+# 관리자 목록의 '부서/항목' 필터 목록을 캐시해 둘 시간(초)
+CATEGORY_CACHE_TIMEOUT = 60
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def rollup_key(transaction_date, category, type_code):
+    return (month_of(transaction_date), category, type_code)
+
+
+def collect_deltas(transactions, sign=1):
+    """내역 목록을 {(월, 항목, 구분): [금액 합, 건수]}로 묶습니다. sign=-1이면 빼야 할 양을 만듭니다."""
+    deltas = defaultdict(lambda: [0, 0])
+    for tx in transactions:
+        delta = deltas[rollup_key(tx.transaction_date, tx.category, tx.type)]
+        delta[0] += sign * int(tx.amount)
+        delta[1] += sign
+    return deltas
+
+
+def merge_deltas(*groups):
+    merged = defaultdict(lambda: [0, 0])
+    for group in groups:
+        for key, (amount, count) in group.items():
+            merged[key][0] += amount
+            merged[key][1] += count
+    return merged
+
+
+def apply_deltas(deltas):
+    """묶어둔 차이를 요약표에 반영합니다. 칸(월, 항목, 구분) 하나당 쿼리 한두 번이면 끝납니다."""
+    for (month, category, type_code), (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        key = {'month': month, 'category': category, 'type': type_code}
+        with transaction.atomic():
+            updated = LedgerRollup.objects.filter(**key).update(total=F('total') + amount, count=F('count') + count)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        LedgerRollup.objects.create(total=amount, count=count, **key)
+                except IntegrityError:
+                    # 동시에 다른 요청이 같은 칸을 먼저 만들었으면 그 칸에 더합니다.
+                    LedgerRollup.objects.filter(**key).update(total=F('total') + amount, count=F('count') + count)
+            if count < 0:
+                # 내역이 하나도 남지 않은 칸은 지웁니다.
+                LedgerRollup.objects.filter(count__lte=0, **key).delete()
+
+
+def rebuild_rollups():
+    """요약표를 비우고 전체 재정 내역에서 처음부터 다시 계산합니다. 만든 칸의 수를 돌려줍니다."""
+    rows = (
+        FinancialTransaction.objects
+        .annotate(month=TruncMonth('transaction_date'))
+        .values('month', 'category', 'type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        LedgerRollup.objects.all().delete()
+        created = LedgerRollup.objects.bulk_create(
+            [LedgerRollup(**row) for row in rows.iterator()], batch_size=1000,
+        )
+    return len(created)
+
+
+def ledger_summary(year):
+    """
+    해당 연도의 월별 수입/지출과 연간 합계를 요약표에서 읽어 돌려줍니다.
+
+    (월 수 × 항목 수)만큼의 행만 읽으므로 내역이 아무리 많아도 빠릅니다.
+    """
+    months = defaultdict(lambda: {'IN': 0, 'OUT': 0})
+    rows = (
+        LedgerRollup.objects.filter(month__year=year)
+        .values('month', 'type').annotate(total=Sum('total')).order_by('month')
+    )
+    for row in rows:
+        months[row['month']][row['type']] = row['total']
+
+    income = sum(m['IN'] for m in months.values())
+    expense = sum(m['OUT'] for m in months.values())
+    return {
+        'year': year,
+        'income': income,
+        'expense': expense,
+        'balance': income - expense,
+        'months': [{'month': month, 'income': m['IN'], 'expense': m['OUT']} for month, m in sorted(months.items())],
+    }
+
+
+def ledger_categories():
+    """
+    지금 내역이 있는 부서/항목 이름을 가나다순으로 돌려줍니다. (관리자 목록의 '부서/항목' 필터용)
+
+    전체 내역에 SELECT DISTINCT를 하지 않고 요약표에서 읽으며, 내역이 바뀔 때까지(버전) 캐시해 둡니다.
+    다만 버전은 LocMem 캐시를 쓰면 프로세스마다 따로라서, 다른 프로세스에서 생긴 항목도
+    CATEGORY_CACHE_TIMEOUT초 안에는 보이도록 캐시 시간을 제한합니다.
+    """
+    cache = get_cache()
+    key = f'ministry:ledger_categories:{get_versions([FinancialTransaction])[FinancialTransaction]}'
+    categories = cache.get(key)
+    if categories is None:
+        categories = list(LedgerRollup.objects.order_by('category').values_list('category', flat=True).distinct())
+        cache.set(key, categories, CATEGORY_CACHE_TIMEOUT)
+    return categories
+
+
+def rollup_count(type_code=None, category=None, year=None, month=None):
+    """조건에 맞는 내역 수를 COUNT(*) 대신 요약표의 건수를 더해서 구합니다. (월 단위까지의 조건만 가능)"""
+    rows = LedgerRollup.objects.all()
+    if type_code is not None:
+        rows = rows.filter(type=type_code)
+    if category is not None:
+        rows = rows.filter(category=category)
+    if year is not None:
+        rows = rows.filter(month__year=year)
+    if month is not None:
+        rows = rows.filter(month__month=month)
+    return rows.aggregate(count=Coalesce(Sum('count'), 0))['count']
+
+
+def signed(field):
+    # 수입(IN)은 +, 지출(OUT)은 - 로 바꾼 금액 식입니다.
+    return Case(When(type='IN', then=F(field)), default=-F(field), output_field=BigIntegerField())
+
+
+def annotate_running_balance(transactions):
+    """
+    재정 내역 목록(한 페이지)의 각 항목에 '그 내역까지의 잔액'(balance)을 붙여 돌려줍니다.
+
+    잔액 = (가장 오래된 항목이 속한 달 이전까지의 합계: 월별 합계표에서 계산)
+         + (그 달 1일부터 각 항목까지의 누적 합: DB 창 함수 SUM(...) OVER (ORDER BY 날짜, id))
+    이렇게 나누면 아주 오래된 페이지라도 한 달 + 한 페이지 분량의 내역만 읽으면 됩니다.
+    """
+    items = list(transactions)
+    if not items:
+        return items
+    oldest = min(items, key=lambda tx: (tx.transaction_date, tx.pk))
+    newest = max(items, key=lambda tx: (tx.transaction_date, tx.pk))
+    month_start = month_of(oldest.transaction_date)
+
+    # 그 달 이전까지의 잔액 (요약표의 (월 수 × 항목 수) 칸만 더함)
+    opening = (
+        LedgerRollup.objects.filter(month__lt=month_start).order_by()
+        .annotate(group=Value(1)).values('group')
+        .annotate(balance=Sum(signed('total'))).values('balance')
+    )
+    rows = (
+        FinancialTransaction.objects
+        .filter(transaction_date__gte=month_start)
+        .filter(Q(transaction_date__lt=newest.transaction_date) | Q(transaction_date=newest.transaction_date, id__lte=newest.pk))
+        .annotate(balance=Window(Sum(signed('amount')), order_by=[F('transaction_date').asc(), F('id').asc()])
+                  + Coalesce(Subquery(opening), Value(0), output_field=BigIntegerField()))
+        .values_list('id', 'balance')
+    )
+    balances = dict(rows)
+    for tx in items:
+        tx.balance = balances.get(tx.pk)
+    return items
@@ -0,0 +1,72 @@
+"""
+routers.py는 쿼리를 어느 DB로 보낼지 정하는 라우터(DATABASE_ROUTERS)입니다.
+
+주일 아침처럼 방문자가 몰릴 때 메인 화면의 읽기 쿼리를 복제본(replica) DB로 보내 기본 DB의 부담을 덜어줍니다.
+- 복제본은 @replica_reads가 붙은 뷰의 GET/HEAD 요청 안에서만 씁니다. (관리자 화면, 명령어 등은 항상 기본 DB)
+- 요청 도중 한 번이라도 쓰기가 일어나면, 그 요청의 나머지 읽기는 기본 DB로 보냅니다.
+  복제본은 기본 DB보다 조금 늦게 따라오므로, 방금 쓴 내용을 복제본에서 읽으면 안 보일 수 있기 때문입니다.
+- 메인 화면 구역 캐시(cache.py)는 복제본에서 그린 HTML을 저장하므로, 복제가 늦으면
+  최대 DASHBOARD_CACHE_TIMEOUT(초) 동안 예전 내용이 보일 수 있습니다.
+"""
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# 현재 요청이 읽기를 어디로 보낼지: None(기본 DB), 'replica'(복제본 사용 중), 'pinned'(쓰기 후 기본 DB 고정)
+_state = contextvars.ContextVar('ministry_db_state', default=None)
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE_ALIAS', PRIMARY)
+
+
+class use_replica:
+    """with 블록 안의 읽기 쿼리를 복제본으로 보냅니다. (복제본 설정이 없으면 기본 DB)"""
+
+    def __enter__(self):
+        self._token = _state.set('replica')
+        return self
+
+    def __exit__(self, *exc_info):
+        _state.reset(self._token)
+
+
+def replica_reads(view):
+    """GET/HEAD 요청일 때만 뷰 안의 읽기 쿼리를 복제본으로 보내는 데코레이터입니다. (async 뷰에도 쓸 수 있음)"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            with use_replica():
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _state.get() == 'replica':
+            return replica_alias()
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        # 쓰기 뒤의 읽기(read-after-write)는 같은 요청 안에서 기본 DB에서 하도록 고정합니다.
+        if _state.get() == 'replica':
+            _state.set('pinned')
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 복제본은 기본 DB와 같은 데이터이므로 어느 쪽에서 읽은 객체끼리도 연결할 수 있습니다.
+        return True
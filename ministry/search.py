@@ -0,0 +1,118 @@
+"""
+search.py는 교회 소식(NotionNotice)과 재정 내역(FinancialTransaction)의 검색 색인을 만들고, 검색하는 곳입니다.
+
+한국어는 띄어쓰기 단위로 자르면 '헌금'으로 '감사헌금'을 찾을 수 없으므로, 글자를 3개씩 묶은 조각(trigram)으로 색인합니다.
+형태소 분석기 없이도 단어의 어느 부분이든 찾을 수 있습니다.
+- SQLite: FTS5 가상 테이블(tokenize='trigram')과 트리거. 저장/수정/삭제와 bulk_create(엑셀 가져오기) 모두 DB가 알아서 색인을 고칩니다.
+- PostgreSQL: pg_trgm 확장의 GIN 색인. 평소의 icontains(LIKE) 검색이 그대로 색인을 탑니다.
+- 그 밖의 DB: 색인 없이 icontains로 찾습니다.
+
+trigram은 3글자 이상의 검색어에만 쓸 수 있어서, 2글자 이하의 검색어는 icontains로 찾습니다.
+(다른 긴 검색어와 함께 쓰면 색인으로 먼저 좁힌 결과 안에서만 찾으므로 여전히 빠릅니다.)
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import FinancialTransaction, NotionNotice
+
+MIN_TRIGRAM_LENGTH = 3
+MAX_TERMS = 5
+
+# 검색 대상: 모델 -> (색인 이름, 검색할 필드)
+SEARCH_FIELDS = {
+    NotionNotice: ('ministry_notice_fts', ('title', 'content')),
+    FinancialTransaction: ('ministry_transaction_fts', ('description', 'category')),
+}
+
+
+def split_terms(query):
+    return query.split()[:MAX_TERMS]
+
+
+def _fts_phrase(term):
+    # 따옴표로 감싸서 FTS5 문법 문자(*, -, OR 등)가 그대로 글자로 검색되게 합니다.
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search(queryset, query):
+    """queryset에서 query의 모든 단어가 (어느 필드에든) 들어 있는 것만 남깁니다."""
+    table, fields = SEARCH_FIELDS[queryset.model]
+    terms = split_terms(query)
+    if not terms:
+        return queryset.none()
+
+    long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+    if connections[queryset.db].vendor == 'sqlite' and long_terms:
+        match = ' AND '.join(_fts_phrase(term) for term in long_terms)
+        queryset = queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match]))
+        terms = [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+    for term in terms:
+        condition = Q()
+        for name in fields:
+            condition |= Q(**{f'{name}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+# ----------------------------------------------------------------------------------------
+# 색인 만들기/지우기 (post_migrate 신호와 테스트에서 호출. 마이그레이션 0013에는 같은 SQL이 복사되어 있음)
+# ----------------------------------------------------------------------------------------
+def _sqlite_statements(table, fts, fields):
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{name}' for name in fields)
+    old_values = ', '.join(f'old.{name}' for name in fields)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_search_index(connection, create=True):
+    """
+    검색 색인이 없으면 만듭니다. 여러 번 불러도 안전합니다.
+
+    SQLite는 필드를 바꾸는 마이그레이션에서 테이블을 새로 만들면서 트리거가 함께 사라지므로,
+    migrate가 끝날 때마다(signals.py의 post_migrate) create=False로 불러 사라진 트리거만 다시 만들고 색인을 다시 채웁니다.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for model, (fts, fields) in SEARCH_FIELDS.items():
+                names = [fts, f'{fts}_ai', f'{fts}_ad', f'{fts}_au']
+                cursor.execute('SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)', names)
+                found = {row[0] for row in cursor.fetchall()}
+                if fts not in found and not create:
+                    continue  # 색인을 만드는 마이그레이션(0013)이 아직 적용되지 않음
+                if found == set(names):
+                    continue
+                for statement in _sqlite_statements(model._meta.db_table, fts, fields):
+                    cursor.execute(statement)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql' and create:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for model, (_, fields) in SEARCH_FIELDS.items():
+                table = model._meta.db_table
+                for name in fields:
+                    # icontains는 UPPER("필드"::text) LIKE UPPER(...)로 바뀌므로 같은 식으로 색인합니다.
+                    cursor.execute(
+                        f'CREATE INDEX IF NOT EXISTS {table}_{name}_trgm ON {table} '
+                        f'USING gin (UPPER("{name}"::text) gin_trgm_ops)'
+                    )
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for fts, _ in SEARCH_FIELDS.values():
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif connection.vendor == 'postgresql':
+            for model, (_, fields) in SEARCH_FIELDS.items():
+                for name in fields:
+                    cursor.execute(f'DROP INDEX IF EXISTS {model._meta.db_table}_{name}_trgm')
@@ -0,0 +1,77 @@
+"""
+signals.py는 데이터가 저장/삭제될 때 자동으로 실행되는 '알림 받기' 함수들을 모아둔 곳입니다.
+관리자 화면에서 내용을 고치면 메인 화면 캐시(cache.py)의 버전을 바꿔서 바로 반영되게 하고,
+재정 내역이 바뀌면 월별 합계표(LedgerRollup)도 바뀐 만큼만 고칩니다.
+슬라이드 사진이 올라오면 화면 크기별 사본도 이때 만듭니다.
+migrate가 끝나면 검색 색인(search.py)의 SQLite 트리거가 그대로 있는지 확인합니다.
+"""
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .images import build_variants, storage_saver
+from .models import ChurchReview, FinancialTransaction, NotionNotice, SlideImage, WeeklyReport
+from .rollups import apply_deltas, collect_deltas, merge_deltas
+from .search import ensure_search_index
+
+# 메인 화면에 보여지는 모델들 (bulk_create는 신호를 보내지 않으므로 가져오기 코드에서 직접 bump_version을 부릅니다)
+DASHBOARD_MODELS = (WeeklyReport, FinancialTransaction, ChurchReview, NotionNotice, SlideImage)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_dashboard_cache(sender, **kwargs):
+    if sender in DASHBOARD_MODELS:
+        bump_version(sender)
+
+
+# ----------------------------------------------------------------------------------------
+# 재정 월별 합계표 자동 갱신
+# ----------------------------------------------------------------------------------------
+@receiver(pre_save, sender=FinancialTransaction)
+def remember_previous_transaction(sender, instance, **kwargs):
+    # 수정하는 경우, 바뀌기 전 값을 기억해 두었다가 합계표에서 빼 줍니다.
+    instance._rollup_previous = None
+    if instance.pk:
+        instance._rollup_previous = sender.objects.filter(pk=instance.pk).only(
+            'transaction_date', 'category', 'type', 'amount').first()
+
+
+@receiver(post_save, sender=FinancialTransaction)
+def add_transaction_to_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    removed = collect_deltas([previous], sign=-1) if previous else {}
+    apply_deltas(merge_deltas(removed, collect_deltas([instance])))
+
+
+@receiver(post_delete, sender=FinancialTransaction)
+def remove_transaction_from_rollup(sender, instance, **kwargs):
+    apply_deltas(collect_deltas([instance], sign=-1))
+
+
+# ----------------------------------------------------------------------------------------
+# 슬라이드 사진 사본 만들기
+# ----------------------------------------------------------------------------------------
+@receiver(post_save, sender=SlideImage)
+def build_slide_variants(sender, instance, **kwargs):
+    # 사진 파일이 바뀌었을 때만 사본을 새로 만듭니다. (제목/순서만 고친 경우는 건너뜀)
+    if not instance.image or instance.variants.get('source') == instance.image.name:
+        return
+    stem = instance.image.name.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+    with instance.image.open('rb') as source:
+        variants = build_variants(source, stem, storage_saver(default_storage, 'slides/derived'))
+    variants['source'] = instance.image.name
+    instance.variants = variants
+    sender.objects.filter(pk=instance.pk).update(variants=variants)
+
+
+# ----------------------------------------------------------------------------------------
+# 검색 색인 점검
+# ----------------------------------------------------------------------------------------
+@receiver(post_migrate)
+def repair_search_index(sender, using, **kwargs):
+    # SQLite에서 필드를 바꾸는 마이그레이션은 테이블을 새로 만들면서 트리거를 지우므로, 사라졌으면 다시 만듭니다.
+    if sender.name == 'ministry':
+        ensure_search_index(connections[using], create=False)
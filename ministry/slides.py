@@ -0,0 +1,75 @@
+"""
+slides.py는 메인 화면 슬라이드(SlideImage) 목록을 프로세스 메모리에 보관해 두는 곳입니다.
+
+슬라이드는 거의 바뀌지 않으므로 매 요청마다 목록을 다시 만들지 않습니다.
+대신 DB에서 슬라이드의 (가장 최근 수정 시각, 개수)를 확인해서 달라졌을 때만 다시 읽습니다.
+(캐시의 모델 버전은 LocMem을 쓰면 프로세스마다 따로라서, 다른 프로세스에서 고친 것을 알 수 없습니다)
+메인 화면에서는 conditional_view가 이미 읽어 둔 상태를 함께 쓰므로 쿼리가 늘지 않습니다.
+
+아직 SlideImage가 하나도 없으면(배포 직후 `python manage.py import_slides` 전) static/slides의 기본 사진을 보여줍니다.
+업로드한 파일을 내려주는 곳이 없는 배포(settings.MEDIA_SERVED가 꺼짐)에서도, 깨진 /media/ 주소 대신 기본 사진을 보여줍니다.
+"""
+import os
+
+from django.conf import settings
+from django.templatetags.static import static
+
+from .conditional import data_state, request_state
+from .models import SlideImage
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# 예전에 views.py에 고정되어 있던 슬라이드 문구 (static/slides의 파일 이름 순서대로)
+CAPTIONS = [
+    "영원한 것을 위해 영원하지 않은 것을 희생하려고 합니다.",
+    "모든 사람이 죄를 범하였으매 하나님의 영광에 이르지 못하더니",
+    "우리가 아직 죄인되었을 때에 그리스도께서 우리를 위하여 죽으심으로\n하나님께서 우리에 대한 자기의 사랑을 확증하셨느니라",
+    "하나님이 세상을 이처럼 사랑하사 독생자를 주셨으니\n이는 그를 믿는 자마다 멸망하지 않고 영생을 얻게 하려 하심이라",
+    "새 계명을 너희에게 주노니 서로 사랑하라\n내가 너희를 사랑한 것 같이 너희도 서로 사랑하라",
+]
+
+_memo = {'state': None, 'slides': []}
+
+
+def static_slide_files():
+    """static/slides의 기본 사진 파일 이름 목록 (이름순)"""
+    slides_dir = os.path.join(settings.BASE_DIR, 'static', 'slides')
+    if not os.path.isdir(slides_dir):
+        return []
+    return sorted(f for f in os.listdir(slides_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def static_slides():
+    # 사본 없이 원본 그대로 보여줍니다. (static 파일은 배포에서도 WhiteNoise가 내려줌)
+    slides = []
+    for idx, filename in enumerate(static_slide_files()):
+        caption = CAPTIONS[idx] if idx < len(CAPTIONS) else ""
+        slides.append({'id': idx, 'title': caption, 'image': {'url': static(f'slides/{filename}')}, 'variants': {}})
+    return slides
+
+
+def load_slides():
+    if not settings.MEDIA_SERVED:
+        return static_slides()
+    slides = []
+    for idx, slide in enumerate(SlideImage.objects.filter(is_active=True).order_by('order', 'id')):
+        slides.append({'id': idx, 'title': slide.title, 'image': {'url': slide.image.url}, 'variants': slide.variants})
+    if not slides and not SlideImage.objects.exists():
+        # 슬라이드를 한 번도 등록하지 않았으면 빈 화면 대신 기본 사진을 보여줍니다.
+        return static_slides()
+    return slides
+
+
+def active_slides(request=None):
+    """
+    노출 중인 슬라이드 목록. DB의 슬라이드 상태가 지난번과 같으면 메모리에 있는 목록을 돌려줍니다.
+
+    request를 주면 같은 요청에서 이미 읽은 상태(conditional_view)를 다시 쓰고, 없으면 상태 쿼리 한 번을 합니다.
+    """
+    label = SlideImage._meta.label_lower
+    state = (request_state(request, [SlideImage]) if request is not None else data_state([SlideImage]))[label]
+    state = (state, settings.MEDIA_SERVED)
+    if _memo['state'] != state:
+        _memo['slides'] = load_slides()
+        _memo['state'] = state
+    return _memo['slides']
@@ -0,0 +1,62 @@
+"""
+관리자 화면에서 쓰는 템플릿 태그입니다.
+
+ledger_date_hierarchy: 재정 내역 목록 위의 날짜 메뉴(연 -> 월 -> 일)를 그립니다.
+Django 기본 메뉴는 '어느 해/달에 내역이 있는지'를 전체 내역에 SELECT DISTINCT로 물어서 내역이 많으면 1초 넘게 걸립니다.
+연/월 단계는 월별 합계표(LedgerRollup)에서 읽고, 한 달 안의 날짜(일) 단계만 기본 메뉴를 씁니다. (한 달치라 색인으로 금방 끝남)
+"""
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from ..models import LedgerRollup
+
+register = template.Library()
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def ledger_date_hierarchy(cl):
+    field = cl.date_hierarchy
+    year_field, month_field = f'{field}__year', f'{field}__month'
+    year = cl.params.get(year_field)
+    if cl.params.get(month_field):
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field}__'])
+
+    # 구분/항목 필터는 요약표에도 있으므로 같이 적용합니다. (검색어는 요약표에 없어서 연/월 메뉴에는 반영하지 않음)
+    rows = LedgerRollup.objects.all()
+    if cl.params.get('type__exact'):
+        rows = rows.filter(type=cl.params['type__exact'])
+    if cl.params.get('category'):
+        rows = rows.filter(category=cl.params['category'])
+    if year:
+        rows = rows.filter(month__year=year)
+    months = list(rows.order_by('month').values_list('month', flat=True).distinct())
+    years = sorted({month.year for month in months})
+    if not year and len(years) == 1:
+        # 내역이 한 해에만 있으면 Django 기본 메뉴처럼 바로 월 단계를 보여줍니다.
+        year = years[0]
+
+    if year:
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [
+                {
+                    'link': link({year_field: year, month_field: month.month}),
+                    'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT')),
+                }
+                for month in months
+            ],
+        }
+    return {
+        'show': True,
+        'back': None,
+        'choices': [{'link': link({year_field: str(y)}), 'title': str(y)} for y in years],
+    }
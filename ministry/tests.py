@@ -1,3 +1,1026 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+from openpyxl import Workbook, load_workbook
+
+from . import jobs
+from .excel import ImportFileError, existing_fingerprints, import_transactions, write_xlsx
+from .jobs import STALE_AFTER, claim_next_job, process_job
+from .management.commands.startup_profile import find_problems, parse_importtime, profile_startup
+from .models import ChurchReview, FinancialTransaction, ImportJob, LedgerRollup, NotionNotice, SlideImage, WeeklyReport
+from .notion import sync_notion
+from .pagination import encode_cursor, keyset_page
+from .rollups import CATEGORY_CACHE_TIMEOUT, ledger_categories, ledger_summary, rebuild_rollups
+from .routers import ReplicaRouter, replica_reads, use_replica
+from .search import ensure_search_index, search
+from .slides import active_slides
+from .timing import RequestTimer, _current as current_timer
+from .views import home_async, notice_page, review_page, transaction_page
+
+
+def make_page(page_id, title, date='2025-12-01', edited='2025-12-01T09:00:00.000Z', **extra):
+    # 노션 API가 돌려주는 페이지 JSON을 흉내 낸 테스트용 데이터입니다.
+    page = {
+        'id': page_id,
+        'last_edited_time': edited,
+        'properties': {
+            '이름': {'title': [{'plain_text': title}]},
+            '날짜': {'date': {'start': date}},
+            '텍스트': {'rich_text': [{'plain_text': f'{title} 내용'}]},
+            '파일과 미디어': {'files': [{'name': 'a.pdf', 'file': {'url': f'https://s3/{page_id}.pdf'}}]},
+        },
+    }
+    page.update(extra)
+    return page
+
+
+class FakeDownload(io.BytesIO):
+    # urllib.request.urlopen이 돌려주는 응답을 흉내 냅니다. (헤더 + 조금씩 읽을 수 있는 본문)
+    def __init__(self, content, etag='"v1"'):
+        super().__init__(content)
+        self.headers = {'ETag': etag, 'Content-Length': str(len(content))}
+
+
+class NotionSyncTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.downloads = {}
+
+    def open_url(self, url):
+        return FakeDownload(*self.downloads.get(url, (b'%PDF same bulletin',)))
+
+    def run_sync(self, responses, **kwargs):
+        with mock.patch('ministry.notion._post', side_effect=responses) as post, \
+                mock.patch('ministry.attachments._open_url', side_effect=self.open_url):
+            result = sync_notion(api_key='key', db_id='db', **kwargs)
+        return result, post
+
+    def test_full_sync_follows_cursor(self):
+        responses = [
+            {'results': [make_page('p1', '첫 공지')], 'has_more': True, 'next_cursor': 'c1'},
+            {'results': [make_page('p2', '둘째 공지')], 'has_more': False, 'next_cursor': None},
+        ]
+        result, post = self.run_sync(responses)
+        self.assertTrue(result['full'])
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args_list[1].args[1]['start_cursor'], 'c1')
+        self.assertEqual(set(NotionNotice.objects.values_list('notion_id', flat=True)), {'p1', 'p2'})
+
+    def test_incremental_sync_filters_and_upserts(self):
+        self.run_sync([{'results': [make_page('p1', '첫 공지'), make_page('p2', '둘째 공지')], 'has_more': False}])
+
+        # 노션에서 p2를 지워도 조회 API는 지운 페이지를 돌려주지 않으므로, 증분 결과에는 고친 p1만 옵니다.
+        edited = make_page('p1', '수정된 공지', edited='2025-12-02T10:00:00.000Z')
+        result, post = self.run_sync([{'results': [edited], 'has_more': False}])
+
+        self.assertFalse(result['full'])
+        payload = post.call_args.args[1]
+        self.assertEqual(payload['filter']['last_edited_time']['on_or_after'], '2025-12-01T09:00:00Z')
+        self.assertEqual(set(NotionNotice.objects.values_list('notion_id', 'title')), {('p1', '수정된 공지'), ('p2', '둘째 공지')})
+
+        # 지운 공지는 전체 동기화 때 정리됩니다.
+        result, _ = self.run_sync([{'results': [edited], 'has_more': False}], full=True)
+        self.assertEqual(result['deleted'], 1)
+        self.assertEqual(list(NotionNotice.objects.values_list('notion_id', flat=True)), ['p1'])
+
+    def test_full_sync_removes_missing_and_legacy_rows(self):
+        NotionNotice.objects.create(title='예전 공지', date='2025-01-01')
+        self.run_sync([{'results': [make_page('p1', '첫 공지')], 'has_more': False}], full=True)
+        self.assertEqual(list(NotionNotice.objects.values_list('notion_id', flat=True)), ['p1'])
+
+    def test_page_returned_twice_during_pagination_is_saved_once(self):
+        # 첫 쪽을 받은 뒤 p1이 고쳐져서 다음 쪽에 다시 나오는 경우: 나중 것(최신)만 저장합니다.
+        first = {'results': [make_page('p1', '처음 제목'), make_page('p2', '둘째 공지')], 'has_more': True, 'next_cursor': 'c2'}
+        second = {'results': [make_page('p1', '고친 제목', edited='2025-12-01T09:05:00.000Z')], 'has_more': False}
+        result, _ = self.run_sync([first, second], full=True)
+        self.assertEqual(result['upserted'], 2)
+        self.assertEqual(dict(NotionNotice.objects.values_list('notion_id', 'title')), {'p1': '고친 제목', 'p2': '둘째 공지'})
+
+    def test_attachments_are_mirrored_once_and_served_with_long_cache(self):
+        result, _ = self.run_sync([{'results': [make_page('p1', '첫 공지'), make_page('p2', '둘째 공지')], 'has_more': False}])
+        # 두 공지에 같은 내용의 파일이 붙어 있으면 저장소에는 한 번만 저장됩니다.
+        self.assertEqual(result['attachments'], {'downloaded': 1, 'deduplicated': 1})
+        first, second = (NotionNotice.objects.get(notion_id=i).files[0] for i in ('p1', 'p2'))
+        self.assertEqual(first['sha256'], second['sha256'])
+        self.assertTrue(first['url'].startswith('/attachments/'))
+
+        response = self.client.get(first['url'])
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF same bulletin')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self.client.get(first['url'], HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_attachment_type_comes_from_mirror_record_not_url(self):
+        page = make_page('p1', '첫 공지')
+        page['properties']['파일과 미디어']['files'] = [{'name': 'page.html', 'file': {'url': 'https://s3/page.html'}}]
+        self.downloads['https://s3/page.html'] = (b'<script>alert(1)</script>',)
+        self.run_sync([{'results': [make_page('p2', '둘째 공지'), page], 'has_more': False}])
+        pdf = NotionNotice.objects.get(notion_id='p2').files[0]
+        html = NotionNotice.objects.get(notion_id='p1').files[0]
+
+        response = self.client.get(pdf['url'])
+        self.assertEqual((response['Content-Type'], response['X-Content-Type-Options']), ('application/pdf', 'nosniff'))
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        # 스크립트가 실행될 수 있는 종류는 화면에 열지 않고 내려받게 합니다.
+        self.assertTrue(self.client.get(html['url'])['Content-Disposition'].startswith('attachment'))
+        # 주소의 파일 이름을 바꿔 치면 찾을 수 없습니다.
+        self.assertEqual(self.client.get(f"/attachments/{pdf['sha256']}/evil.html").status_code, 404)
+
+    def test_unchanged_attachment_is_not_downloaded_again(self):
+        self.run_sync([{'results': [make_page('p1', '첫 공지')], 'has_more': False}])
+        edited = make_page('p1', '수정된 공지', edited='2025-12-02T10:00:00.000Z')
+        with mock.patch('ministry.attachments._download', side_effect=AssertionError('본문을 다시 받으면 안 됩니다')):
+            result, _ = self.run_sync([{'results': [edited], 'has_more': False}])
+        self.assertEqual(result['attachments'], {'reused': 1})
+
+        # 노션에서 파일을 바꾸면(ETag가 달라짐) 새로 받아 새 주소가 됩니다.
+        url = NotionNotice.objects.get().files[0]['url']
+        self.downloads['https://s3/p1.pdf'] = (b'%PDF new bulletin', '"v2"')
+        edited = make_page('p1', '다시 수정된 공지', edited='2025-12-03T10:00:00.000Z')
+        result, _ = self.run_sync([{'results': [edited], 'has_more': False}])
+        self.assertEqual(result['attachments'], {'downloaded': 1})
+        self.assertNotEqual(NotionNotice.objects.get().files[0]['url'], url)
+
+    def test_failed_download_is_retried_without_page_edits(self):
+        with mock.patch('ministry.notion._post', return_value={'results': [make_page('p1', '첫 공지')], 'has_more': False}), \
+                mock.patch('ministry.attachments._open_url', side_effect=OSError('timed out')):
+            result = sync_notion(api_key='key', db_id='db')
+        self.assertEqual(result['attachments'], {'failed': 1})
+        self.assertEqual(result['pending'], 1)
+        self.assertEqual(NotionNotice.objects.get().files[0]['url'], 'https://s3/p1.pdf')
+
+        # 노션에서 고치지 않았으므로 증분 동기화 결과는 비어 있지만, 복사하지 못한 공지는 페이지를 다시 불러옵니다.
+        with mock.patch('ministry.notion._get', return_value=make_page('p1', '첫 공지')) as get:
+            result, _ = self.run_sync([{'results': [], 'has_more': False}])
+        get.assert_called_once_with('https://api.notion.com/v1/pages/p1', 'key')
+        self.assertEqual((result['attachments'], result['pending']), ({'downloaded': 1}, 0))
+        notice = NotionNotice.objects.get()
+        self.assertTrue(notice.files[0]['url'].startswith('/attachments/'))
+        self.assertFalse(notice.files_pending)
+
+
+class NoticeListTests(TestCase):
+    def create_notices(self, count):
+        NotionNotice.objects.bulk_create([
+            NotionNotice(title=f'공지 {i}', date=datetime.date(2020, 1, 1) + datetime.timedelta(days=i), files=[{'name': f'{i}.pdf', 'url': f'/f/{i}.pdf'}])
+            for i in range(count)
+        ])
+
+    def fetch_page(self, cursor):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/partials/notices/', {'cursor': cursor}, HTTP_HX_REQUEST='true')
+        return response, len(ctx.captured_queries)
+
+    def test_attachments_are_decoded(self):
+        self.create_notices(8)
+        response, _ = self.fetch_page(notice_page().next_cursor)
+        self.assertEqual(len(response.context['notion_notices']), 2)
+        self.assertEqual(response.context['notion_notices'][0].files[0]['name'], '1.pdf')
+        self.assertContains(response, 'hx-swap-oob="true"')
+
+    def test_query_count_does_not_grow_with_archive(self):
+        self.create_notices(12)
+        cursor = notice_page().next_cursor
+        _, small = self.fetch_page(cursor)
+        self.create_notices(300)
+        _, large = self.fetch_page(cursor)
+        self.assertEqual(small, large)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_walks_every_row_once_without_count(self):
+        # 같은 날짜가 여러 개여도 (날짜, id) 순서로 빠짐없이, 중복 없이 넘겨야 합니다.
+        FinancialTransaction.objects.bulk_create([
+            FinancialTransaction(transaction_date=datetime.date(2025, 1, 1 + i % 3), type='IN',
+                                 category='선교부', description=f'내역 {i}', amount=i)
+            for i in range(25)
+        ])
+        seen, cursor = [], None
+        with CaptureQueriesContext(connection) as ctx:
+            while True:
+                page = keyset_page(FinancialTransaction.objects.all(), ('-transaction_date', '-id'), cursor, 10)
+                seen.extend(tx.pk for tx in page)
+                if not page.has_next:
+                    break
+                cursor = page.next_cursor
+        expected = list(FinancialTransaction.objects.order_by('-transaction_date', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertFalse(any('COUNT' in q['sql'] for q in ctx.captured_queries))
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        FinancialTransaction.objects.bulk_create([
+            FinancialTransaction(transaction_date=datetime.date(2025, 1, 1 + i % 3), type='IN',
+                                 category='선교부', description=f'내역 {i}', amount=i)
+            for i in range(25)
+        ])
+        ordering = ('-transaction_date', '-id')
+        first = keyset_page(FinancialTransaction.objects.all(), ordering, None, 10)
+        # 깨진 문자열, 값 개수가 틀린 커서, 날짜가 아닌 값이 든 커서
+        for cursor in ('not-a-cursor', encode_cursor([1]), encode_cursor(['어제', 3])):
+            page = keyset_page(FinancialTransaction.objects.all(), ordering, cursor, 10)
+            self.assertEqual([tx.pk for tx in page], [tx.pk for tx in first])
+            self.assertEqual(page.next_cursor, first.next_cursor)
+
+
+def make_workbook(rows, header=('날짜', '구분', '부서', '내역', '금액')):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append(list(row))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class ExcelImportTests(TestCase):
+    def test_imports_in_chunks(self):
+        rows = [(datetime.date(2025, 1, 5), '수입' if i % 2 else '지출', '주일헌금', f'내역 {i}', 1000 * i) for i in range(1, 8)]
+        result = import_transactions(make_workbook(rows), chunk_size=3)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.created, 7)
+        self.assertEqual(FinancialTransaction.objects.filter(type='IN').count(), 4)
+
+    def test_bad_row_rolls_back_everything(self):
+        rows = [
+            ('2025-01-05', '수입', '주일헌금', '정상', '10,000'),
+            ('2025-01-05', '기타', '주일헌금', '구분 오류', 1000),
+            ('날짜아님', '지출', '관리비', '날짜 오류', 1000),
+        ]
+        result = import_transactions(make_workbook(rows), chunk_size=1)
+        self.assertEqual(result.created, 0)
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+        self.assertFalse(FinancialTransaction.objects.exists())
+
+    def test_missing_header(self):
+        with self.assertRaises(ImportFileError):
+            import_transactions(make_workbook([], header=('날짜', '금액')))
+
+    def test_reimport_skips_rows_already_present(self):
+        march = [
+            ('2025-03-02', '수입', '주일헌금', '헌금', 5000),
+            ('2025-03-02', '수입', '주일헌금', '헌금', 5000),  # 같은 날 같은 헌금이 두 번 있어도 둘 다 저장됩니다.
+            ('2025-03-09', '지출', '관리비', '전기요금', 30000),
+        ]
+        self.assertEqual(import_transactions(make_workbook(march), chunk_size=2).created, 3)
+
+        again = import_transactions(make_workbook(march), chunk_size=2)
+        self.assertEqual((again.created, again.existing), (0, 3))
+
+        # 기간이 겹치는 파일: 3월 줄은 (띄어쓰기가 달라도) 이미 있고, 4월 줄만 새로 저장됩니다.
+        quarter = [('2025-03-02', '수입', ' 주일헌금', '헌금 ', 5000)] * 2 + march[2:] + [('2025-04-06', '수입', '주일헌금', '헌금', 5000)]
+        result = import_transactions(make_workbook(quarter))
+        self.assertEqual((result.created, result.existing), (1, 3))
+        self.assertEqual(FinancialTransaction.objects.count(), 4)
+        self.assertEqual(LedgerRollup.objects.get(month=datetime.date(2025, 3, 1), type='IN').count, 2)
+
+    def test_row_saved_concurrently_is_not_counted_twice(self):
+        rows = [('2025-05-04', '수입', '주일헌금', '헌금', 5000), ('2025-05-04', '지출', '관리비', '수도요금', 20000)]
+        import_transactions(make_workbook(rows[:1]))
+
+        # 다른 작업이 첫 줄을 먼저 저장해서, 미리 확인할 때는 없었는데 저장할 때 부딪히는 경우입니다.
+        calls = []
+
+        def lookup(fingerprints):
+            calls.append(fingerprints)
+            return set() if len(calls) == 1 else existing_fingerprints(fingerprints)
+
+        with mock.patch('ministry.excel.existing_fingerprints', side_effect=lookup):
+            result = import_transactions(make_workbook(rows))
+
+        self.assertEqual((result.created, result.existing), (1, 1))
+        self.assertEqual(FinancialTransaction.objects.count(), 2)
+        rollup = LedgerRollup.objects.get(month=datetime.date(2025, 5, 1), type='IN')
+        self.assertEqual((rollup.total, rollup.count), (5000, 1))
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def upload(self, rows):
+        upload = SimpleUploadedFile('ledger.xlsx', make_workbook(rows).getvalue())
+        return self.client.post('/admin/ministry/financialtransaction/upload-excel/', {'excel_file': upload})
+
+    def test_upload_returns_immediately_and_worker_imports(self):
+        rows = [('2025-01-05', '수입', '주일헌금', f'내역 {i}', 1000) for i in range(5)]
+        response = self.upload(rows)
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f'/admin/ministry/financialtransaction/upload-excel/{job.pk}/')
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertFalse(FinancialTransaction.objects.exists())
+
+        # 끝나기 전의 진행 조각은 htmx가 계속 다시 부르도록 hx-trigger를 담고 있습니다.
+        fragment = self.client.get(f'/admin/ministry/financialtransaction/upload-excel/{job.pk}/', HTTP_HX_REQUEST='true')
+        self.assertContains(fragment, 'hx-trigger="every 2s"')
+
+        call_command('run_import_jobs', '--once', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_processed, job.created_count), (ImportJob.DONE, 5, 5))
+        self.assertEqual(FinancialTransaction.objects.count(), 5)
+        fragment = self.client.get(f'/admin/ministry/financialtransaction/upload-excel/{job.pk}/', HTTP_HX_REQUEST='true')
+        self.assertNotContains(fragment, 'hx-trigger')
+        self.assertContains(fragment, '5건 등록 완료')
+
+        # 같은 파일을 다시 올리면 아무것도 더해지지 않고, 이미 있던 줄 수가 보고됩니다.
+        self.upload(rows)
+        call_command('run_import_jobs', '--once', stdout=io.StringIO())
+        again = ImportJob.objects.latest('created_at')
+        self.assertEqual((again.status, again.created_count, again.existing_count), (ImportJob.DONE, 0, 5))
+        self.assertEqual(FinancialTransaction.objects.count(), 5)
+
+    def test_bad_rows_fail_the_job_without_saving(self):
+        self.upload([('2025-01-05', '수입', '주일헌금', '정상', 1000), ('날짜아님', '지출', '관리비', '날짜 오류', 1000)])
+        call_command('run_import_jobs', '--once', stdout=io.StringIO())
+        job = ImportJob.objects.get()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual([line for line, _ in job.errors], [3])
+        self.assertFalse(FinancialTransaction.objects.exists())
+        self.assertContains(self.client.get(f'/admin/ministry/financialtransaction/upload-excel/{job.pk}/'), '<tr><td>3</td>')
+
+    def test_job_left_by_dead_worker_is_failed(self):
+        # 처리기가 저장 도중 죽어서 '저장 중'으로 남은 작업과, 지금 검사 중인 작업
+        self.upload([('2025-01-05', '수입', '주일헌금', '헌금', 1000)])
+        self.upload([('2025-01-12', '수입', '주일헌금', '헌금', 1000)])
+        stuck, running = ImportJob.objects.order_by('pk')
+        now = timezone.now()
+        ImportJob.objects.filter(pk=stuck.pk).update(status=ImportJob.SAVING, heartbeat_at=now - STALE_AFTER - datetime.timedelta(minutes=1))
+        ImportJob.objects.filter(pk=running.pk).update(status=ImportJob.VALIDATING, heartbeat_at=now - datetime.timedelta(minutes=1))
+
+        call_command('run_import_jobs', '--once', stdout=io.StringIO())
+        stuck.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stuck.status, ImportJob.FAILED)
+        self.assertEqual(running.status, ImportJob.VALIDATING)
+        # 진행 조각이 더 이상 다시 묻지 않고, 다시 올려 달라는 안내를 보여줍니다.
+        fragment = self.client.get(f'/admin/ministry/financialtransaction/upload-excel/{stuck.pk}/', HTTP_HX_REQUEST='true')
+        self.assertNotContains(fragment, 'hx-trigger')
+        self.assertContains(fragment, '다시 올려 주세요')
+
+    def test_saving_ticks_heartbeat_and_keeps_status_set_by_another_worker(self):
+        self.upload([('2025-01-05', '수입', '주일헌금', f'내역 {i}', 1000) for i in range(5)])
+        job = claim_next_job()
+        real_import = jobs.import_transactions
+
+        def slow_import(*args, **kwargs):
+            result = real_import(*args, **kwargs)
+            # 저장이 오래 걸리는 사이 다른 처리기가 이 작업을 멈춘 것으로 보고 실패 처리한 경우
+            ImportJob.objects.filter(pk=job.pk).update(status=ImportJob.FAILED, message='멈춘 작업으로 처리됨')
+            return result
+
+        with mock.patch('ministry.jobs.HEARTBEAT_INTERVAL', 0), \
+                mock.patch('ministry.jobs.touch_heartbeat') as beat, \
+                mock.patch('ministry.jobs.import_transactions', side_effect=slow_import):
+            process_job(job, chunk_size=2)
+
+        self.assertEqual(beat.call_count, 3)  # 2줄씩 세 묶음
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.message), (ImportJob.FAILED, '멈춘 작업으로 처리됨'))
+
+
+class ImportHeartbeatTests(TransactionTestCase):
+    # heartbeat는 다른 스레드(다른 DB 연결)에서 적으므로, 데이터가 실제로 커밋되는 TransactionTestCase를 씁니다.
+    def test_heartbeat_is_written_from_another_connection(self):
+        job = ImportJob.objects.create(file='imports/ledger.xlsx', status=ImportJob.SAVING)
+        jobs.touch_heartbeat(job.pk)
+        job.refresh_from_db()
+        self.assertIsNotNone(job.heartbeat_at)
+
+
+class ExcelExportTests(TestCase):
+    def setUp(self):
+        FinancialTransaction.objects.bulk_create([
+            FinancialTransaction(transaction_date=datetime.date(2025, 1, day), type='IN' if day % 2 else 'OUT',
+                                 category='선교부' if day < 5 else '교육부', description=f'내역 {day}', amount=day * 1000)
+            for day in range(1, 11)
+        ])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def test_selection_action_streams_xlsx(self):
+        ids = list(FinancialTransaction.objects.values_list('pk', flat=True)[:3])
+        response = self.client.post('/admin/ministry/financialtransaction/', {
+            'action': 'export_to_excel', '_selected_action': ids,
+        })
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('날짜', '구분', '부서', '내역', '금액'))
+        self.assertEqual(len(rows), 4)
+
+    def test_xlsx_keeps_dates_and_numbers(self):
+        buffer = io.BytesIO()
+        write_xlsx(FinancialTransaction.objects.all(), buffer, chunk_size=4)
+        rows = list(load_workbook(buffer, read_only=True).active.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[1], (datetime.datetime(2025, 1, 1), '수입', '선교부', '내역 1', 1000))
+
+    def test_export_view_filters_csv(self):
+        response = self.client.get('/admin/ministry/financialtransaction/export/', {
+            'start_date': '2025-01-02', 'end_date': '2025-01-08', 'type': 'IN', 'category': '교육부', 'file_format': 'csv',
+        })
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines, ['날짜,구분,부서,내역,금액', '2025-01-05,수입,교육부,내역 5,5000', '2025-01-07,수입,교육부,내역 7,7000'])
+
+
+class FragmentEndpointTests(TestCase):
+    def setUp(self):
+        FinancialTransaction.objects.bulk_create([
+            FinancialTransaction(transaction_date=datetime.date(2025, 1, 1), type='IN', category='선교부', description=f'내역 {i}', amount=i)
+            for i in range(15)
+        ])
+        ChurchReview.objects.bulk_create([ChurchReview(author_name=f'성도{i}', content='좋아요') for i in range(8)])
+        NotionNotice.objects.bulk_create([NotionNotice(title=f'공지 {i}', date='2025-01-01') for i in range(8)])
+
+    def test_each_fragment_runs_only_its_own_queries(self):
+        # 모든 조각은 ETag용 상태 확인 쿼리가 하나 먼저 실행되고, 재정 목록은 잔액 계산 쿼리가 하나 더 붙습니다.
+        for url, key, more_id, first_page, queries in (
+                ('/partials/transactions/', 'transactions', 'transaction-more', transaction_page, 3),
+                ('/partials/reviews/', 'reviews', 'review-more', review_page, 2),
+                ('/partials/notices/', 'notion_notices', 'notion-more', notice_page, 2)):
+            with self.subTest(url=url):
+                cursor = first_page().next_cursor
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, {'cursor': cursor}, HTTP_HX_REQUEST='true')
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context[key].has_next)
+                self.assertContains(response, f'id="{more_id}" class="mt-12 flex justify-center" hx-swap-oob="true"')
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        WeeklyReport.objects.create(date=datetime.date(2025, 1, 5), worship_attendance=120)
+        FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 1, 5), type='IN',
+                                            category='주일헌금', description='첫 헌금', amount=1000)
+
+    def test_warm_request_only_checks_state(self):
+        self.client.get('/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/')
+        self.assertContains(response, '첫 헌금')
+        self.assertContains(response, '120')
+
+    def test_admin_edit_invalidates_section(self):
+        self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 1, 6), type='OUT',
+                                                category='관리비', description='전기요금', amount=500)
+        self.assertContains(self.client.get('/'), '전기요금')
+
+    def test_bulk_import_invalidates_section(self):
+        self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            import_transactions(make_workbook([('2025-01-07', '수입', '감사헌금', '엑셀로 올린 헌금', 3000)]))
+        self.assertContains(self.client.get('/'), '엑셀로 올린 헌금')
+
+
+class AsyncDashboardTests(TransactionTestCase):
+    # 비동기 화면은 구역마다 다른 스레드(DB 연결)에서 읽으므로, 데이터가 실제로 커밋되는 TransactionTestCase를 씁니다.
+    def setUp(self):
+        cache.clear()
+        WeeklyReport.objects.create(date=datetime.date(2025, 1, 5), worship_attendance=120)
+        FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 1, 5), type='IN',
+                                            category='주일헌금', description='첫 헌금', amount=1000)
+
+    async def test_async_dashboard_matches_sync_view(self):
+        response = await home_async(AsyncRequestFactory().get('/'))
+        self.assertContains(response, '첫 헌금')
+        self.assertContains(response, '120')
+        self.assertContains(response, 'name="author_name"')
+
+        # 같은 데이터면 동기 화면(home)과 ETag가 같아서, 어느 쪽이 답하든 304로 재검증됩니다.
+        sync_response = await self.async_client.get('/')
+        self.assertEqual(sync_response['ETag'], response['ETag'])
+        again = await home_async(AsyncRequestFactory().get('/', headers={'If-None-Match': response['ETag']}))
+        self.assertEqual(again.status_code, 304)
+
+    async def test_worker_thread_queries_reach_server_timing(self):
+        # 구역을 그리는 작업 스레드는 미들웨어와 다른 DB 연결을 쓰므로, 그 쿼리도 따로 기록되는지 봅니다.
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        try:
+            await home_async(AsyncRequestFactory().get('/'))
+        finally:
+            current_timer.reset(token)
+        sections = {name: queries for name, _, queries, _ in timer.sections}
+        self.assertGreater(sections['section_transactions'], 0)
+        self.assertGreaterEqual(timer.queries, sum(sections.values()))
+
+    async def test_review_check_runs_off_the_event_loop(self):
+        # ETag에 넣는 home_variant도, 화면의 리뷰 입력창 확인도 캐시를 읽으므로 이벤트 루프 밖에서 불려야 합니다.
+        def off_loop(*args):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return True
+            raise AssertionError('review_allowed가 이벤트 루프에서 불렸습니다.')
+
+        with mock.patch('ministry.views.review_allowed', side_effect=off_loop) as check:
+            response = await home_async(AsyncRequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check.call_count, 2)
+
+    async def test_review_post_is_handled_by_sync_view(self):
+        request = AsyncRequestFactory().post('/', {'author_name': '성도', 'rating': 5, 'content': '좋아요'})
+        response = await home_async(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(await ChurchReview.objects.acount(), 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        WeeklyReport.objects.create(date=datetime.date(2025, 1, 5), worship_attendance=120)
+        self.tx = FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 1, 5), type='IN',
+                                                      category='주일헌금', description='첫 헌금', amount=1000)
+
+    def test_unchanged_dashboard_is_304_after_one_query(self):
+        first = self.client.get('/')
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertIn('private', first['Cache-Control'])
+        with self.assertNumQueries(1):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        # 리뷰를 더 쓸 수 없는 방문자는 입력창 대신 감사 문구를 보므로 ETag도 다릅니다.
+        cache.set('ministry:review_bucket:10.0.0.9', (0, time.time()), 60)
+        self.assertNotEqual(self.client.get('/', REMOTE_ADDR='10.0.0.9')['ETag'], first['ETag'])
+
+    def test_edit_or_delete_changes_the_validator(self):
+        etag = self.client.get('/partials/transactions/')['ETag']
+        self.tx.description = '고친 헌금'
+        self.tx.save()
+        response = self.client.get('/partials/transactions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '고친 헌금')
+
+        etag = response['ETag']
+        FinancialTransaction.objects.filter(pk=self.tx.pk).delete()
+        self.assertEqual(self.client.get('/partials/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_last_modified_revalidation(self):
+        ChurchReview.objects.create(author_name='성도', content='좋아요')
+        last_modified = self.client.get('/partials/reviews/')['Last-Modified']
+        self.assertEqual(self.client.get('/partials/reviews/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+
+class ReviewRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def post_review(self, content='좋아요'):
+        return self.client.post('/', {'author_name': '성도', 'rating': 5, 'content': content})
+
+    def test_limit_is_enforced_without_querying_on_get(self):
+        self.assertContains(self.client.get('/'), 'name="author_name"')
+        response = self.post_review()
+        self.assertIn('review_bucket', response.cookies)
+        self.post_review('두 번째')
+        self.assertEqual(ChurchReview.objects.count(), 1)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/')
+        self.assertNotContains(response, 'name="author_name"')
+        self.assertFalse(any('ministry_churchreview' in query['sql'] and 'ip_address' in query['sql'] for query in captured))
+
+    def test_database_is_authoritative_when_hints_are_lost(self):
+        self.post_review()
+        # 캐시가 비워지고 쿠키도 지운 방문자: 입력창은 다시 보이지만 저장은 DB 확인으로 막힙니다.
+        cache.clear()
+        self.client.cookies.clear()
+        self.assertContains(self.client.get('/'), 'name="author_name"')
+        self.post_review('두 번째')
+        self.assertEqual(ChurchReview.objects.count(), 1)
+        self.assertNotContains(self.client.get('/'), 'name="author_name"')
+
+    @override_settings(REVIEW_RATE_LIMIT=2)
+    def test_configurable_limit(self):
+        self.post_review()
+        self.assertContains(self.client.get('/'), 'name="author_name"')
+        self.post_review('두 번째')
+        self.post_review('세 번째')
+        self.assertEqual(ChurchReview.objects.count(), 2)
+
+    def test_window_is_rolling_not_calendar_day(self):
+        # 23시간 전에 쓴 리뷰는 그 사이 날짜가 바뀌었어도 아직 기간 안이라 막히고, 24시간이 지나면 다시 쓸 수 있습니다.
+        self.post_review()
+        ChurchReview.objects.update(created_at=timezone.now() - datetime.timedelta(hours=23))
+        cache.clear()
+        self.client.cookies.clear()
+        self.post_review('두 번째')
+        self.assertEqual(ChurchReview.objects.count(), 1)
+
+        ChurchReview.objects.update(created_at=timezone.now() - datetime.timedelta(hours=25))
+        cache.clear()
+        self.client.cookies.clear()
+        self.post_review('두 번째')
+        self.assertEqual(ChurchReview.objects.count(), 2)
+
+
+class LedgerRollupTests(TestCase):
+    def rollup(self):
+        return set(LedgerRollup.objects.values_list('month', 'category', 'type', 'total', 'count'))
+
+    def test_save_update_delete_keep_rollup_in_sync(self):
+        tx = FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 3, 9), type='IN',
+                                                 category='주일헌금', description='헌금', amount=1000)
+        FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 3, 16), type='IN',
+                                            category='주일헌금', description='헌금', amount=500)
+        self.assertEqual(self.rollup(), {(datetime.date(2025, 3, 1), '주일헌금', 'IN', 1500, 2)})
+
+        tx.transaction_date, tx.category, tx.amount = datetime.date(2025, 4, 6), '감사헌금', 700
+        tx.save()
+        self.assertEqual(self.rollup(), {
+            (datetime.date(2025, 3, 1), '주일헌금', 'IN', 500, 1),
+            (datetime.date(2025, 4, 1), '감사헌금', 'IN', 700, 1),
+        })
+
+        tx.delete()
+        self.assertEqual(self.rollup(), {(datetime.date(2025, 3, 1), '주일헌금', 'IN', 500, 1)})
+
+    def test_bulk_import_matches_rebuild(self):
+        rows = [(datetime.date(2025, 1 + i % 3, 1 + i), '수입' if i % 2 else '지출', f'부서{i % 2}', f'내역 {i}', 100 * i)
+                for i in range(12)]
+        import_transactions(make_workbook(rows), chunk_size=5)
+        incremental = self.rollup()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rollup())
+
+        summary = ledger_summary(2025)
+        self.assertEqual(summary['income'] + summary['expense'], sum(100 * i for i in range(12)))
+        self.assertEqual([m['month'].month for m in summary['months']], [1, 2, 3])
+
+
+class RunningBalanceTests(TestCase):
+    def test_balance_matches_python_running_sum_on_deep_page(self):
+        for i in range(40):
+            FinancialTransaction.objects.create(transaction_date=datetime.date(2024, 1 + i % 12, 1 + i % 7),
+                                                type='OUT' if i % 4 == 0 else 'IN', category='c', description='d', amount=i * 10)
+        expected, running = {}, 0
+        for tx in FinancialTransaction.objects.order_by('transaction_date', 'id'):
+            running += tx.amount if tx.type == 'IN' else -tx.amount
+            expected[tx.pk] = running
+
+        page, cursor = None, None
+        for _ in range(3):  # 세 번째 묶음(깊은 페이지)까지 넘겨서 확인합니다.
+            page = transaction_page(cursor)
+            cursor = page.next_cursor
+        self.assertEqual([tx.balance for tx in page], [expected[tx.pk] for tx in page])
+
+
+@override_settings(MEDIA_SERVED=True)
+class SlideImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_slide(self, title, order=0, size=(1200, 600)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'navy').save(buffer, format='PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            return SlideImage.objects.create(title=title, order=order, image=SimpleUploadedFile('s.png', buffer.getvalue()))
+
+    def test_upload_builds_responsive_variants(self):
+        slide = self.make_slide('표지')
+        slide.refresh_from_db()
+        webp = next(s for s in slide.variants['sources'] if s['type'] == 'image/webp')
+        self.assertEqual([entry.rsplit(' ', 1)[1] for entry in webp['srcset'].split(', ')], ['480w', '960w', '1200w'])
+        self.assertTrue(slide.variants['placeholder'].startswith('data:image/webp;base64,'))
+
+    def test_wide_source_lists_each_width_once(self):
+        slide = self.make_slide('넓은 사진', size=(2400, 1200))
+        slide.refresh_from_db()
+        for source in slide.variants['sources']:
+            widths = [entry.rsplit(' ', 1)[1] for entry in source['srcset'].split(', ')]
+            self.assertEqual(widths, ['480w', '960w', '1440w', '1920w'])
+
+    def test_carousel_uses_srcset(self):
+        self.make_slide('첫 번째')
+        self.make_slide('두 번째', order=1)
+        response = self.client.get('/')
+        self.assertContains(response, 'type="image/webp" srcset="/media/slides/derived/')
+        self.assertContains(response, 'fetchpriority="high"', count=1)
+
+    def test_slide_list_is_memoized_until_a_slide_changes(self):
+        self.make_slide('첫 번째')
+        self.assertEqual([s['title'] for s in active_slides()], ['첫 번째'])
+        with self.assertNumQueries(1), mock.patch('ministry.slides.load_slides', side_effect=AssertionError('다시 읽으면 안 됩니다')):
+            active_slides()
+
+        slide = self.make_slide('맨 앞', order=-1)
+        self.assertEqual([s['title'] for s in active_slides()], ['맨 앞', '첫 번째'])
+        # 다른 프로세스에서 고친 것처럼 신호도 캐시 버전도 없이 바꿔도 다음 요청에 반영됩니다.
+        cache.clear()
+        SlideImage.objects.filter(pk=slide.pk).update(is_active=False, updated_at=datetime.datetime(2030, 1, 1))
+        self.assertEqual([s['title'] for s in active_slides()], ['첫 번째'])
+
+    def test_static_slides_are_shown_until_slides_are_imported(self):
+        slides = active_slides()
+        self.assertTrue(slides)
+        self.assertTrue(slides[0]['image']['url'].startswith('/static/slides/'))
+
+    def test_static_slides_are_shown_when_media_is_not_served(self):
+        self.make_slide('업로드한 사진')
+        with override_settings(MEDIA_SERVED=False):
+            slides = active_slides()
+        self.assertTrue(slides[0]['image']['url'].startswith('/static/slides/'))
+        self.assertEqual(active_slides()[0]['title'], '업로드한 사진')
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.day = datetime.date(2025, 3, 2)
+        NotionNotice.objects.create(title='청년부 여름 수련회 안내', content='7월 둘째 주, 장소는 가평', date=self.day)
+        NotionNotice.objects.create(title='주보', content='이번 주 예배 순서', date=self.day)
+        import_transactions(make_workbook([
+            (self.day, '수입', '감사헌금', '부활절 감사헌금', 50000),
+            (self.day, '지출', '선교부', '필리핀 선교 후원', 300000),
+        ]))
+
+    def titles(self, query):
+        return sorted(search(NotionNotice.objects.all(), query).values_list('title', flat=True))
+
+    def test_finds_hangul_substrings_in_any_field(self):
+        self.assertEqual(self.titles('수련회'), ['청년부 여름 수련회 안내'])
+        self.assertEqual(self.titles('가평 청년'), ['청년부 여름 수련회 안내'])  # 2글자 단어는 icontains로 찾음
+        self.assertEqual(self.titles('예배 순서'), ['주보'])
+        self.assertEqual(self.titles('"OR*'), [])
+
+    def test_index_follows_bulk_import_updates_and_deletes(self):
+        self.assertEqual(search(FinancialTransaction.objects.all(), '감사헌금').count(), 1)
+        tx = FinancialTransaction.objects.get(category='선교부')
+        tx.description = '캄보디아 선교 후원'
+        tx.save()
+        self.assertFalse(search(FinancialTransaction.objects.all(), '필리핀').exists())
+        self.assertTrue(search(FinancialTransaction.objects.all(), '캄보디아').exists())
+        tx.delete()
+        self.assertFalse(search(FinancialTransaction.objects.all(), '캄보디아').exists())
+
+    def test_lost_triggers_are_recreated_after_migrate(self):
+        # SQLite가 테이블을 새로 만들며 트리거를 지운 상황을 흉내 냅니다.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER ministry_notice_fts_ai')
+        ensure_search_index(connection, create=False)
+        NotionNotice.objects.create(title='성탄절 칸타타', content='', date=self.day)
+        self.assertEqual(self.titles('칸타타'), ['성탄절 칸타타'])
+
+    def test_search_fragment_and_admin(self):
+        response = self.client.get('/partials/search/', {'q': '선교 후원'})
+        self.assertContains(response, '필리핀 선교 후원')
+        self.assertContains(response, "'선교 후원'에 해당하는 소식이 없습니다.")
+
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        response = self.client.get('/admin/ministry/financialtransaction/', {'q': '부활절'})
+        self.assertContains(response, '부활절 감사헌금')
+        self.assertNotContains(response, '필리핀 선교 후원')
+
+
+class FinancialAdminChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i, (day, category) in enumerate([((2024, 12, 29), '선교부'), ((2025, 1, 5), '주일헌금'),
+                                             ((2025, 1, 12), '주일헌금'), ((2025, 3, 2), '선교부')]):
+            FinancialTransaction.objects.create(transaction_date=datetime.date(*day), type='IN', category=category,
+                                                description=f'내역 {i}', amount=1000)
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+
+    def get(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/ministry/financialtransaction/', params or {})
+        ledger_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "ministry_financialtransaction"' in q['sql']]
+        return response, ledger_queries
+
+    def test_filters_counts_and_dates_come_from_rollup(self):
+        response, ledger_queries = self.get()
+        # 내역 표에는 화면에 보일 줄을 읽는 쿼리 하나만 갑니다. (항목 목록, 개수, 날짜 메뉴는 요약표에서)
+        self.assertEqual(len(ledger_queries), 1)
+        self.assertNotIn('DISTINCT', ledger_queries[0])
+        self.assertEqual(response.context['cl'].result_count, 4)
+        self.assertContains(response, 'data-name="category" value="선교부"')
+        self.assertContains(response, '?transaction_date__year=2024')
+
+        response, ledger_queries = self.get({'category': '주일헌금'})
+        self.assertEqual(len(ledger_queries), 1)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        # 주일헌금은 2025년에만 있으므로 날짜 메뉴가 바로 월 단계로 내려갑니다.
+        self.assertContains(response, 'transaction_date__month=1')
+        self.assertNotContains(response, 'transaction_date__month=3')
+
+    def test_category_choices_expire_without_version_bump(self):
+        self.assertEqual(ledger_categories(), ['선교부', '주일헌금'])
+        # 다른 프로세스에서 저장한 것처럼, 이 프로세스의 캐시 버전은 그대로입니다. (TestCase는 on_commit을 실행하지 않음)
+        FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 3, 9), type='OUT', category='교육부',
+                                            description='교재', amount=500)
+        self.assertNotIn('교육부', ledger_categories())
+        later = time.time() + CATEGORY_CACHE_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertIn('교육부', ledger_categories())
+
+    def test_search_and_day_level_fall_back_to_real_queries(self):
+        response, _ = self.get({'q': '내역 3'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response, _ = self.get({'transaction_date__year': '2025', 'transaction_date__month': '1'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertContains(response, 'transaction_date__day=12')
+
+
+class LedgerApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for day in range(1, 6):
+            FinancialTransaction.objects.create(transaction_date=datetime.date(2025, 1, day), type='IN' if day % 2 else 'OUT',
+                                                category='선교부' if day == 2 else '주일헌금', description=f'내역 {day}', amount=day * 1000)
+
+    def test_json_pages_follow_next_cursor(self):
+        data = self.client.get('/api/transactions/', {'limit': 2, 'start_date': '2025-01-02'}).json()
+        self.assertEqual([row['description'] for row in data['results']], ['내역 2', '내역 3'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([row['transaction_date'] for row in data['results']], ['2025-01-04', '2025-01-05'])
+        self.assertIsNone(data['next'])
+
+    def test_ndjson_streams_filtered_rows(self):
+        response = self.client.get('/api/transactions/', {'type': 'OUT'}, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual([(row['category'], row['amount']) for row in rows], [('선교부', 2000), ('주일헌금', 4000)])
+
+    def test_etag_answers_304_with_one_state_query(self):
+        etag = self.client.get('/api/transactions/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/transactions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Vary'], 'Accept')
+
+        # 캐시(모델 버전)가 비어 있는 다른 프로세스에서 고쳐도 ETag가 바뀌어야 합니다.
+        cache.clear()
+        FinancialTransaction.objects.filter(description='내역 1').update(amount=1, updated_at=datetime.datetime(2030, 1, 1))
+        self.assertEqual(self.client.get('/api/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_garbage_cursor_is_rejected(self):
+        response = self.client.get('/api/transactions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', response.json()['errors'])
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(response['Vary'], 'Accept')
+
+    def test_weekly_reports_and_invalid_filters(self):
+        WeeklyReport.objects.create(date=datetime.date(2025, 1, 5), worship_attendance=120)
+        data = self.client.get('/api/weekly-reports/', {'start_date': '2025-01-01'}).json()
+        self.assertEqual(data['results'][0]['worship_attendance'], 120)
+        self.assertEqual(self.client.get('/api/transactions/', {'limit': 5000}).status_code, 400)
+
+
+class BenchSuiteTests(TestCase):
+    def test_seed_and_compare_against_baseline(self):
+        call_command('seed_bench_data', '--years', '1', '--transactions', '60', '--reviews', '20', '--notices', '10', stdout=io.StringIO())
+        self.assertEqual(FinancialTransaction.objects.count(), 60)
+        self.assertIn(WeeklyReport.objects.count(), (52, 53))  # 1년치 주일
+        self.assertEqual(ChurchReview.objects.dates('created_at', 'month').count(), 12)  # 1년에 고르게 퍼짐
+
+        with tempfile.TemporaryDirectory() as directory:
+            args = ['bench_suite', '--repeat', '2', '--import-rows', '20', '--export-rows', '20',
+                    '--baseline', f'{directory}/baseline.json']
+            call_command(*args, '--save-baseline', stdout=io.StringIO())
+            out = io.StringIO()
+            call_command(*args, '--tolerance', '100', stdout=out)
+            self.assertIn('기준값 범위 안에', out.getvalue())
+
+            # 쿼리 수가 기준보다 늘어나면 실패해야 합니다.
+            with open(f'{directory}/baseline.json', encoding='utf-8') as f:
+                baseline = json.load(f)
+            baseline['results']['home (warm cache)']['queries'] = 0
+            with open(f'{directory}/baseline.json', 'w', encoding='utf-8') as f:
+                json.dump(baseline, f)
+            with self.assertRaisesMessage(CommandError, 'home (warm cache): 쿼리'):
+                call_command(*args, '--tolerance', '100', stdout=io.StringIO())
+
+
+@override_settings(REPLICA_DATABASE_ALIAS='replica')
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_replica_only_inside_the_scope(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(ChurchReview), 'default')
+        with use_replica():
+            self.assertEqual(router.db_for_read(ChurchReview), 'replica')
+        self.assertEqual(router.db_for_read(ChurchReview), 'default')
+
+    def test_write_pins_the_rest_of_the_request_to_primary(self):
+        router = ReplicaRouter()
+        with use_replica():
+            self.assertEqual(router.db_for_write(ChurchReview), 'default')
+            self.assertEqual(router.db_for_read(ChurchReview), 'default')
+        with use_replica():
+            self.assertEqual(router.db_for_read(ChurchReview), 'replica')
+
+    def test_only_safe_methods_read_from_replica(self):
+        view = replica_reads(lambda request: ReplicaRouter().db_for_read(ChurchReview))
+        self.assertEqual(view(mock.Mock(method='GET')), 'replica')
+        self.assertEqual(view(mock.Mock(method='POST')), 'default')
+
+
+class SqliteProfileTests(SimpleTestCase):
+    def test_tuned_options_apply_pragmas_on_connect(self):
+        with tempfile.TemporaryDirectory() as directory:
+            handler = ConnectionHandler({'default': {}, 'tuned': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': f'{directory}/tuned.sqlite3',
+                'OPTIONS': settings.SQLITE_TUNED_OPTIONS,
+            }})
+            tuned = handler['tuned']
+            try:
+                with tuned.cursor() as cursor:
+                    self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+                    self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+                    self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone()[0], 20000)
+                self.assertEqual(tuned.transaction_mode, 'IMMEDIATE')
+            finally:
+                tuned.close()
+
+
+@override_settings(MIDDLEWARE=['ministry.timing.ServerTimingMiddleware', *settings.MIDDLEWARE])
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_reports_sections(self):
+        with self.assertLogs('ministry.timing', 'INFO') as logs:
+            response = self.client.get('/')
+        header = response['Server-Timing']
+        for name in ('review_check;', 'section_transactions;', 'render;', 'db;', 'total;'):
+            self.assertIn(name, header)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['path'], '/')
+        self.assertEqual(line['sections']['review_check']['queries'], 0)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_has_no_header(self):
+        self.assertNotIn('Server-Timing', self.client.get('/'))
+
+
+class StartupProfileTests(SimpleTestCase):
+    # 실제 시간 예산은 기계 부하에 따라 달라지므로 여기서는 재지 않고, 배포 전 `manage.py startup_profile`로 확인합니다.
+    def test_setup_does_not_import_heavy_libraries(self):
+        result, imports = profile_startup('')
+        self.assertEqual(result['heavy'], [])
+        self.assertTrue(imports)
+
+    def test_failed_first_request_is_a_problem(self):
+        ok = {'setup_ms': 100, 'request_ms': 200, 'status': 302, 'heavy': []}
+        self.assertEqual(find_problems(ok, 800, 1500), [])
+        for status in (500, 404, "OperationalError('no such table')"):
+            problems = find_problems({**ok, 'status': status}, 800, 1500)
+            self.assertEqual(len(problems), 1)
+            self.assertIn(str(status), problems[0])
+
+    def test_reports_budget_and_heavy_imports(self):
+        slow = {'setup_ms': 900, 'request_ms': None, 'status': None, 'heavy': ['openpyxl']}
+        self.assertEqual(len(find_problems(slow, 800, 1500)), 2)
+
+    def test_parse_importtime_keeps_top_level_modules(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |     _io\n'
+            'import time:       300 |       5000 | django\n'
+            'import time:       200 |       2000 | json\n'
+        )
+        self.assertEqual(parse_importtime(stderr), [(5000, 'django'), (2000, 'json')])
+
+    def test_top_option_reaches_the_import_list(self):
+        imports = [(1000 - i, f'module{i}') for i in range(20)]
+        result = {'setup_ms': 100, 'request_ms': None, 'status': None, 'heavy': []}
+        with mock.patch('ministry.management.commands.startup_profile.profile_startup', return_value=(result, imports)) as run:
+            out = io.StringIO()
+            call_command('startup_profile', '--url', '', '--top', '20', stdout=out)
+        self.assertEqual(run.call_args.kwargs['top'], 20)
+        self.assertIn('module19', out.getvalue())
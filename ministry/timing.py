@@ -0,0 +1,124 @@
+"""
+timing.py는 요청 하나가 어디서 시간을 쓰는지(구역별 시간, DB 쿼리 수/시간) 재는 도구입니다.
+
+SERVER_TIMING_SAMPLE_RATE(0~1)만큼의 요청만 골라서 잽니다. (예: 0.05면 20번에 1번)
+잰 결과는 두 곳에 남습니다.
+- Server-Timing 응답 헤더: 브라우저 개발자 도구의 Network > Timing 탭에서 바로 보입니다.
+- 'ministry.timing' 로그: 한 줄짜리 JSON이라 배포 환경 로그에서 검색/집계하기 쉽습니다.
+
+뷰 안에서는 `with timed('구역 이름'):`으로 감싸기만 하면 됩니다. 측정 중이 아닌 요청에서는 아무 일도 하지 않습니다.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('ministry.timing')
+
+_current = contextvars.ContextVar('ministry_request_timer', default=None)
+
+
+class RequestTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        # 비동기 화면은 여러 작업 스레드가 동시에 쿼리를 기록하므로 더할 때 잠그고,
+        # 구역별 쿼리는 그 구역을 실행한 스레드의 것만 세도록 스레드마다 따로도 셉니다.
+        self.lock = threading.Lock()
+        self.per_thread = threading.local()
+        # (구역 이름, 걸린 시간 ms, 쿼리 수, 쿼리 시간 ms)
+        self.sections = []
+
+    def record_query(self, execute, sql, params, many, context):
+        # connection.execute_wrapper로 등록되어 모든 쿼리가 이 함수를 거쳐 실행됩니다.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            queries, sql_ms = self._thread_counts()
+            self.per_thread.counts = (queries + 1, sql_ms + ms)
+            with self.lock:
+                self.queries += 1
+                self.sql_ms += ms
+
+    def _thread_counts(self):
+        return getattr(self.per_thread, 'counts', (0, 0.0))
+
+    @contextlib.contextmanager
+    def section(self, name):
+        started, (queries, sql_ms) = time.perf_counter(), self._thread_counts()
+        try:
+            yield
+        finally:
+            now_queries, now_sql_ms = self._thread_counts()
+            self.sections.append((name, (time.perf_counter() - started) * 1000, now_queries - queries, now_sql_ms - sql_ms))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self, total_ms):
+        entries = [f'{name};dur={ms:.1f};desc="{queries} queries, {sql:.1f}ms SQL"' for name, ms, queries, sql in self.sections]
+        entries.append(f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries"')
+        entries.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(entries)
+
+
+def timed(name):
+    """현재 요청을 재는 중이면 name 구역의 시간과 쿼리를 기록하고, 아니면 아무것도 하지 않습니다."""
+    timer = _current.get()
+    if timer is None:
+        return contextlib.nullcontext()
+    return timer.section(name)
+
+
+def record_queries():
+    """
+    현재 요청을 재는 중이면 이 스레드의 DB 연결에도 쿼리 기록을 겁니다.
+
+    DB 연결은 스레드마다 따로라서, 미들웨어가 건 기록은 요청을 처리하는 스레드의 쿼리만 잡습니다.
+    acached_sections처럼 따로 띄운 작업 스레드에서는 이것으로 감싸야 그 쿼리도 Server-Timing에 들어갑니다.
+    """
+    stack = contextlib.ExitStack()
+    timer = _current.get()
+    if timer is not None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer.record_query))
+    return stack
+
+
+class ServerTimingMiddleware:
+    """settings.SERVER_TIMING_SAMPLE_RATE가 0보다 크면 settings.py가 MIDDLEWARE 맨 앞에 넣습니다."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0)
+        if rate <= 0 or random.random() >= rate:
+            return self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        try:
+            with record_queries():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = timer.total_ms()
+        response['Server-Timing'] = timer.header(total_ms)
+        logger.info(json.dumps({
+            'path': request.path, 'method': request.method, 'status': response.status_code,
+            'total_ms': round(total_ms, 1), 'queries': timer.queries, 'sql_ms': round(timer.sql_ms, 1),
+            'sections': {name: {'ms': round(ms, 1), 'queries': queries, 'sql_ms': round(sql, 1)}
+                         for name, ms, queries, sql in timer.sections},
+        }, ensure_ascii=False))
+        return response
@@ -1,96 +1,196 @@
-import os
-import json # 👈 이 줄이 반드시 있어야 합니다!
-import urllib.request
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
 from django.utils import timezone
-from django.core.paginator import Paginator
-from django.conf import settings
-from .models import WeeklyReport, FinancialTransaction, ChurchReview, NotionNotice
+from .models import WeeklyReport, FinancialTransaction, ChurchReview, NotionNotice, SlideImage
+from .cache import acached_sections, cached_sections
+from .conditional import conditional_view
+from .pagination import keyset_page
+from .ratelimit import remaining_reviews, remember, review_allowed
+from .rollups import annotate_running_balance, ledger_summary
+from .routers import replica_reads
+from .search import search
+from .slides import active_slides
+from .timing import timed
+
+# '더 보기' 목록의 정렬 순서 (마지막 id는 같은 날짜끼리 순서를 고정하기 위한 것)
+TX_ORDERING = ('-transaction_date', '-id')
+REVIEW_ORDERING = ('-created_at', '-id')
+NOTICE_ORDERING = ('-date', '-id')
+TX_PER_PAGE, REVIEW_PER_PAGE, NOTICE_PER_PAGE = 10, 6, 6
+SEARCH_LIMIT = 10
+
+
+def weekly_summary(today):
+    # 통계 카드와 차트에 쓰이는 주간 보고 데이터 (기존 로직 동일하게 유지)
+    last_report = WeeklyReport.objects.filter(date__lte=today).order_by('-date').first()
+    recent_reports = list(WeeklyReport.objects.filter(date__lte=today).order_by('-date')[:4])
+    chart_labels = [r.date.strftime('%m/%d') for r in reversed(recent_reports)]
+    chart_data = [r.worship_attendance for r in reversed(recent_reports)]
+    stat = {'worship_attendance': last_report.worship_attendance, 'new_comers': last_report.new_comers, 'offering_total': last_report.offering_total, 'date': last_report.date} if last_report else None
+    return {'stat': stat, 'chart_labels': chart_labels, 'chart_data': chart_data}
+
+
+def transaction_page(cursor=None):
+    # 각 내역에 '그 시점까지의 잔액'(balance)을 붙입니다. (DB 창 함수로 계산, rollups.py 참고)
+    page = keyset_page(FinancialTransaction.objects.all(), TX_ORDERING, cursor, TX_PER_PAGE)
+    annotate_running_balance(page)
+    return page
+
+
+def review_page(cursor=None):
+    return keyset_page(ChurchReview.objects.all(), REVIEW_ORDERING, cursor, REVIEW_PER_PAGE)
+
+
+def client_ip(request):
+    return request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR')).split(',')[0]
+
+
+def home_variant(request):
+    # 메인 화면은 날짜(통계 카드)와 방문자(리뷰를 더 쓸 수 있는지)에 따라 달라지므로 ETag에 함께 넣습니다.
+    return [timezone.now().date(), review_allowed(request, client_ip(request))]
+
+
+def notice_page(cursor=None):
+    # 첨부파일(files)은 JSONField라서 현재 묶음의 6개 공지만 읽을 때 함께 풀립니다.
+    return keyset_page(NotionNotice.objects.all(), NOTICE_ORDERING, cursor, NOTICE_PER_PAGE)
+
+
+def dashboard_sections(today):
+    """
+    메인 화면 구역들의 specs입니다. (cache.py의 cached_sections / acached_sections에 넘김)
+    각 구역은 완성된 HTML로 캐시해 두고, 데이터가 바뀌었을 때만 다시 그립니다. (cache.py, signals.py 참고)
+    '더 보기'로 이어지는 다음 묶음은 아래의 전용 뷰(transaction_list 등)가 따로 처리합니다.
+    노션 API는 여기서 호출하지 않습니다. (`python manage.py sync_notion`이 미리 DB에 넣어둡니다)
+    """
+    summary = {}
+    lock = threading.Lock()
+
+    def weekly():
+        # 통계 카드와 차트가 둘 다 다시 그려져야 할 때도 주간 보고는 한 번만 읽습니다. (비동기 화면에서는 동시에 불릴 수 있음)
+        with lock:
+            if not summary:
+                summary.update(weekly_summary(today))
+        return summary
+
+    return {
+        'stats': ([WeeklyReport], [today], lambda: render_to_string('ministry/partials/stat_cards.html', {'stat': weekly()['stat']})),
+        'chart': ([WeeklyReport], [today], lambda: render_to_string('ministry/partials/chart_data.html', weekly())),
+        'ledger': ([FinancialTransaction], [today.year], lambda: render_to_string('ministry/partials/ledger_summary.html', {'ledger': ledger_summary(today.year)})),
+        'transactions': ([FinancialTransaction], [], lambda: render_to_string('ministry/partials/transaction_list.html', {'transactions': transaction_page()})),
+        'reviews': ([ChurchReview], [], lambda: render_to_string('ministry/partials/review_list.html', {'reviews': review_page()})),
+        'notices': ([NotionNotice], [], lambda: render_to_string('ministry/partials/notion_list.html', {'notion_notices': notice_page()})),
+    }
+
 
+DASHBOARD_MODELS = (WeeklyReport, FinancialTransaction, ChurchReview, NotionNotice, SlideImage)
+
+
+@replica_reads
+@conditional_view(*DASHBOARD_MODELS, vary=home_variant, private=True)
 def home(request):
+    # 다시 방문한 브라우저에는 바뀐 게 없으면 여기까지 오지 않고 304로 답합니다. (conditional.py)
     today = timezone.now().date()
-    client_ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR')).split(',')[0]
-    has_reviewed_today = ChurchReview.objects.filter(ip_address=client_ip, created_at__date=today).exists()
+    ip = client_ip(request)
 
     # --- [0. 리뷰 처리] ---
+    # 횟수 제한은 저장할 때만 DB로 확인하고, 화면을 보여줄 때는 캐시/쿠키만 봅니다. (ratelimit.py)
     if request.method == 'POST':
         author_name = request.POST.get('author_name')
         rating = request.POST.get('rating')
         content = request.POST.get('content')
-        if author_name and content and not has_reviewed_today:
-            ChurchReview.objects.create(author_name=author_name, rating=rating, content=content, ip_address=client_ip)
-        return redirect('home')
+        response = redirect('home')
+        if author_name and content:
+            remaining = remaining_reviews(request, ip)
+            if remaining > 0:
+                ChurchReview.objects.create(author_name=author_name, rating=rating, content=content, ip_address=ip)
+                remaining -= 1
+            remember(response, ip, remaining)
+        return response
+
+    # timed('이름')으로 감싼 구역은 SERVER_TIMING_SAMPLE_RATE를 켰을 때 Server-Timing 헤더에 따로 표시됩니다. (timing.py)
+    with timed('review_check'):
+        has_reviewed_today = not review_allowed(request, ip)
+
+    # --- [1. 슬라이드] ---
+    # 관리자 화면의 '메인 슬라이드 사진'에서 관리합니다. (메모리에 보관해 두고 바뀔 때만 다시 읽음)
+    with timed('slides'):
+        slides = active_slides(request)
+
+    # --- [2. 통계/차트/목록 첫 묶음] ---
+    sections = cached_sections(dashboard_sections(today))
+
+    with timed('render'):
+        return render(request, 'ministry/dashboard.html', {
+            'sections': sections, 'slides': slides, 'has_reviewed_today': has_reviewed_today,
+        })
+
+
+@replica_reads
+@conditional_view(*DASHBOARD_MODELS, vary=home_variant, private=True)
+async def home_async(request):
+    """
+    ASGI 서버(uvicorn 등)로 띄웠을 때 쓰는 메인 화면입니다. (config/asgi.py가 ASYNC_DASHBOARD를 켭니다)
+    보여주는 내용은 home과 같고, 캐시에 없는 구역과 슬라이드를 동시에 읽어서 처음 방문(캐시 없음) 때 더 빨리 답합니다.
+    리뷰 작성(POST)은 드물고 순서가 중요하므로 home에 그대로 맡깁니다.
+    """
+    if request.method == 'POST':
+        return await sync_to_async(home)(request)
+
+    today = timezone.now().date()
+    with timed('review_check'):
+        # 캐시(Redis일 수도 있음)를 읽으므로 이벤트 루프를 막지 않게 스레드에서 실행합니다.
+        has_reviewed_today = not await sync_to_async(review_allowed)(request, client_ip(request))
+
+    slides, sections = await asyncio.gather(
+        sync_to_async(active_slides)(request),
+        acached_sections(dashboard_sections(today)),
+    )
+
+    with timed('render'):
+        return await sync_to_async(render)(request, 'ministry/dashboard.html', {
+            'sections': sections, 'slides': slides, 'has_reviewed_today': has_reviewed_today,
+        })
+
+
+# ----------------------------------------------------------------------------------------
+# htmx '더 보기' 전용 뷰
+# 메인 화면 전체(통계, 슬라이드, 리뷰 확인 등)를 다시 계산하지 않고, 해당 목록의 쿼리 한 번만 실행합니다.
+# 읽기 전용이므로 @replica_reads로 복제본 DB에서 읽고, 바뀐 게 없으면 @conditional_view가 304로 답합니다.
+# ----------------------------------------------------------------------------------------
+@replica_reads
+@conditional_view(FinancialTransaction)
+def transaction_list(request):
+    transactions = transaction_page(request.GET.get('cursor'))
+    return render(request, 'ministry/partials/transaction_rows.html', {'transactions': transactions, 'oob': True})
+
+
+@replica_reads
+@conditional_view(ChurchReview)
+def review_list(request):
+    reviews = review_page(request.GET.get('cursor'))
+    return render(request, 'ministry/partials/review_items.html', {'reviews': reviews, 'oob': True})
+
+
+@replica_reads
+@conditional_view(NotionNotice)
+def notion_list(request):
+    notion_notices = notice_page(request.GET.get('cursor'))
+    return render(request, 'ministry/partials/notion_items.html', {'notion_notices': notion_notices, 'oob': True})
 
-    # --- [1. 통계/차트/슬라이드] (기존 로직 동일하게 유지) ---
-    last_report = WeeklyReport.objects.filter(date__lte=today).order_by('-date').first()
-    recent_reports = WeeklyReport.objects.filter(date__lte=today).order_by('-date')[:4]
-    chart_labels = [r.date.strftime('%m/%d') for r in reversed(list(recent_reports))]
-    chart_data = [r.worship_attendance for r in reversed(list(recent_reports))]
-    stat = {'worship_attendance': last_report.worship_attendance, 'new_comers': last_report.new_comers, 'offering_total': last_report.offering_total, 'date': last_report.date} if last_report else None
 
-    slides = []
-    slides_dir = os.path.join(settings.BASE_DIR, 'static', 'slides')
-    if os.path.exists(slides_dir):
-        file_list = sorted([f for f in os.listdir(slides_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))])
-        title_list = ["영원한 것을 위해 영원하지 않은 것을 희생하려고 합니다.", "모든 사람이 죄를 범하였으매 하나님의 영광에 이르지 못하더니", "우리가 아직 죄인되었을 때에 그리스도께서 우리를 위하여 죽으심으로\n하나님께서 우리에 대한 자기의 사랑을 확증하셨느니라", "하나님이 세상을 이처럼 사랑하사 독생자를 주셨으니\n이는 그를 믿는 자마다 멸망하지 않고 영생을 얻게 하려 하심이라", "새 계명을 너희에게 주노니 서로 사랑하라\n내가 너희를 사랑한 것 같이 너희도 서로 사랑하라"]
-        for idx, filename in enumerate(file_list):
-            slides.append({'id': idx, 'title': title_list[idx] if idx < len(title_list) else "", 'image': {'url': f"/static/slides/{filename}"}})
-
-    # --- [2. 페이지네이션 (재정/리뷰)] ---
-    recent_transactions = Paginator(FinancialTransaction.objects.order_by('-transaction_date'), 10).get_page(request.GET.get('tx_page', 1))
-    if request.headers.get('HX-Request') and 'tx_page' in request.GET:
-        return render(request, 'ministry/partials/transaction_list.html', {'transactions': recent_transactions})
-
-    recent_reviews = Paginator(ChurchReview.objects.order_by('-created_at'), 6).get_page(request.GET.get('review_page', 1))
-    if request.headers.get('HX-Request') and 'review_page' in request.GET:
-        return render(request, 'ministry/partials/review_list.html', {'reviews': recent_reviews})
-
-    # --- [3. 노션 동기화 (초고속 DB 방식)] ---
-    # 먼저 DB를 확인합니다.
-    notion_notices_qs = NotionNotice.objects.all().order_by('-date')
-
-    # 만약 데이터가 없으면 '딱 한 번만' 노션에서 긁어와 저장합니다.
-    if not notion_notices_qs.exists():
-        try:
-            api_key = os.environ.get("NOTION_API_KEY")
-            db_id = os.environ.get("NOTION_DATABASE_ID")
-            if api_key and db_id:
-                url = f"https://api.notion.com/v1/databases/{db_id}/query"
-                headers = {"Authorization": f"Bearer {api_key}", "Notion-Version": "2022-06-28", "Content-Type": "application/json"}
-                payload = json.dumps({"sorts": [{"property": "날짜", "direction": "descending"}]}).encode("utf-8")
-                req = urllib.request.Request(url, data=payload, headers=headers, method="POST")
-                with urllib.request.urlopen(req) as response:
-                    results = json.loads(response.read().decode("utf-8")).get('results', [])
-                    for page in results:
-                        p = page.get('properties', {})
-                        title = p['이름']['title'][0]['plain_text'] if p.get('이름') and p['이름']['title'] else "제목 없음"
-                        date_v = p['날짜']['date']['start'] if p.get('날짜') and p['날짜']['date'] else str(today)
-                        text_v = "".join([t['plain_text'] for t in p['텍스트']['rich_text']]) if p.get('텍스트') and p['텍스트']['rich_text'] else ""
-                        
-                        # 파일 정보 추출
-                        files = []
-                        for f in p.get('파일과 미디어', {}).get('files', []):
-                            f_url = f.get('file', {}).get('url') or f.get('external', {}).get('url')
-                            if f_url: files.append({'name': f.get('name', '첨부파일'), 'url': f_url})
-                        
-                        NotionNotice.objects.get_or_create(title=title, date=date_v, defaults={'content': text_v, 'files_json': json.dumps(files)})
-                notion_notices_qs = NotionNotice.objects.all().order_by('-date')
-        except Exception as e:
-            print(f"Notion Sync Error: {e}")
-
-    # DB에 저장된 JSON 문자열을 템플릿에서 쓸 수 있게 리스트로 미리 변환
-    for notice in notion_notices_qs:
-        try:
-            notice.files = json.loads(notice.files_json)
-        except:
-            notice.files = []
-
-    recent_notices = Paginator(notion_notices_qs, 6).get_page(request.GET.get('notion_page', 1))
-    if request.headers.get('HX-Request') and 'notion_page' in request.GET:
-        return render(request, 'ministry/partials/notion_list.html', {'notion_notices': recent_notices})
-
-    return render(request, 'ministry/dashboard.html', {
-        'stat': stat, 'slides': slides, 'transactions': recent_transactions, 
-        'reviews': recent_reviews, 'notion_notices': recent_notices,
-        'chart_labels': chart_labels, 'chart_data': chart_data, 'has_reviewed_today': has_reviewed_today,
-    })
\ No newline at end of file
+@replica_reads
+@conditional_view(NotionNotice, FinancialTransaction)
+def search_results(request):
+    # 검색창에 입력할 때마다 htmx가 부르는 조각입니다. 소식과 재정 내역에서 최신순으로 SEARCH_LIMIT개씩 찾습니다.
+    query = request.GET.get('q', '').strip()[:50]
+    notices, transactions = [], []
+    if query:
+        notices = search(NotionNotice.objects.all(), query).order_by(*NOTICE_ORDERING)[:SEARCH_LIMIT]
+        transactions = search(FinancialTransaction.objects.all(), query).order_by(*TX_ORDERING)[:SEARCH_LIMIT]
+    return render(request, 'ministry/partials/search_results.html', {
+        'query': query, 'notices': notices, 'transactions': transactions,
+    })